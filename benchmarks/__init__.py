@@ -0,0 +1 @@
+"""Benchmarks for the extraction, import and analysis pipeline."""
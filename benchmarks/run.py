@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Run pipeline benchmarks on synthetic data.
+
+Times each pipeline stage at several history sizes and writes the results
+as JSON, so runs can be compared across commits to catch regressions.
+
+Stages:
+    fetch          get_all_workouts() against a local stub API server
+    import_csv     scripts/import_csv.py:import_csv() on a CSV export
+    json_flatten   json.load + flatten of workouts_latest.json
+    cube_build     SummaryCube.build() from the flattened frame
+    cube_rollup    Instructor and month roll-ups from the cube
+    output_series  Downsampled output-over-time series
+    perf_pyramid   Storing 1 Hz performance graphs with all levels
+    archive_write  Archiving raw workout and graph responses (compressed)
+    json_write     The same responses as one plain JSON file each
+    archive_read   Random single-response reads from the archive
+    json_read      The same reads from plain JSON files
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --scales 1000,10000,100000,1000000 --stages fetch,import_csv
+    python -m benchmarks.run --compare benchmarks/results/<baseline>.json
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+import argparse
+import importlib.util
+import json
+import logging
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add repo root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import synthetic
+
+logger = logging.getLogger("benchmarks")
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+DEFAULT_SCALES = (1_000, 10_000, 100_000)
+
+# Performance graphs are ~1-2 MB of JSON each, so that stage uses fewer items
+GRAPHS_PER_1K_WORKOUTS = 1
+MAX_GRAPHS = 200
+
+# Responses archived by the archive stages, and random reads timed
+ARCHIVE_MAX_RECORDS = 20_000
+ARCHIVE_READS = 2_000
+
+# A stage counts as regressed if it got this much slower than the baseline
+DEFAULT_THRESHOLD = 0.2
+
+
+class Workspace:
+    """Synthetic input files for one scale, generated once and reused."""
+
+    def __init__(self, root: Path, scale: int, seed: int):
+        self.root = root / str(scale)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.scale = scale
+        self.seed = seed
+        self._frame = None
+        self._responses = None
+
+    @property
+    def json_path(self) -> Path:
+        path = self.root / "workouts_latest.json"
+        if not path.exists():
+            synthetic.write_workouts_json(path, self.scale, self.seed)
+        return path
+
+    @property
+    def csv_path(self) -> Path:
+        path = self.root / "workouts.csv"
+        if not path.exists():
+            synthetic.write_csv_export(path, self.scale, self.seed)
+        return path
+
+    @property
+    def frame(self):
+        if self._frame is None:
+            from src.analysis.workouts import load_workouts_frame
+
+            self._frame = load_workouts_frame(self.json_path)
+        return self._frame
+
+    @property
+    def responses(self) -> List[Tuple[str, str, bytes]]:
+        """Raw (workout_id, endpoint, body) responses for the archive stages."""
+        if self._responses is None:
+            from src.storage.response_archive import ENDPOINT_PERFORMANCE_GRAPH, ENDPOINT_WORKOUT
+
+            details = min(self.scale, ARCHIVE_MAX_RECORDS)
+            graphs = min(max(self.scale // 1000 * GRAPHS_PER_1K_WORKOUTS, 1), MAX_GRAPHS)
+            self._responses = [
+                (w["id"], ENDPOINT_WORKOUT, json.dumps(w).encode())
+                for w in synthetic.iter_workouts(details, self.seed)
+            ] + [
+                (w["id"], ENDPOINT_PERFORMANCE_GRAPH, json.dumps(synthetic.performance_graph(w, self.seed)).encode())
+                for w in synthetic.iter_workouts(graphs, self.seed)
+            ]
+        return self._responses
+
+
+# Each stage takes a workspace and returns (function to time, items processed)
+
+def stage_fetch(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    import requests
+
+    from benchmarks.stub_server import StubPelotonServer
+    from src.extraction.api_client import PelotonAPIClient
+
+    server = StubPelotonServer(ws.scale, ws.seed).start()
+
+    def run():
+        session = requests.Session()
+        client = PelotonAPIClient(session, synthetic.USER_ID)
+        client.BASE_URL = server.url
+        client.min_request_interval = 0
+        try:
+            workouts = client.get_all_workouts(joins="ride,ride.instructor")
+        finally:
+            session.close()
+        assert len(workouts) == ws.scale
+
+    run.cleanup = server.stop
+    return run, ws.scale
+
+
+def stage_import_csv(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    spec = importlib.util.spec_from_file_location("import_csv", REPO_ROOT / "scripts" / "import_csv.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    path = str(ws.csv_path)
+    return lambda: module.import_csv(path), ws.scale
+
+
+def stage_json_flatten(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    from src.analysis.workouts import to_frame
+
+    path = ws.json_path
+
+    def run():
+        with open(path) as f:
+            to_frame(json.load(f))
+
+    return run, ws.scale
+
+
+def stage_cube_build(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    from src.analysis.cube import SummaryCube
+
+    df = ws.frame
+    return lambda: SummaryCube.build(df), ws.scale
+
+
+def stage_cube_rollup(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    from src.analysis.cube import SummaryCube
+
+    cube = SummaryCube.build(ws.frame)
+
+    def run():
+        cube.rollup("instructor")
+        cube.slice(discipline="cycling").rollup("month")
+
+    return run, ws.scale
+
+
+def stage_output_series(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    from src.analysis.aggregates import build_output_series
+
+    df = ws.frame
+    return lambda: build_output_series(df), ws.scale
+
+
+def stage_perf_pyramid(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    from src.storage.performance_store import PerformanceGraphStore
+
+    count = min(max(ws.scale // 1000 * GRAPHS_PER_1K_WORKOUTS, 1), MAX_GRAPHS)
+    graphs = [
+        (w["id"], synthetic.performance_graph(w, ws.seed))
+        for w in synthetic.iter_workouts(count, ws.seed)
+    ]
+    store = PerformanceGraphStore(ws.root / "store")
+
+    def run():
+        for workout_id, graph in graphs:
+            store.save(workout_id, graph)
+            store.read(workout_id, "output", resolution=30)
+
+    return run, count
+
+
+def _disk_usage(root: Path) -> int:
+    """Bytes allocated on disk under root (counts per-file block overhead)."""
+    return sum(p.stat().st_blocks * 512 for p in root.rglob("*") if p.is_file())
+
+
+def _json_response_path(root: Path, workout_id: str, endpoint: str) -> Path:
+    return root / endpoint / f"{workout_id}.json"
+
+
+def _write_json_responses(root: Path, responses: List[Tuple[str, str, bytes]]) -> None:
+    for workout_id, endpoint, body in responses:
+        path = _json_response_path(root, workout_id, endpoint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+
+
+def _sample_keys(ws: Workspace) -> List[Tuple[str, str]]:
+    rng = random.Random(ws.seed)
+    keys = [(workout_id, endpoint) for workout_id, endpoint, _ in ws.responses]
+    return [rng.choice(keys) for _ in range(ARCHIVE_READS)]
+
+
+def _latency_metrics(latencies: List[float]) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    return {
+        "read_p50_us": round(latencies[len(latencies) // 2] * 1e6, 1),
+        "read_p99_us": round(latencies[int(len(latencies) * 0.99)] * 1e6, 1),
+    }
+
+
+def stage_archive_write(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    from src.storage.response_archive import ResponseArchive
+
+    responses = ws.responses
+    root = ws.root / "archive"
+
+    def run():
+        shutil.rmtree(root, ignore_errors=True)
+        with ResponseArchive(root) as archive:
+            for workout_id, endpoint, body in responses:
+                archive.put(workout_id, endpoint, body)
+            stats = archive.stats()
+        run.metrics = {
+            "raw_bytes": stats["raw_bytes"],
+            "stored_bytes": stats["stored_bytes"],
+            "disk_bytes": _disk_usage(root),
+            "compression_ratio": stats["ratio"],
+        }
+
+    return run, len(responses)
+
+
+def stage_json_write(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    responses = ws.responses
+    root = ws.root / "responses"
+
+    def run():
+        shutil.rmtree(root, ignore_errors=True)
+        _write_json_responses(root, responses)
+        run.metrics = {"disk_bytes": _disk_usage(root)}
+
+    return run, len(responses)
+
+
+def stage_archive_read(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    from src.storage.response_archive import ResponseArchive
+
+    root = ws.root / "archive_read"
+    shutil.rmtree(root, ignore_errors=True)
+    archive = ResponseArchive(root)
+    for workout_id, endpoint, body in ws.responses:
+        archive.put(workout_id, endpoint, body)
+    keys = _sample_keys(ws)
+
+    def run():
+        latencies = []
+        for workout_id, endpoint in keys:
+            start = time.perf_counter()
+            archive.get_json(workout_id, endpoint)
+            latencies.append(time.perf_counter() - start)
+        run.metrics = _latency_metrics(latencies)
+
+    run.cleanup = archive.close
+    return run, len(keys)
+
+
+def stage_json_read(ws: Workspace) -> Tuple[Callable[[], Any], int]:
+    root = ws.root / "responses_read"
+    shutil.rmtree(root, ignore_errors=True)
+    _write_json_responses(root, ws.responses)
+    keys = _sample_keys(ws)
+
+    def run():
+        latencies = []
+        for workout_id, endpoint in keys:
+            start = time.perf_counter()
+            with open(_json_response_path(root, workout_id, endpoint), "rb") as f:
+                json.load(f)
+            latencies.append(time.perf_counter() - start)
+        run.metrics = _latency_metrics(latencies)
+
+    return run, len(keys)
+
+
+STAGES: Dict[str, Callable[[Workspace], Tuple[Callable[[], Any], int]]] = {
+    "fetch": stage_fetch,
+    "import_csv": stage_import_csv,
+    "json_flatten": stage_json_flatten,
+    "cube_build": stage_cube_build,
+    "cube_rollup": stage_cube_rollup,
+    "output_series": stage_output_series,
+    "perf_pyramid": stage_perf_pyramid,
+    "archive_write": stage_archive_write,
+    "json_write": stage_json_write,
+    "archive_read": stage_archive_read,
+    "json_read": stage_json_read,
+}
+
+
+def run_stage(name: str, ws: Workspace, repeat: int) -> Dict[str, Any]:
+    """
+    Time one stage at one scale.
+
+    Args:
+        name: Stage name (key of STAGES)
+        ws: Workspace for the scale
+        repeat: Number of timed runs
+
+    Returns:
+        Result record
+    """
+    fn, items = STAGES[name](ws)
+    timings = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    finally:
+        cleanup = getattr(fn, "cleanup", None)
+        if cleanup:
+            cleanup()
+
+    best = min(timings)
+    result = {
+        "stage": name,
+        "scale": ws.scale,
+        "items": items,
+        "repeat": repeat,
+        "seconds_min": best,
+        "seconds_median": statistics.median(timings),
+        "items_per_second": items / best if best > 0 else None,
+    }
+    # Stages may report extra measurements (sizes, latency percentiles)
+    metrics = getattr(fn, "metrics", None)
+    if metrics:
+        result["metrics"] = metrics
+    return result
+
+
+def git_commit() -> Optional[str]:
+    """Get the current commit hash, if available."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path, threshold: float) -> List[str]:
+    """
+    Compare results against a baseline run.
+
+    Args:
+        results: Result records from this run
+        baseline_path: JSON file from a previous run
+        threshold: Relative slowdown that counts as a regression
+
+    Returns:
+        List of regression descriptions (empty if none)
+    """
+    with open(baseline_path) as f:
+        baseline = {(r["stage"], r["scale"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    logger.info(f"\nComparison against {baseline_path}:")
+    for r in results:
+        base = baseline.get((r["stage"], r["scale"]))
+        if base is None:
+            continue
+        ratio = r["seconds_min"] / base["seconds_min"]
+        marker = "✗" if ratio > 1 + threshold else "✓"
+        line = f"{r['stage']:>14} @ {r['scale']:>9,}: {base['seconds_min']:.4f}s -> {r['seconds_min']:.4f}s ({ratio:.2f}x)"
+        logger.info(f"  {marker} {line}")
+        if ratio > 1 + threshold:
+            regressions.append(line)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on synthetic data.")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="Comma-separated history sizes (default: %(default)s)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="Comma-separated stages (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best is reported)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    parser.add_argument("--workdir", type=Path, help="Keep generated inputs here between runs")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<time>_<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown treated as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Pipeline modules log progress per call; keep benchmark output readable
+    logging.getLogger("src").setLevel(logging.WARNING)
+    logging.getLogger("import_csv").setLevel(logging.WARNING)
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stage(s): {', '.join(unknown)}")
+
+    tmp = None
+    if args.workdir:
+        root = args.workdir
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="peloton-bench-")
+        root = Path(tmp.name)
+
+    results = []
+    try:
+        for scale in scales:
+            ws = Workspace(root, scale, args.seed)
+            for stage in stages:
+                result = run_stage(stage, ws, args.repeat)
+                results.append(result)
+                logger.info(
+                    f"{stage:>14} @ {scale:>9,}: {result['seconds_min']:.4f}s "
+                    f"({result['items_per_second']:,.0f} items/s)"
+                    + "".join(f", {k}={v:,}" for k, v in result.get("metrics", {}).items())
+                )
+    finally:
+        if tmp:
+            tmp.cleanup()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"\n✓ Results written to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            logger.info(f"\n✗ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
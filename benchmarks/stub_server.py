@@ -0,0 +1,144 @@
+"""
+Stub Peloton API Server
+
+Local HTTP server that answers the Peloton endpoints used by
+PelotonAPIClient with synthetic data, so extraction can be benchmarked
+without the live (rate-limited, currently blocked) service.
+
+Usage:
+    with StubPelotonServer(total_workouts=10_000) as server:
+        client = PelotonAPIClient(requests.Session(), synthetic.USER_ID)
+        client.BASE_URL = server.url
+        client.min_request_interval = 0
+        client.get_all_workouts()
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+import json
+import re
+import threading
+
+from benchmarks import synthetic
+
+_WORKOUTS = re.compile(r"^/api/user/(?P<user_id>[^/]+)/workouts$")
+_WORKOUT = re.compile(r"^/api/workout/(?P<workout_id>[0-9a-f]{32})$")
+_GRAPH = re.compile(r"^/api/workout/(?P<workout_id>[0-9a-f]{32})/performance_graph$")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes requests to the synthetic data generator."""
+
+    server: "StubPelotonServer"
+
+    # Keep-alive, so pooled client connections are reused as with the real API
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep benchmark output clean
+        pass
+
+    def _send_json(self, payload: Any, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _workout(self, workout_id: str) -> Optional[Dict[str, Any]]:
+        index = int(workout_id[8:], 16)
+        if workout_id[:8] != f"{self.server.seed:08x}" or index >= self.server.total_workouts:
+            return None
+        return synthetic.workout(index, self.server.seed)
+
+    def do_POST(self) -> None:
+        # Drain the request body so the connection can be reused
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        if urlparse(self.path).path == "/auth/login":
+            self._send_json({"user_id": synthetic.USER_ID, "session_id": "stub-session"})
+        else:
+            self._send_json({"status": 404, "message": "Not found"}, status=404)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        seed = self.server.seed
+
+        if url.path == "/api/me":
+            self._send_json({"id": synthetic.USER_ID, "username": "stub_rider", "location": "Benchmark"})
+            return
+
+        match = _WORKOUTS.match(url.path)
+        if match:
+            page = int(query.get("page", 0))
+            limit = min(int(query.get("limit", 100)), 100)
+            self._send_json(synthetic.workouts_page(self.server.total_workouts, page, limit, seed))
+            return
+
+        match = _GRAPH.match(url.path)
+        if match:
+            workout = self._workout(match["workout_id"])
+            if workout is not None:
+                every_n = int(query.get("every_n", 1))
+                self._send_json(synthetic.performance_graph(workout, seed, every_n))
+                return
+
+        match = _WORKOUT.match(url.path)
+        if match:
+            workout = self._workout(match["workout_id"])
+            if workout is not None:
+                self._send_json(workout)
+                return
+
+        self._send_json({"status": 404, "message": "Not found"}, status=404)
+
+
+class StubPelotonServer(ThreadingHTTPServer):
+    """Threaded stub server for a synthetic history of a given size."""
+
+    daemon_threads = True
+
+    def __init__(self, total_workouts: int, seed: int = 0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server (port 0 picks a free port).
+
+        Args:
+            total_workouts: Size of the synthetic history
+            seed: Dataset seed
+            host: Interface to bind
+            port: Port to bind
+        """
+        super().__init__((host, port), _Handler)
+        self.total_workouts = total_workouts
+        self.seed = seed
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use in place of PelotonAPIClient.BASE_URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubPelotonServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.stop()
@@ -0,0 +1,255 @@
+"""
+Synthetic Peloton Data
+
+Deterministic generator of Peloton-shaped data for benchmarks.
+
+Every workout is derived from (seed, index) alone, so any slice of a
+history (e.g. one API page of a 1M-workout history) can be produced on
+demand without generating the rest. The same seed always yields the same
+data, so benchmark results are comparable across commits.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Union
+from datetime import datetime, timedelta, timezone
+import csv
+import json
+import random
+
+import numpy as np
+
+DISCIPLINES = [
+    ("cycling", 0.55),
+    ("strength", 0.15),
+    ("running", 0.08),
+    ("yoga", 0.07),
+    ("stretching", 0.08),
+    ("meditation", 0.04),
+    ("walking", 0.03),
+]
+
+INSTRUCTORS = [f"Instructor {i:02d}" for i in range(40)]
+
+CLASS_LENGTHS = [5, 10, 15, 20, 30, 45, 60, 75, 90]
+
+# First workout timestamp and mean spacing between workouts (1M workouts
+# span ~114 years, which keeps timestamps within pandas datetime64 range)
+START_TIMESTAMP = 1451606400  # 2016-01-01 UTC
+MEAN_SPACING_S = 3600
+
+USER_ID = "0" * 32
+
+CSV_COLUMNS = [
+    "Workout Timestamp", "Live/On-Demand", "Instructor Name", "Length (minutes)",
+    "Fitness Discipline", "Type", "Title", "Class Timestamp", "Total Output",
+    "Avg. Watts", "Avg. Resistance", "Avg. Cadence (RPM)", "Avg. Speed (mph)",
+    "Distance (mi)", "Calories Burned", "Avg. Heartrate", "Avg. Incline",
+    "Avg. Pace (min/mi)",
+]
+
+
+def _rng(seed: int, index: int) -> random.Random:
+    return random.Random(seed * 1_000_003 + index)
+
+
+def workout(index: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate one API-shaped workout (with ride and instructor joins).
+
+    Args:
+        index: Position in the history (0 is the oldest)
+        seed: Dataset seed
+
+    Returns:
+        Workout dictionary as returned by /api/user/{id}/workouts
+    """
+    rng = _rng(seed, index)
+    names, weights = zip(*DISCIPLINES)
+    discipline = rng.choices(names, weights)[0]
+    length = rng.choice(CLASS_LENGTHS)
+    created_at = START_TIMESTAMP + index * MEAN_SPACING_S + rng.randint(0, MEAN_SPACING_S // 2)
+    has_output = discipline == "cycling"
+    avg_watts = rng.gauss(160, 35) if has_output else 0
+    instructor = rng.randrange(len(INSTRUCTORS))
+
+    return {
+        "id": f"{seed:08x}{index:024x}",
+        "created_at": created_at,
+        "start_time": created_at + 30,
+        "end_time": created_at + 30 + length * 60,
+        "device_type": "home_bike_v1" if has_output else "iPhone",
+        "fitness_discipline": discipline,
+        "has_pedaling_metrics": has_output,
+        "is_total_work_personal_record": False,
+        "metrics_type": "cycling" if has_output else None,
+        "name": f"{discipline.title()} Workout",
+        "platform": "home_bike" if has_output else "iOS_app",
+        "status": "COMPLETE",
+        "timezone": "America/New_York",
+        "total_work": round(max(avg_watts, 0) * length * 60, 2),
+        "user_id": USER_ID,
+        "workout_type": "class",
+        "ride": {
+            "id": f"{rng.getrandbits(128):032x}",
+            "title": f"{length} min {discipline.title()} Ride" if has_output else f"{length} min {discipline.title()}",
+            "fitness_discipline": discipline,
+            "duration": length * 60,
+            "difficulty_estimate": round(rng.uniform(5, 9), 4),
+            "instructor": {
+                "id": f"{instructor:032x}",
+                "name": INSTRUCTORS[instructor],
+            },
+        },
+    }
+
+
+def iter_workouts(n: int, seed: int = 0, start: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Yield workouts start .. start + n - 1, oldest first.
+
+    Args:
+        n: Number of workouts
+        seed: Dataset seed
+        start: Index of the first workout
+    """
+    for index in range(start, start + n):
+        yield workout(index, seed)
+
+
+def workouts(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate a history of n workouts, newest first (API ordering)."""
+    return [workout(index, seed) for index in range(n - 1, -1, -1)]
+
+
+def workouts_page(total: int, page: int, limit: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate one page of /api/user/{id}/workouts for a history of given size.
+
+    Args:
+        total: Total workouts in the history
+        page: Page number (0-indexed, newest first)
+        limit: Workouts per page
+        seed: Dataset seed
+
+    Returns:
+        Response dictionary with data and pagination fields
+    """
+    first = total - 1 - page * limit
+    last = max(first - limit, -1)
+    data = [workout(index, seed) for index in range(first, last, -1)]
+    return {
+        "data": data,
+        "total": total,
+        "count": len(data),
+        "page": page,
+        "limit": limit,
+        "page_count": (total + limit - 1) // limit,
+        "show_previous": page > 0,
+        "show_next": last >= 0,
+    }
+
+
+def csv_row(w: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an API workout into an official CSV export row."""
+    ride = w["ride"]
+    minutes = ride["duration"] // 60
+    timestamp = datetime.fromtimestamp(w["created_at"], tz=timezone.utc) - timedelta(hours=5)
+    output_kj = w["total_work"] / 1000
+    has_output = w["has_pedaling_metrics"]
+    return {
+        "Workout Timestamp": timestamp.strftime("%Y-%m-%d %H:%M (EST)"),
+        "Live/On-Demand": "On Demand",
+        "Instructor Name": ride["instructor"]["name"],
+        "Length (minutes)": minutes,
+        "Fitness Discipline": w["fitness_discipline"].title(),
+        "Type": "Music",
+        "Title": ride["title"],
+        "Class Timestamp": timestamp.strftime("%Y-%m-%d %H:%M (EST)"),
+        "Total Output": round(output_kj) if has_output else "",
+        "Avg. Watts": round(w["total_work"] / ride["duration"]) if has_output else "",
+        "Avg. Resistance": "45%" if has_output else "",
+        "Avg. Cadence (RPM)": 85 if has_output else "",
+        "Avg. Speed (mph)": 19.5 if has_output else "",
+        "Distance (mi)": round(19.5 * minutes / 60, 2) if has_output else "",
+        "Calories Burned": round(output_kj * 1.1 + minutes * 3),
+        "Avg. Heartrate": 140,
+        "Avg. Incline": "",
+        "Avg. Pace (min/mi)": "",
+    }
+
+
+def write_workouts_json(path: Union[str, Path], n: int, seed: int = 0) -> Path:
+    """Write an n-workout history as workouts_latest.json-style JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(workouts(n, seed), f)
+    return path
+
+
+def write_csv_export(path: Union[str, Path], n: int, seed: int = 0) -> Path:
+    """Write an n-workout history in the official CSV export format."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for w in iter_workouts(n, seed):
+            writer.writerow(csv_row(w))
+    return path
+
+
+def performance_graph(w: Dict[str, Any], seed: int = 0, every_n: int = 1) -> Dict[str, Any]:
+    """
+    Generate a 1 Hz performance graph for a workout.
+
+    Args:
+        w: Workout from workout()
+        seed: Dataset seed
+        every_n: Sampling interval in seconds
+
+    Returns:
+        Response dictionary as returned by /api/workout/{id}/performance_graph
+    """
+    rng = np.random.default_rng([seed, int(w["id"][8:], 16)])
+    duration = w["ride"]["duration"]
+    seconds = np.arange(0, duration, every_n)
+    n = len(seconds)
+
+    # Slow intervals plus noise, loosely shaped like a real class
+    intensity = 1 + 0.3 * np.sin(seconds / 120.0) + rng.normal(0, 0.08, n)
+    cadence = np.clip(80 + 15 * np.sin(seconds / 90.0) + rng.normal(0, 4, n), 0, 130)
+    resistance = np.clip(40 + 12 * np.sin(seconds / 150.0) + rng.normal(0, 2, n), 0, 100)
+    output = np.clip(w["total_work"] / max(duration, 1) * intensity, 0, None)
+    heart_rate = np.clip(110 + 40 * (intensity - 0.7) + rng.normal(0, 3, n), 50, 200)
+    speed = np.clip(cadence * 0.23, 0, None)
+
+    def metric(slug: str, name: str, unit: str, values: np.ndarray, digits: int) -> Dict[str, Any]:
+        rounded = np.round(values, digits)
+        return {
+            "display_name": name,
+            "display_unit": unit,
+            "slug": slug,
+            "values": rounded.tolist(),
+            "average_value": float(np.round(values.mean(), digits)) if n else 0,
+            "max_value": float(np.round(values.max(), digits)) if n else 0,
+        }
+
+    return {
+        "duration": duration,
+        "is_class_plan_shown": True,
+        "seconds_since_pedaling_start": seconds.tolist(),
+        "metrics": [
+            metric("output", "Output", "watts", output, 0),
+            metric("cadence", "Cadence", "rpm", cadence, 0),
+            metric("resistance", "Resistance", "%", resistance, 0),
+            metric("speed", "Speed", "mph", speed, 1),
+            metric("heart_rate", "Heart Rate", "bpm", heart_rate, 0),
+        ],
+        "summaries": [
+            {"display_name": "Total Output", "slug": "total_output", "value": round(w["total_work"] / 1000)},
+            {"display_name": "Distance", "slug": "distance", "value": round(float(speed.sum()) / 3600, 2)},
+            {"display_name": "Calories", "slug": "calories", "value": round(w["total_work"] / 1000 * 1.1)},
+        ],
+        "average_summaries": [],
+    }
@@ -4,18 +4,24 @@ Fetch all workout data from Peloton and save to JSON.
 
 Usage:
     python scripts/fetch_all_workouts.py
+    python scripts/fetch_all_workouts.py --record data/cassettes/sync.db
+    python scripts/fetch_all_workouts.py --replay data/cassettes/sync.db
+    python scripts/fetch_all_workouts.py --profile --profile-stage store.json_dump
 """
 
 import sys
-import json
+import argparse
 import logging
+from contextlib import nullcontext
 from pathlib import Path
-from datetime import datetime
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.analysis.aggregates import refresh_aggregates
 from src.extraction.peloton import PelotonClient
+from src.profiling import profile_run, report_path
+from src.storage.workout_store import WorkoutStore
 
 # Configure logging
 logging.basicConfig(
@@ -27,18 +33,39 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Fetch all workouts and save to JSON."""
+    parser = argparse.ArgumentParser(description="Fetch all Peloton workouts.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", metavar="CASSETTE", help="Record API responses into a cassette")
+    mode.add_argument("--replay", metavar="CASSETTE", help="Replay API responses from a cassette (offline)")
+    parser.add_argument("--profile", nargs="?", const="", metavar="REPORT",
+                        help="Time pipeline stages and write a profile report (default: data/profiles/)")
+    parser.add_argument("--profile-stage", action="append", default=[], metavar="STAGE",
+                        help="Also run cProfile and tracemalloc for this stage (implies --profile)")
+    args = parser.parse_args()
+
+    if args.profile is None and not args.profile_stage:
+        profiled = nullcontext()
+    else:
+        report = args.profile or report_path(WorkoutStore().data_dir / "profiles", "fetch_all_workouts")
+        profiled = profile_run("fetch_all_workouts", report, detail=args.profile_stage)
+
+    with profiled:
+        return fetch_all(args)
+
+
+def fetch_all(args: argparse.Namespace) -> int:
+    """Fetch, store and summarize all workouts."""
     logger.info("=" * 60)
     logger.info("Fetching All Peloton Workout Data")
     logger.info("=" * 60)
 
     try:
-        # Create data directory if it doesn't exist
-        data_dir = Path(__file__).parent.parent / "data" / "raw"
-        data_dir.mkdir(parents=True, exist_ok=True)
+        # Workouts are written to data/raw via the workout store
+        store = WorkoutStore()
 
         # Create client and connect
         logger.info("\nConnecting to Peloton API...")
-        client = PelotonClient()
+        client = PelotonClient(cassette=args.record or args.replay, replay=bool(args.replay))
 
         if not client.connect():
             logger.error("Failed to connect. Check your credentials.")
@@ -52,23 +79,11 @@ def main():
 
         logger.info(f"\n✓ Successfully fetched {len(workouts)} workouts")
 
-        # Save to JSON
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = data_dir / f"workouts_{timestamp}.json"
+        # Save to JSON (also bumps the dataset version)
+        store.save(workouts)
 
-        logger.info(f"\nSaving to {output_file}...")
-
-        with open(output_file, 'w') as f:
-            json.dump(workouts, f, indent=2)
-
-        logger.info(f"✓ Saved {len(workouts)} workouts to {output_file}")
-
-        # Also save the latest version
-        latest_file = data_dir / "workouts_latest.json"
-        with open(latest_file, 'w') as f:
-            json.dump(workouts, f, indent=2)
-
-        logger.info(f"✓ Also saved to {latest_file}")
+        # Update the aggregates the dashboard and reports read
+        refresh_aggregates(store.data_dir)
 
         # Print summary statistics
         logger.info("\n" + "=" * 60)
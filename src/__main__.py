@@ -0,0 +1,7 @@
+"""Allow running the CLI with ``python -m src``."""
+
+import sys
+
+from src.cli import main
+
+sys.exit(main())
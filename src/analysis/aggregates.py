@@ -0,0 +1,203 @@
+"""
+Precomputed Aggregates
+
+Builds and persists the aggregates that dashboards and reports read instead
+of raw workouts: the summary cube, personal records, downsampled
+output-over-time series per discipline, and the most recent rides.
+
+Aggregates are tagged with the dataset version they were built from and are
+refreshed incrementally when the workout store changes.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from datetime import datetime
+import logging
+import os
+import pickle
+
+import pandas as pd
+
+from src import profiling
+from src.analysis.cube import SummaryCube
+from src.analysis.records import PersonalRecords
+from src.analysis.workouts import to_frame
+from src.storage.workout_store import DEFAULT_DATA_DIR, WorkoutStore
+from src.visualization.downsample import downsample_indices
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES_FILE = Path("processed") / "aggregates.pkl"
+
+# Bumped when the cells or records change meaning (2: local workout times),
+# so aggregates built by older code are rebuilt rather than refreshed
+AGGREGATES_SCHEMA = 2
+
+# Points kept per output-over-time series (enough for a 2000 px wide chart)
+SERIES_POINTS = 4000
+
+ROLLING_WINDOW = 30
+
+RECENT_RIDES = 20
+
+
+def aggregates_path(data_dir: Union[str, Path] = DEFAULT_DATA_DIR) -> Path:
+    """Get the path of the aggregates file."""
+    return Path(data_dir) / AGGREGATES_FILE
+
+
+def build_output_series(df: pd.DataFrame, points: int = SERIES_POINTS) -> pd.DataFrame:
+    """
+    Build a downsampled output-over-time series with a rolling average.
+
+    Args:
+        df: Normalized workouts frame (one discipline, or all)
+        points: Point budget for the series
+
+    Returns:
+        DataFrame with created_at, total_work_kj, ride_title and rolling_avg
+    """
+    data = df[df["total_work_kj"] > 0].sort_values("created_at")
+    data = data.assign(
+        rolling_avg=data["total_work_kj"].rolling(window=ROLLING_WINDOW, min_periods=1).mean()
+    )
+
+    x = data["created_at"].to_numpy()
+    # Keep the points that shape either the scatter or the rolling line
+    idx = pd.Index(downsample_indices(x, data["total_work_kj"].to_numpy(), points // 2)).union(
+        pd.Index(downsample_indices(x, data["rolling_avg"].to_numpy(), points // 2))
+    )
+    columns = ["created_at", "total_work_kj", "ride_title", "rolling_avg"]
+    return data.iloc[idx][columns].reset_index(drop=True)
+
+
+def build_aggregates(
+    df: pd.DataFrame,
+    version: str,
+    cube: Optional[SummaryCube] = None,
+    records: Optional[PersonalRecords] = None,
+) -> Dict[str, Any]:
+    """
+    Build all precomputed aggregates from a workouts frame.
+
+    Args:
+        df: Normalized workouts frame
+        version: Dataset version the frame was loaded at
+        cube: Existing cube to refresh incrementally (default: build a new one)
+        records: Existing personal records to update (default: start over)
+
+    Returns:
+        Dictionary with version, built_at, cube, records, new_records
+        (PRs set by workouts added since the previous build), series and
+        recent
+    """
+    ids = set(df["workout_id"].astype(str))
+    with profiling.stage("analysis.cube"):
+        if cube is not None and cube.workout_ids.issubset(ids):
+            cube.refresh(df)
+        else:
+            # Workouts were removed or replaced; incremental refresh isn't exact
+            cube = SummaryCube.build(df)
+            records = None
+
+    with profiling.stage("analysis.records"):
+        if records is not None:
+            new_records = records.update(df)
+        else:
+            # Starting over: PRs found in the history aren't new
+            records = PersonalRecords()
+            records.update(df)
+            new_records = []
+
+    with profiling.stage("analysis.series"):
+        series = {"all": build_output_series(df)}
+        for discipline, group in df.groupby("fitness_discipline"):
+            series[discipline] = build_output_series(group)
+
+    return {
+        "schema": AGGREGATES_SCHEMA,
+        "version": version,
+        "built_at": datetime.now().isoformat(),
+        "cube": cube,
+        "records": records,
+        "new_records": new_records,
+        "series": series,
+        "recent": df.tail(RECENT_RIDES).iloc[::-1].reset_index(drop=True),
+    }
+
+
+def load_aggregates(data_dir: Union[str, Path] = DEFAULT_DATA_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Load the precomputed aggregates.
+
+    Args:
+        data_dir: Data directory
+
+    Returns:
+        Aggregates dictionary, or None if they haven't been built yet
+    """
+    path = aggregates_path(data_dir)
+    if not path.exists():
+        return None
+    with profiling.stage("analysis.load"), open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def save_aggregates(aggregates: Dict[str, Any], data_dir: Union[str, Path] = DEFAULT_DATA_DIR) -> Path:
+    """
+    Save aggregates atomically.
+
+    Args:
+        aggregates: Aggregates dictionary from build_aggregates()
+        data_dir: Data directory
+
+    Returns:
+        Path of the aggregates file
+    """
+    path = aggregates_path(data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with profiling.stage("analysis.save"), open(tmp_path, "wb") as f:
+        pickle.dump(aggregates, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def refresh_aggregates(data_dir: Union[str, Path] = DEFAULT_DATA_DIR, force: bool = False) -> Dict[str, Any]:
+    """
+    Bring the precomputed aggregates up to date with the workout store.
+
+    Does nothing if the aggregates already match the current dataset
+    version; otherwise the existing cube is refreshed incrementally.
+
+    Args:
+        data_dir: Data directory
+        force: Rebuild from scratch even if up to date
+
+    Returns:
+        Current aggregates dictionary
+    """
+    store = WorkoutStore(data_dir)
+    version = store.version
+
+    existing = None if force else load_aggregates(data_dir)
+    if existing is not None and existing.get("schema") != AGGREGATES_SCHEMA:
+        logger.info("Aggregates were built by an older version; rebuilding")
+        existing = None
+    if existing is not None and existing["version"] == version:
+        logger.info("Aggregates are up to date")
+        return existing
+
+    logger.info(f"Refreshing aggregates for data version {version}...")
+    workouts = store.load()
+    with profiling.stage("analysis.to_frame"):
+        df = to_frame(workouts)
+    aggregates = build_aggregates(
+        df,
+        version,
+        cube=existing["cube"] if existing else None,
+        records=existing.get("records") if existing else None,
+    )
+    path = save_aggregates(aggregates, data_dir)
+    logger.info(f"✓ Saved aggregates to {path}")
+    return aggregates
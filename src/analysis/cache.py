@@ -0,0 +1,320 @@
+"""
+Analysis Memoization
+
+Decorator-based caching for expensive analysis functions.
+
+Results are cached in two tiers: an in-memory LRU and an optional on-disk
+LRU of pickled results. Entries are keyed by function identity, arguments
+and the dataset version token maintained by the storage layer, so any write
+to the workout store invalidates previously cached results automatically.
+
+Usage:
+    from src.analysis.cache import memoize
+
+    @memoize
+    def monthly_output(df):
+        ...
+
+    @memoize(disk=True)
+    def power_curve(workout_id):
+        ...
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import threading
+
+from src.storage.workout_store import DEFAULT_DATA_DIR, read_data_version
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _fingerprint(value: Any) -> bytes:
+    """Produce a stable byte fingerprint for a cache key argument."""
+    # DataFrames/Series don't pickle deterministically; hash their contents
+    if hasattr(value, "to_numpy") and hasattr(value, "index"):
+        import pandas as pd
+
+        try:
+            hashed = pd.util.hash_pandas_object(value, index=True)
+        except TypeError:
+            # Unhashable cells (lists/dicts from raw API frames); hash their text
+            hashed = pd.util.hash_pandas_object(value.astype(str), index=True)
+        digest = hashlib.sha256(hashed.values.tobytes())
+        if hasattr(value, "columns"):
+            digest.update(repr(list(value.columns)).encode())
+        return b"pandas:" + digest.digest()
+
+    try:
+        return pickle.dumps(value, protocol=4)
+    except Exception:
+        return repr(value).encode()
+
+
+class AnalysisCache:
+    """Two-tier (memory + disk) LRU cache keyed on the dataset version."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        data_dir: Union[str, Path] = DEFAULT_DATA_DIR,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of results kept in memory
+            cache_dir: Directory for the on-disk tier (default: data/cache/analysis)
+            max_disk_bytes: Maximum total size of the on-disk tier
+            data_dir: Data directory whose version token keys the cache
+        """
+        self.max_entries = max_entries
+        self.data_dir = Path(data_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.data_dir / "cache" / "analysis"
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.RLock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    # Versioning
+
+    def _current_version(self) -> str:
+        """Get the dataset version, dropping stale entries if it changed."""
+        version = read_data_version(self.data_dir)
+        if version != self._version:
+            if self._version is not None:
+                logger.info(f"Data version changed ({self._version} -> {version}); invalidating cache")
+                self._stats["invalidations"] += 1
+            self._memory.clear()
+            self._purge_stale_disk(version)
+            self._version = version
+        return version
+
+    def _purge_stale_disk(self, version: str) -> None:
+        """Remove on-disk entries written for other dataset versions."""
+        if not self.cache_dir.exists():
+            return
+        for entry in self.cache_dir.iterdir():
+            if entry.is_dir() and entry.name != version:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    # Keys
+
+    def make_key(self, func: Callable, args: Tuple, kwargs: Dict[str, Any], version: str) -> str:
+        """
+        Build the cache key for a call.
+
+        Args:
+            func: The memoized function
+            args: Positional arguments
+            kwargs: Keyword arguments
+            version: Dataset version token
+
+        Returns:
+            Hex digest identifying the call
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{func.__module__}.{func.__qualname__}".encode())
+        digest.update(version.encode())
+        for arg in args:
+            digest.update(_fingerprint(arg))
+        for name in sorted(kwargs):
+            digest.update(name.encode())
+            digest.update(_fingerprint(kwargs[name]))
+        return digest.hexdigest()
+
+    # Memory tier
+
+    def _memory_get(self, key: str) -> Any:
+        value = self._memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    # Disk tier
+
+    def _disk_path(self, key: str, version: str) -> Path:
+        return self.cache_dir / version / f"{key}.pkl"
+
+    def _disk_get(self, key: str, version: str) -> Any:
+        path = self._disk_path(key, version)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return _MISSING
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return _MISSING
+
+        # Refresh mtime so eviction is least-recently-used
+        os.utime(path)
+        return value
+
+    def _disk_put(self, key: str, version: str, value: Any) -> None:
+        path = self._disk_path(key, version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Result not picklable, skipping disk cache: {e}")
+            return
+
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        self._evict_disk(version)
+
+    def _evict_disk(self, version: str) -> None:
+        """Delete least-recently-used disk entries beyond max_disk_bytes."""
+        entries = []
+        total = 0
+        for path in (self.cache_dir / version).glob("*.pkl"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self._stats["evictions"] += 1
+
+    # Public API
+
+    def call(self, func: Callable, args: Tuple, kwargs: Dict[str, Any], disk: bool = False) -> Any:
+        """
+        Return the cached result of func(*args, **kwargs), computing it on a miss.
+
+        Args:
+            func: Function to call
+            args: Positional arguments
+            kwargs: Keyword arguments
+            disk: Whether to also use the on-disk tier
+
+        Returns:
+            The (possibly cached) result
+        """
+        with self._lock:
+            version = self._current_version()
+            key = self.make_key(func, args, kwargs, version)
+
+            value = self._memory_get(key)
+            if value is not _MISSING:
+                self._stats["memory_hits"] += 1
+                return value
+
+            if disk:
+                value = self._disk_get(key, version)
+                if value is not _MISSING:
+                    self._stats["disk_hits"] += 1
+                    self._memory_put(key, value)
+                    return value
+
+            self._stats["misses"] += 1
+
+        value = func(*args, **kwargs)
+
+        with self._lock:
+            # Don't cache a result computed against data that changed meanwhile
+            if read_data_version(self.data_dir) == version:
+                self._memory_put(key, value)
+                if disk:
+                    self._disk_put(key, version, value)
+        return value
+
+    def clear(self, disk: bool = True) -> None:
+        """
+        Drop all cached entries.
+
+        Args:
+            disk: Also delete the on-disk tier
+        """
+        with self._lock:
+            self._memory.clear()
+            if disk and self.cache_dir.exists():
+                shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit-rate statistics.
+
+        Returns:
+            Dictionary of hit/miss/eviction counts, hit rate and entry count
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            return stats
+
+
+default_cache = AnalysisCache()
+
+
+def memoize(
+    func: Optional[Callable] = None,
+    *,
+    cache: Optional[AnalysisCache] = None,
+    disk: bool = False,
+) -> Callable:
+    """
+    Memoize an analysis function on its arguments and the dataset version.
+
+    Can be used bare (``@memoize``) or with options (``@memoize(disk=True)``).
+    The wrapped function gains ``cache_stats()`` and ``cache_clear()``
+    helpers that operate on its cache. Cached results are shared between
+    callers, so treat them as read-only.
+
+    Args:
+        func: Function to wrap
+        cache: Cache to use (default: module-level default_cache)
+        disk: Also persist results in the on-disk tier
+
+    Returns:
+        Wrapped function
+    """
+    def decorator(fn: Callable) -> Callable:
+        target = cache or default_cache
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return target.call(fn, args, kwargs, disk=disk)
+
+        wrapper.cache_stats = target.stats
+        wrapper.cache_clear = target.clear
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -0,0 +1,326 @@
+"""
+Summary Cube
+
+Precomputed OLAP-style aggregates over the workout history.
+
+The cube stores one cell per combination of instructor, discipline, class
+length, month and hour-of-day, holding count/sum/min/max of each measure.
+Every roll-up or slice (e.g. "mean output by instructor for cycling in 2024")
+is answered by combining cells, without touching raw workouts. Means are
+derived from sum and count so that cells can be merged exactly.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Union
+import logging
+import pickle
+
+import pandas as pd
+
+from src.analysis.cache import memoize
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ("instructor", "discipline", "class_length", "month", "hour")
+
+# Cube measure -> column in the normalized workouts frame
+MEASURES = {
+    "output_kj": "total_work_kj",
+    "calories": "calories",
+    "duration_minutes": "duration_minutes",
+}
+
+# Stats stored per measure; "mean" is derived at query time
+STORED_STATS = ("count", "sum", "min", "max")
+STATS = ("count", "sum", "mean", "min", "max")
+
+# How each stored stat combines when cells are merged
+_COMBINE = {"count": "sum", "sum": "sum", "min": "min", "max": "max"}
+
+
+def _stat_columns() -> List[str]:
+    return [f"{m}_{s}" for m in MEASURES for s in STORED_STATS]
+
+
+def _combine_spec() -> Dict[str, str]:
+    spec = {"workouts": "sum"}
+    for measure in MEASURES:
+        for stat in STORED_STATS:
+            spec[f"{measure}_{stat}"] = _COMBINE[stat]
+    return spec
+
+
+def _dimension_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Derive the cube dimensions from a normalized workouts frame."""
+    created_at = pd.to_datetime(df["created_at"])
+    return pd.DataFrame({
+        "instructor": df["instructor_name"].fillna("Unknown"),
+        "discipline": df["fitness_discipline"].fillna("Unknown"),
+        "class_length": df["duration_minutes"].round().fillna(0).astype(int),
+        "month": created_at.dt.strftime("%Y-%m").fillna("Unknown"),
+        "hour": created_at.dt.hour.fillna(-1).astype(int),
+    }, index=df.index)
+
+
+def _build_cells(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate a normalized workouts frame into cube cells."""
+    if df.empty:
+        return pd.DataFrame(columns=list(DIMENSIONS) + ["workouts"] + _stat_columns())
+
+    frame = _dimension_frame(df)
+    for measure, column in MEASURES.items():
+        frame[measure] = df[column]
+
+    aggregations = {"workouts": (next(iter(MEASURES)), "size")}
+    for measure in MEASURES:
+        for stat in STORED_STATS:
+            aggregations[f"{measure}_{stat}"] = (measure, stat)
+
+    cells = frame.groupby(list(DIMENSIONS), sort=False).agg(**aggregations)
+    return cells.reset_index()
+
+
+def _combine(cells: pd.DataFrame, by: Sequence[str]) -> pd.DataFrame:
+    """Merge cells along the given dimensions (all others are rolled up)."""
+    spec = _combine_spec()
+
+    # One reduction per combine function; agg(dict) pays per-column overhead
+    reductions = {how: [col for col, c in spec.items() if c == how] for how in ("sum", "min", "max")}
+    if not by:
+        parts = [getattr(cells[cols], how)() for how, cols in reductions.items()]
+        return pd.concat(parts).to_frame().T[list(spec)].infer_objects().reset_index(drop=True)
+
+    grouped = cells.groupby(list(by), sort=True)
+    parts = [getattr(grouped[cols], how)() for how, cols in reductions.items()]
+    return pd.concat(parts, axis=1)[list(spec)].reset_index()
+
+
+class SummaryCube:
+    """Precomputed aggregates over (instructor, discipline, length, month, hour)."""
+
+    def __init__(
+        self,
+        cells: Optional[pd.DataFrame] = None,
+        workout_ids: Optional[Set[str]] = None,
+        dimensions: Sequence[str] = DIMENSIONS,
+    ):
+        """
+        Initialize the cube.
+
+        Args:
+            cells: Precomputed cells (as produced by build())
+            workout_ids: IDs of the workouts already counted in the cells
+            dimensions: Dimensions the cells are keyed on (a subset of
+                        DIMENSIONS for projected cubes)
+        """
+        self.cells = cells if cells is not None else _build_cells(pd.DataFrame())
+        # Sets are shared, not copied, so slices and projections stay cheap
+        self.workout_ids: Set[str] = workout_ids if isinstance(workout_ids, set) else set(workout_ids or ())
+        self.dimensions = tuple(dimensions)
+
+    def _check_dimensions(self, dims: Iterable[str]) -> None:
+        unknown = [d for d in dims if d not in self.dimensions]
+        if unknown:
+            raise ValueError(f"Unknown dimension(s): {', '.join(unknown)}")
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "SummaryCube":
+        """
+        Build a cube from a normalized workouts frame.
+
+        Args:
+            df: DataFrame as returned by src.analysis.workouts.to_frame()
+
+        Returns:
+            SummaryCube over all workouts in df
+        """
+        df = df.drop_duplicates(subset="workout_id")
+        logger.info(f"Building summary cube from {len(df)} workouts...")
+        cube = cls(_build_cells(df), set(df["workout_id"].astype(str)))
+        logger.info(f"Summary cube has {len(cube.cells)} cells")
+        return cube
+
+    def refresh(self, df: pd.DataFrame) -> int:
+        """
+        Incrementally add workouts that are not yet in the cube.
+
+        Args:
+            df: Normalized workouts frame (may include already-counted workouts)
+
+        Returns:
+            Number of workouts added
+        """
+        if self.dimensions != DIMENSIONS:
+            raise ValueError("Only full cubes can be refreshed; refresh before projecting")
+
+        ids = df["workout_id"].astype(str)
+        new = df[~ids.isin(self.workout_ids)].drop_duplicates(subset="workout_id")
+        if new.empty:
+            return 0
+
+        merged = pd.concat([self.cells, _build_cells(new)], ignore_index=True)
+        self.cells = _combine(merged, DIMENSIONS)
+        self.workout_ids.update(new["workout_id"].astype(str))
+        logger.info(f"Added {len(new)} workouts to summary cube")
+        return len(new)
+
+    def slice(self, **filters: Any) -> "SummaryCube":
+        """
+        Restrict the cube to cells matching the given dimension values.
+
+        Each filter is a single value or an iterable of accepted values, e.g.
+        ``cube.slice(discipline="cycling", month=["2024-01", "2024-02"])``.
+
+        Returns:
+            New SummaryCube over the matching cells
+        """
+        self._check_dimensions(filters)
+        mask = pd.Series(True, index=self.cells.index)
+        for dim, value in filters.items():
+            if isinstance(value, Iterable) and not isinstance(value, str):
+                mask &= self.cells[dim].isin(list(value))
+            else:
+                mask &= self.cells[dim] == value
+        return SummaryCube(self.cells[mask].reset_index(drop=True), self.workout_ids, self.dimensions)
+
+    def project(self, *dims: str) -> "SummaryCube":
+        """
+        Roll the cube up to a subset of its dimensions.
+
+        A projection has far fewer cells, so it answers repeated slices and
+        roll-ups over those dimensions faster (e.g. a dashboard that only
+        filters by discipline and month).
+
+        Args:
+            *dims: Dimensions to keep
+
+        Returns:
+            New SummaryCube keyed on dims
+        """
+        self._check_dimensions(dims)
+        return SummaryCube(_combine(self.cells, dims), self.workout_ids, dims)
+
+    def rollup(
+        self,
+        by: Union[str, Sequence[str]] = (),
+        measures: Optional[Sequence[str]] = None,
+        stats: Sequence[str] = STATS,
+    ) -> pd.DataFrame:
+        """
+        Aggregate the cube along the given dimensions.
+
+        Args:
+            by: Dimension(s) to keep; all others are rolled up
+            measures: Measures to report (default: all of MEASURES)
+            stats: Stats to report per measure (any of STATS)
+
+        Returns:
+            DataFrame with one row per group, a ``workouts`` column and
+            ``<measure>_<stat>`` columns
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        self._check_dimensions(by)
+        measures = list(measures) if measures is not None else list(MEASURES)
+
+        result = _combine(self.cells, by)
+        columns = by + ["workouts"]
+        for measure in measures:
+            if "mean" in stats:
+                count = result[f"{measure}_count"].astype(float)
+                result[f"{measure}_mean"] = result[f"{measure}_sum"] / count.where(count > 0)
+            columns += [f"{measure}_{stat}" for stat in stats]
+
+        return result[columns]
+
+    def top(self, by: str, n: int = 10, sort_by: str = "workouts") -> pd.DataFrame:
+        """
+        Return the top N groups along one dimension.
+
+        Args:
+            by: Dimension to group by (e.g. "instructor")
+            n: Number of groups to return
+            sort_by: Column to sort on (default: workout count)
+
+        Returns:
+            DataFrame of the top N groups
+        """
+        return self.rollup(by).nlargest(n, sort_by).reset_index(drop=True)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Save the cube to disk.
+
+        Args:
+            path: Output file path
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump({"cells": self.cells, "workout_ids": self.workout_ids, "dimensions": self.dimensions}, f)
+        logger.info(f"Saved summary cube to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SummaryCube":
+        """
+        Load a cube saved with save().
+
+        Args:
+            path: Cube file path
+
+        Returns:
+            SummaryCube
+        """
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        return cls(state["cells"], state["workout_ids"], state.get("dimensions", DIMENSIONS))
+
+    def __len__(self) -> int:
+        """Number of workouts counted in the cube."""
+        return int(self.cells["workouts"].sum()) if not self.cells.empty else 0
+
+
+@memoize
+def summary_cube(df: pd.DataFrame) -> SummaryCube:
+    """
+    Build (or fetch the cached) summary cube for a workouts frame.
+
+    For notebooks and reports; the result is shared between callers, so
+    don't refresh() it. The sync pipeline keeps its own cube in aggregates.
+
+    Args:
+        df: Normalized workouts frame (see src.analysis.workouts.to_frame)
+
+    Returns:
+        SummaryCube
+    """
+    return SummaryCube.build(df)
+
+
+@memoize
+def summary_rollup(
+    df: pd.DataFrame,
+    by: Union[str, Sequence[str]] = (),
+    measures: Optional[Sequence[str]] = None,
+    **filters: Any,
+) -> pd.DataFrame:
+    """
+    Cached roll-up of a workouts frame, optionally sliced first.
+
+    The cube is projected onto the grouped and filtered dimensions before
+    slicing, e.g. ``summary_rollup(df, "month", discipline="cycling")``.
+
+    Args:
+        df: Normalized workouts frame
+        by: Dimension(s) to keep
+        measures: Measures to report (default: all of MEASURES)
+        **filters: Dimension filters, as for SummaryCube.slice()
+
+    Returns:
+        DataFrame as returned by SummaryCube.rollup()
+    """
+    keep = [by] if isinstance(by, str) else list(by)
+    dims = [dim for dim in DIMENSIONS if dim in keep or dim in filters]
+    cube = summary_cube(df).project(*dims)
+    if filters:
+        cube = cube.slice(**filters)
+    return cube.rollup(by, measures)
@@ -0,0 +1,120 @@
+"""
+Personal Records
+
+Tracks the best total output per discipline and class length, plus the
+history of every PR set along the way.
+
+Updates are incremental and idempotent: feeding the full workouts frame
+again only reports workouts that beat the stored bests, so records can be
+refreshed on every sync without rescanning history row by row.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.cache import memoize
+
+logger = logging.getLogger(__name__)
+
+# Column a PR is measured on
+MEASURE = "total_work_kj"
+
+RecordKey = Tuple[str, int]
+
+
+class PersonalRecords:
+    """Best output per (discipline, class length in minutes)."""
+
+    def __init__(
+        self,
+        best: Optional[Dict[RecordKey, Dict[str, Any]]] = None,
+        history: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """
+        Initialize the records.
+
+        Args:
+            best: Current record per (discipline, class length)
+            history: Every PR in the order it was set
+        """
+        self.best = best or {}
+        self.history = history or []
+
+    def update(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Add workouts, recording any that set a new PR.
+
+        Args:
+            df: Normalized workouts frame (new workouts or the full history)
+
+        Returns:
+            New PRs, oldest first
+        """
+        # PRs are per class length, so rows without one (blank CSV length) can't set any
+        data = df[df[MEASURE] > 0].dropna(subset=["created_at", "fitness_discipline", "duration_minutes"])
+        if data.empty:
+            return []
+        data = data.sort_values("created_at", kind="stable")
+
+        keys = [data["fitness_discipline"], data["duration_minutes"].round().astype(int)]
+
+        # Best value before each row: earlier rows in this frame, or the stored record
+        running = data.groupby(keys)[MEASURE].cummax()
+        earlier = running.groupby(keys).shift().to_numpy(dtype=float)
+        stored = pd.Series(
+            {key: record["value"] for key, record in self.best.items()}, dtype=float
+        )
+        index = pd.MultiIndex.from_arrays(keys)
+        stored = stored.reindex(index).to_numpy() if len(stored) else np.full(len(data), np.nan)
+        before = np.fmax(earlier, stored)
+
+        values = data[MEASURE].to_numpy(dtype=float)
+        is_pr = np.isnan(before) | (values > before)
+
+        new_records = []
+        for row, previous in zip(data[is_pr].itertuples(index=False), before[is_pr]):
+            key = (row.fitness_discipline, int(round(row.duration_minutes)))
+            record = {
+                "discipline": key[0],
+                "duration_minutes": key[1],
+                "value": float(getattr(row, MEASURE)),
+                "previous": None if np.isnan(previous) else float(previous),
+                "workout_id": row.workout_id,
+                "created_at": row.created_at,
+                "ride_title": row.ride_title,
+            }
+            self.best[key] = record
+            self.history.append(record)
+            new_records.append(record)
+
+        if new_records:
+            logger.debug(f"{len(new_records)} new personal records")
+        return new_records
+
+    def to_frame(self) -> pd.DataFrame:
+        """Current records as a DataFrame, by discipline and class length."""
+        columns = ["discipline", "duration_minutes", "value", "previous", "workout_id", "created_at", "ride_title"]
+        frame = pd.DataFrame(list(self.best.values()), columns=columns)
+        return frame.sort_values(["discipline", "duration_minutes"]).reset_index(drop=True)
+
+    def __len__(self) -> int:
+        return len(self.best)
+
+
+@memoize
+def personal_records(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Current personal records for a workouts frame, computed from scratch.
+
+    Args:
+        df: Normalized workouts frame
+
+    Returns:
+        DataFrame as returned by PersonalRecords.to_frame()
+    """
+    records = PersonalRecords()
+    records.update(df)
+    return records.to_frame()
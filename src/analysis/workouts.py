@@ -0,0 +1,155 @@
+"""
+Workout DataFrame Helpers
+
+Normalizes stored workout records into a flat DataFrame for analysis.
+
+Both storage shapes are supported: raw API workouts (as written by
+``scripts/fetch_all_workouts.py``) and rows converted from the official
+CSV export (as written by ``scripts/import_csv.py``).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Union
+import json
+import logging
+
+import pandas as pd
+
+from src.analysis.cache import memoize
+from src.storage.workout_store import FORMAT_CSV, record_format
+
+logger = logging.getLogger(__name__)
+
+# Columns produced by to_frame(), in order
+COLUMNS = [
+    "workout_id",
+    "created_at",
+    "fitness_discipline",
+    "instructor_name",
+    "ride_title",
+    "duration_minutes",
+    "total_work_kj",
+    "calories",
+]
+
+# CSV export column -> normalized column
+CSV_COLUMNS = {
+    "Workout Timestamp": "created_at",
+    "Fitness Discipline": "fitness_discipline",
+    "Instructor Name": "instructor_name",
+    "Title": "ride_title",
+    "Length (minutes)": "duration_minutes",
+    "Total Output": "total_work_kj",
+    "Calories Burned": "calories",
+}
+
+
+def _is_csv_record(record: Dict[str, Any]) -> bool:
+    """Check whether a record came from the CSV export."""
+    return record_format(record) == FORMAT_CSV
+
+
+def _flatten_api_workout(workout: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a raw API workout (with ride and instructor joins)."""
+    ride = workout.get("ride") or {}
+    instructor = ride.get("instructor") or {}
+    total_work = workout.get("total_work")
+
+    return {
+        "workout_id": workout.get("id"),
+        "created_at": workout.get("created_at"),
+        "timezone": workout.get("timezone"),
+        "fitness_discipline": ride.get("fitness_discipline") or workout.get("fitness_discipline"),
+        "instructor_name": instructor.get("name"),
+        "ride_title": ride.get("title"),
+        "duration_minutes": (ride.get("duration") or 0) / 60,
+        "total_work_kj": total_work / 1000 if total_work is not None else None,
+        "calories": workout.get("calories"),
+    }
+
+
+def _csv_timestamps(values: pd.Series) -> pd.Series:
+    """Parse CSV export timestamps such as '2024-01-05 07:00 (EST)'."""
+    stripped = values.astype(str).str.replace(r"\s*\(.*\)$", "", regex=True)
+    return pd.to_datetime(stripped, errors="coerce")
+
+
+def _api_timestamps(seconds: pd.Series, zones: pd.Series) -> pd.Series:
+    """
+    Convert API epoch seconds to naive local time in each workout's timezone.
+
+    CSV export timestamps are local wall-clock times, so API workouts are
+    brought onto the same footing. Workouts without a (known) timezone keep
+    UTC wall-clock time.
+    """
+    utc = pd.to_datetime(seconds, unit="s", errors="coerce", utc=True)
+    local = utc.dt.tz_localize(None)
+    for zone, index in zones.groupby(zones).groups.items():
+        try:
+            local[index] = utc[index].dt.tz_convert(zone).dt.tz_localize(None)
+        except KeyError:
+            logger.warning(f"Unknown timezone {zone!r}; keeping UTC for {len(index)} workouts")
+    return local
+
+
+def to_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Convert stored workout records into a normalized DataFrame.
+
+    Args:
+        records: Raw API workouts or CSV export rows
+
+    Returns:
+        DataFrame with the columns in COLUMNS, sorted by created_at
+    """
+    if not records:
+        return pd.DataFrame(columns=COLUMNS)
+
+    if _is_csv_record(records[0]):
+        df = pd.DataFrame.from_records(records).rename(columns=CSV_COLUMNS)
+        df["created_at"] = _csv_timestamps(df["created_at"])
+        unparsed = df["created_at"].isna()
+        if unparsed.any():
+            # Without a timestamp a row has no id and would collide with others
+            logger.warning(f"Dropping {int(unparsed.sum())} CSV rows with unparseable timestamps")
+            df = df[~unparsed].reset_index(drop=True)
+        if "workout_id" not in df.columns:
+            # The CSV export has no ids; the timestamp is unique per workout
+            df["workout_id"] = df["created_at"].astype(str)
+    else:
+        df = pd.DataFrame.from_records([_flatten_api_workout(w) for w in records])
+        df["created_at"] = _api_timestamps(df["created_at"], df["timezone"])
+
+    for col in COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+
+    for col in ("duration_minutes", "total_work_kj", "calories"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df = df[COLUMNS].sort_values("created_at").reset_index(drop=True)
+    return df
+
+
+def load_workouts_frame(path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Load a workouts JSON file into a normalized DataFrame.
+
+    Args:
+        path: Path to a workouts JSON file (e.g. data/raw/workouts_latest.json)
+
+    Returns:
+        DataFrame with the columns in COLUMNS (cached; don't modify it)
+    """
+    # Key on the file's mtime and size too, so files outside the data dir
+    # (whose version token keys the cache) are reloaded when they change
+    stat = Path(path).stat()
+    return _load_workouts_frame(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@memoize
+def _load_workouts_frame(path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    logger.info(f"Loading workouts from {path}...")
+    with open(path) as f:
+        records = json.load(f)
+    return to_frame(records)
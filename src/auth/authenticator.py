@@ -5,9 +5,13 @@ Handles authentication with the Peloton API and session management.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict, Any
 import logging
 
+from src import profiling
+from src.config import DEFAULT_TIMEOUT
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,16 +21,27 @@ class PelotonAuthenticator:
     BASE_URL = "https://api.onepeloton.com"
     AUTH_ENDPOINT = f"{BASE_URL}/auth/login"
 
-    def __init__(self, username: str, password: str):
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        base_url: Optional[str] = None,
+        adapter: Optional[HTTPAdapter] = None,
+    ):
         """
         Initialize the authenticator.
 
         Args:
             username: Peloton username or email
             password: Peloton password
+            base_url: API base URL (default: BASE_URL)
+            adapter: Transport adapter to mount on the session, so several
+                     authenticators can share one connection pool
         """
         self.username = username
         self.password = password
+        self.auth_endpoint = f"{base_url}/auth/login" if base_url else self.AUTH_ENDPOINT
+        self.adapter = adapter
         self.session: Optional[requests.Session] = None
         self.user_id: Optional[str] = None
         self._authenticated = False
@@ -39,7 +54,15 @@ class PelotonAuthenticator:
             True if authentication successful, False otherwise
         """
         try:
-            self.session = requests.Session()
+            if self.session is None:
+                self.session = requests.Session()
+                if self.adapter is not None:
+                    self.session.mount("https://", self.adapter)
+                    self.session.mount("http://", self.adapter)
+            else:
+                # Logging in again (e.g. the session expired): keep the
+                # connection pool, drop the old credentials
+                self.session.cookies.clear()
 
             payload = {
                 'username_or_email': self.username,
@@ -52,7 +75,9 @@ class PelotonAuthenticator:
             }
 
             logger.info("Attempting to authenticate with Peloton API...")
-            response = self.session.post(self.AUTH_ENDPOINT, json=payload, headers=headers)
+            with profiling.stage("auth.login"):
+                response = self.session.post(self.auth_endpoint, json=payload, headers=headers,
+                                             timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
 
             data = response.json()
@@ -110,6 +135,9 @@ class PelotonAuthenticator:
     def logout(self) -> None:
         """Clear the session and authentication state."""
         if self.session:
+            if self.adapter is not None:
+                # The adapter's pool is shared with other sessions; keep it open
+                self.session.adapters.clear()
             self.session.close()
             self.session = None
         self._authenticated = False
@@ -0,0 +1,429 @@
+"""
+Peloton Command Line Interface
+
+One entry point for the pipeline, with subcommands:
+
+    sync           Fetch new workouts from the API (incremental)
+    daemon         Keep syncing on a schedule over one long-lived session
+    sync-accounts  Sync many accounts over a shared pool and rate budget
+    import         Import the official CSV export
+    harvest        Fetch performance graphs for stored workouts
+    report         Render weekly/monthly reports
+    export         Export performance graphs as FIT/TCX files
+    archive        Inspect or compact the raw response archive
+    dashboard      Launch the Streamlit dashboard
+
+Subcommand implementations import their dependencies (pandas, numpy,
+matplotlib, requests, ...) only when invoked, so ``peloton --help`` and
+argument errors return immediately. Keep module-level imports in this file
+limited to the standard library.
+
+Any subcommand can be profiled with ``--profile``: stage timings, CPU time
+and peak RSS are printed and written as JSON under ``<data-dir>/profiles``;
+``--profile-stage`` adds cProfile and tracemalloc detail for one stage.
+
+Usage:
+    scripts/peloton sync
+    python -m src report --period month
+    scripts/peloton --profile --profile-stage api.pagination sync
+"""
+
+from contextlib import nullcontext
+from typing import List, Optional
+import argparse
+import logging
+import os
+import sys
+
+from src import __version__
+
+logger = logging.getLogger("peloton")
+
+
+def _data_dir(args: argparse.Namespace):
+    from pathlib import Path
+
+    from src.storage.workout_store import DEFAULT_DATA_DIR
+
+    return Path(args.data_dir) if args.data_dir else DEFAULT_DATA_DIR
+
+
+def _archive(args: argparse.Namespace):
+    """Open the response archive if --archive was given."""
+    if not args.archive:
+        return None
+    from src.storage.response_archive import ResponseArchive
+
+    return ResponseArchive(_data_dir(args))
+
+
+def _connect(args: argparse.Namespace):
+    """Create and connect a PelotonClient from the common API options."""
+    from src.extraction.peloton import PelotonClient
+
+    client = PelotonClient(cassette=args.record or args.replay, replay=bool(args.replay),
+                           archive=_archive(args))
+    if not client.connect():
+        raise RuntimeError("Failed to connect. Check your credentials.")
+    return client
+
+
+def cmd_sync(args: argparse.Namespace) -> int:
+    """Fetch new workouts and refresh aggregates."""
+    from src.extraction.sync import sync_workouts
+    from src.storage.workout_store import WorkoutStore
+
+    store = WorkoutStore(_data_dir(args))
+    client = _connect(args)
+    try:
+        added = sync_workouts(client, store, full=args.full)
+    finally:
+        client.disconnect()
+
+    logger.info(f"✓ Sync complete: {added} new workouts")
+    return 0
+
+
+def cmd_daemon(args: argparse.Namespace) -> int:
+    """Run the sync daemon, or report its health."""
+    import json
+
+    from src.extraction.daemon import SyncDaemon, is_healthy, read_health
+
+    data_dir = _data_dir(args)
+    if args.status:
+        health = read_health(data_dir)
+        if health is None:
+            print("Sync daemon has not run")
+            return 1
+        health.pop("recent_ticks", None)
+        print(json.dumps(health, indent=2))
+        return 0 if is_healthy(health) else 1
+
+    from src.extraction.peloton import PelotonClient
+
+    client = PelotonClient(cassette=args.record or args.replay, replay=bool(args.replay),
+                           archive=_archive(args))
+    daemon = SyncDaemon(
+        client,
+        data_dir,
+        interval=args.interval,
+        jitter=args.jitter,
+        harvest=args.harvest,
+        isolate_analysis=not args.in_process,
+        keep_snapshots=args.keep_snapshots,
+    )
+    return daemon.run(max_ticks=args.max_ticks)
+
+
+def cmd_sync_accounts(args: argparse.Namespace) -> int:
+    """Sync several accounts and report throughput and latency."""
+    from src.extraction.accounts import MultiAccountSync, load_accounts
+
+    accounts = load_accounts(args.accounts)
+    orchestrator = MultiAccountSync(
+        accounts,
+        _data_dir(args),
+        rate=args.rate,
+        max_workers=args.workers,
+        full=args.full,
+    )
+    report = orchestrator.run()
+
+    print(f"{'account':<20} {'added':>7} {'requests':>9} {'p50 ms':>8} {'p95 ms':>8} {'wait ms':>8}  status")
+    for a in report["accounts"]:
+        print(
+            f"{a['account']:<20} {a['workouts_added']:>7} {a['requests']:>9} "
+            f"{a['latency_ms_p50'] or 0:>8.1f} {a['latency_ms_p95'] or 0:>8.1f} "
+            f"{a['wait_ms_mean'] or 0:>8.1f}  {'ok' if a['ok'] else a['error']}"
+        )
+    print(
+        f"\n{report['requests']} requests in {report['seconds']:.1f}s "
+        f"({report['requests_per_second'] or 0:.1f}/s), {report['workouts_added']} workouts added"
+    )
+    return 1 if report["failed"] else 0
+
+
+def cmd_import(args: argparse.Namespace) -> int:
+    """Import a CSV export into the data directory."""
+    from src.analysis.aggregates import refresh_aggregates
+    from src.extraction.csv_import import import_csv, print_summary, save_processed_data
+
+    data_dir = _data_dir(args)
+    df = import_csv(args.csv)
+    print_summary(df)
+    save_processed_data(df, data_dir / "raw")
+    refresh_aggregates(data_dir)
+
+    logger.info("✓ Import complete!")
+    return 0
+
+
+def cmd_harvest(args: argparse.Namespace) -> int:
+    """Fetch performance graphs for stored workouts that lack one."""
+    from src.extraction.sync import harvest_graphs, missing_graphs
+    from src.storage.performance_store import PerformanceGraphStore
+    from src.storage.workout_store import WorkoutStore
+
+    data_dir = _data_dir(args)
+    store = WorkoutStore(data_dir)
+    if args.workout_ids:
+        workout_ids = args.workout_ids
+    else:
+        disciplines = None if args.all_disciplines else ("cycling",)
+        workout_ids = missing_graphs(store, PerformanceGraphStore(data_dir), disciplines)
+    if args.limit:
+        workout_ids = workout_ids[: args.limit]
+
+    if not workout_ids:
+        logger.info("No performance graphs to fetch")
+        return 0
+
+    logger.info(f"Fetching {len(workout_ids)} performance graphs...")
+    client = _connect(args)
+    try:
+        result = harvest_graphs(
+            client, workout_ids, data_dir, every_n=args.every_n, overwrite=args.overwrite
+        )
+    finally:
+        client.disconnect()
+    return 1 if result["failed"] else 0
+
+
+def cmd_report(args: argparse.Namespace) -> int:
+    """Render changed weekly/monthly reports."""
+    from src.visualization.reports import PERIODS, ReportBuilder
+
+    builder = ReportBuilder(_data_dir(args), output_dir=args.output_dir, max_workers=args.workers)
+    result = builder.build(periods=args.period or PERIODS, force=args.force)
+    return 1 if result["failed"] else 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """Export stored performance graphs as FIT/TCX files."""
+    from src.export.exporter import GraphExporter
+
+    formats = [fmt for fmt in args.format.split(",") if fmt]
+    exporter = GraphExporter(_data_dir(args), output_dir=args.output_dir, formats=formats,
+                             max_workers=args.workers)
+    result = exporter.export(args.workout_ids or None, force=args.force)
+    return 1 if result["failed"] else 0
+
+
+def cmd_archive(args: argparse.Namespace) -> int:
+    """Show archive statistics, print a stored response, or compact the archive."""
+    import json
+
+    from src.storage.response_archive import ResponseArchive
+
+    # Stats and --get don't write, so they're safe alongside a running daemon
+    readonly = not (args.compact or args.rebuild_index)
+    try:
+        archive = ResponseArchive(_data_dir(args), readonly=readonly)
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    with archive:
+        if args.get:
+            body = archive.get(args.get, args.endpoint)
+            if body is None:
+                print(f"No archived {args.endpoint} response for {args.get}", file=sys.stderr)
+                return 1
+            sys.stdout.write(body.decode() + "\n")
+            return 0
+
+        if args.rebuild_index:
+            archive.rebuild_index()
+        if args.compact:
+            archive.compact()
+
+        stats = archive.stats()
+        print(f"{'endpoint':<28} {'records':>9} {'raw MB':>9} {'stored MB':>10} {'ratio':>6}")
+        for endpoint, e in stats["endpoints"].items():
+            print(f"{endpoint:<28} {e['records']:>9} {e['raw_bytes'] / 2**20:>9.1f} "
+                  f"{e['stored_bytes'] / 2**20:>10.1f} {e['ratio'] or 0:>6.1f}")
+        print(f"\n{stats['records']} records, {stats['file_bytes'] / 2**20:.1f} MB on disk "
+              f"({stats['codec']}, {stats['dictionaries']} dictionaries), overall ratio {stats['ratio'] or 0:.1f}x")
+        if args.verbose:
+            print(json.dumps(stats, indent=2))
+    return 0
+
+
+def cmd_dashboard(args: argparse.Namespace) -> int:
+    """Run the Streamlit dashboard."""
+    from pathlib import Path
+    import subprocess
+
+    app = Path(__file__).resolve().parent / "visualization" / "dashboard.py"
+    env = dict(os.environ)
+    if args.data_dir:
+        env["PELOTON_DATA_DIR"] = str(Path(args.data_dir).resolve())
+
+    command = [sys.executable, "-m", "streamlit", "run", str(app), *args.streamlit_args]
+    return subprocess.call(command, env=env)
+
+
+def _profiled(args: argparse.Namespace):
+    """Profile the command if --profile or --profile-stage was given."""
+    if args.profile is None and not args.profile_stage:
+        return nullcontext()
+    from src.profiling import profile_run, report_path
+
+    report = args.profile or report_path(_data_dir(args) / "profiles", args.command)
+    return profile_run(args.command, report, detail=args.profile_stage)
+
+
+def _add_api_options(parser: argparse.ArgumentParser) -> None:
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", metavar="CASSETTE", help="Record API responses into a cassette")
+    mode.add_argument("--replay", metavar="CASSETTE", help="Replay API responses from a cassette (offline)")
+    parser.add_argument("--archive", action="store_true",
+                        help="Keep raw workout and performance graph responses in <data-dir>/archive")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser (cheap: no subcommand code is imported)."""
+    parser = argparse.ArgumentParser(prog="peloton", description="Peloton ride data pipeline.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument("--data-dir", default=os.getenv("PELOTON_DATA_DIR"),
+                        help="Data directory (default: $PELOTON_DATA_DIR or <repo>/data)")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-v", "--verbose", action="store_true", help="Show debug logging")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="Only show warnings and errors")
+    parser.add_argument("--profile", nargs="?", const="", metavar="REPORT",
+                        help="Time pipeline stages and write a profile report "
+                             "(default: <data-dir>/profiles/<command>-<time>.json)")
+    parser.add_argument("--profile-stage", action="append", default=[], metavar="STAGE",
+                        help="Also run cProfile and tracemalloc for this stage "
+                             "(e.g. api.pagination, csv.read_csv; repeatable; implies --profile)")
+
+    subparsers = parser.add_subparsers(dest="command", metavar="<command>")
+
+    sync = subparsers.add_parser("sync", help="Fetch new workouts from the API",
+                                 description="Fetch workouts newer than the newest stored one.")
+    sync.add_argument("--full", action="store_true", help="Re-fetch the whole history")
+    _add_api_options(sync)
+    sync.set_defaults(func=cmd_sync)
+
+    daemon = subparsers.add_parser("daemon", help="Keep syncing on a schedule",
+                                   description="Poll for new workouts over one long-lived session, "
+                                               "refreshing aggregates and PRs as they arrive. "
+                                               "Stops cleanly on SIGTERM/SIGINT.")
+    daemon.add_argument("--status", action="store_true",
+                        help="Print the running daemon's health and exit (non-zero if unhealthy)")
+    daemon.add_argument("--interval", type=float, default=900,
+                        help="Mean seconds between polls (default: %(default)s)")
+    daemon.add_argument("--jitter", type=float, default=0.2,
+                        help="Random spread of each delay, as a fraction (default: %(default)s)")
+    daemon.add_argument("--harvest", type=int, default=0, metavar="N",
+                        help="Also fetch up to N missing performance graphs per poll")
+    daemon.add_argument("--in-process", action="store_true",
+                        help="Refresh aggregates in the daemon process instead of a worker")
+    daemon.add_argument("--keep-snapshots", type=int, default=5, metavar="N",
+                        help="Timestamped workout snapshots to keep in data/raw, 0 for all (default: %(default)s)")
+    daemon.add_argument("--max-ticks", type=int, help=argparse.SUPPRESS)
+    _add_api_options(daemon)
+    daemon.set_defaults(func=cmd_daemon)
+
+    accounts = subparsers.add_parser("sync-accounts", help="Sync many accounts at once",
+                                     description="Sync every account in a JSON credentials file over "
+                                                 "a shared connection pool and global rate budget. "
+                                                 "Each account's data goes to <data-dir>/accounts/<name>/.")
+    accounts.add_argument("accounts", help="Accounts JSON file (name, username, password or password_env)")
+    accounts.add_argument("--rate", type=float, default=5.0,
+                          help="Global request budget in requests/s (default: %(default)s)")
+    accounts.add_argument("--workers", type=int, default=8,
+                          help="Accounts synced concurrently (default: %(default)s)")
+    accounts.add_argument("--full", action="store_true", help="Re-fetch whole histories")
+    accounts.set_defaults(func=cmd_sync_accounts)
+
+    imp = subparsers.add_parser("import", help="Import the official CSV export",
+                                description="Import workouts from the CSV downloaded at "
+                                            "https://members.onepeloton.com/profile/workouts")
+    imp.add_argument("csv", help="Path to the workouts CSV")
+    imp.set_defaults(func=cmd_import)
+
+    harvest = subparsers.add_parser("harvest", help="Fetch performance graphs for stored workouts",
+                                    description="Fetch full-detail performance graphs for stored "
+                                                "workouts that don't have one yet.")
+    harvest.add_argument("workout_ids", nargs="*", metavar="WORKOUT_ID",
+                         help="Specific workouts (default: all cycling workouts missing a graph)")
+    harvest.add_argument("--limit", type=int, help="Fetch at most this many graphs")
+    harvest.add_argument("--every-n", type=int, default=1, help="Sampling interval in seconds (default: 1)")
+    harvest.add_argument("--overwrite", action="store_true", help="Re-fetch graphs that are already stored")
+    harvest.add_argument("--all-disciplines", action="store_true",
+                         help="Include non-cycling workouts")
+    _add_api_options(harvest)
+    harvest.set_defaults(func=cmd_harvest)
+
+    report = subparsers.add_parser("report", help="Render weekly/monthly reports",
+                                   description="Render reports for periods whose data changed.")
+    report.add_argument("--period", action="append", choices=("week", "month"),
+                        help="Period kind to build (repeatable; default: both)")
+    report.add_argument("--force", action="store_true", help="Re-render unchanged periods")
+    report.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    report.add_argument("--output-dir", help="Output directory (default: <data-dir>/reports)")
+    report.set_defaults(func=cmd_report)
+
+    export = subparsers.add_parser("export", help="Export performance graphs as FIT/TCX files",
+                                   description="Export stored performance graphs for upload to "
+                                               "Strava and other platforms. Unchanged files are skipped.")
+    export.add_argument("workout_ids", nargs="*", metavar="WORKOUT_ID",
+                        help="Specific workouts (default: every stored graph)")
+    export.add_argument("--format", default="fit",
+                        help="Comma-separated formats: fit, tcx (default: %(default)s)")
+    export.add_argument("--force", action="store_true", help="Re-export unchanged files")
+    export.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    export.add_argument("--output-dir", help="Output directory (default: <data-dir>/exports)")
+    export.set_defaults(func=cmd_export)
+
+    archive = subparsers.add_parser("archive", help="Inspect or compact the raw response archive",
+                                    description="Show statistics of the compressed archive of raw API "
+                                                "responses (filled by --archive), print one stored "
+                                                "response, or compact it.")
+    archive.add_argument("--get", metavar="WORKOUT_ID", help="Print the archived response for a workout")
+    archive.add_argument("--endpoint", default="workout",
+                         help="Endpoint for --get: workout or performance_graph (default: %(default)s)")
+    archive.add_argument("--compact", action="store_true",
+                         help="Drop superseded records and recompress with retrained dictionaries")
+    archive.add_argument("--rebuild-index", action="store_true", help="Rebuild the index from the data file")
+    archive.set_defaults(func=cmd_archive)
+
+    dashboard = subparsers.add_parser("dashboard", help="Launch the Streamlit dashboard",
+                                      description="Launch the dashboard; extra arguments are "
+                                                  "passed to 'streamlit run'.")
+    dashboard.set_defaults(func=cmd_dashboard)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the CLI."""
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+
+    # Only the dashboard passes unknown options through (to streamlit)
+    if extra and args.command != "dashboard":
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.streamlit_args = extra
+
+    if args.command is None:
+        parser.print_help()
+        return 1
+
+    level = logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO
+    logging.basicConfig(level=level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        with _profiled(args):
+            return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        logger.error(f"✗ Error: {e}", exc_info=args.verbose)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+"""
+Shared Settings
+
+Constants used by more than one layer of the package (authentication,
+API transports).
+"""
+
+# (connect, read) seconds for live requests; a hung request must not stall
+# the sync daemon or hold a slot of the multi-account pool forever
+DEFAULT_TIMEOUT = (10.0, 60.0)
@@ -0,0 +1,148 @@
+"""
+Export Activity
+
+The per-sample series an exporter needs, in SI units, read straight from
+the performance graph store as numpy arrays.
+
+Both encoders (FIT and TCX) consume these arrays in fixed-size chunks, so
+no per-sample Python objects are built for a whole workout.
+"""
+
+from typing import Any, Dict, Optional
+import logging
+
+import numpy as np
+
+from src.storage.performance_store import PerformanceGraphStore
+
+logger = logging.getLogger(__name__)
+
+# Metric slugs read from the store
+METRICS = ("output", "heart_rate", "cadence", "speed")
+
+# Speed display unit -> meters per second
+SPEED_TO_MPS = {"mph": 0.44704, "kph": 1 / 3.6, "km/h": 1 / 3.6, "m/s": 1.0}
+
+DEFAULT_SPEED_UNIT = "mph"
+
+
+def _fit_length(values: Optional[np.ndarray], n: int) -> np.ndarray:
+    """Pad (with NaN) or truncate a series to n samples."""
+    if values is None:
+        return np.full(n, np.nan)
+    values = np.asarray(values, dtype=np.float64)[:n]
+    if len(values) < n:
+        values = np.concatenate([values, np.full(n - len(values), np.nan)])
+    return values
+
+
+class Activity:
+    """One workout's samples and summary, ready for encoding."""
+
+    def __init__(
+        self,
+        workout_id: str,
+        start_time: int,
+        seconds: np.ndarray,
+        power: np.ndarray,
+        heart_rate: np.ndarray,
+        cadence: np.ndarray,
+        speed: np.ndarray,
+        discipline: Optional[str] = None,
+        title: Optional[str] = None,
+        calories: Optional[float] = None,
+    ):
+        """
+        Initialize the activity.
+
+        Args:
+            workout_id: Workout ID
+            start_time: Unix timestamp of the first sample
+            seconds: Sample offsets from start_time
+            power: Output in watts (NaN where missing)
+            heart_rate: Heart rate in bpm (NaN where missing)
+            cadence: Cadence in rpm (NaN where missing)
+            speed: Speed in m/s (NaN where missing)
+            discipline: Peloton fitness discipline
+            title: Class title
+            calories: Total calories
+        """
+        self.workout_id = workout_id
+        self.start_time = int(start_time)
+        self.seconds = seconds
+        self.power = power
+        self.heart_rate = heart_rate
+        self.cadence = cadence
+        self.speed = speed
+        self.discipline = discipline
+        self.title = title
+        self.calories = calories
+
+        # Cumulative distance in meters, integrated from speed
+        dt = np.diff(seconds, prepend=seconds[:1]) if len(seconds) else seconds
+        self.distance = np.cumsum(np.nan_to_num(speed) * dt)
+
+    @classmethod
+    def from_store(
+        cls,
+        store: PerformanceGraphStore,
+        workout_id: str,
+        workout: Dict[str, Any],
+    ) -> "Activity":
+        """
+        Load an activity from the performance graph store.
+
+        Args:
+            store: Performance graph store
+            workout_id: Workout ID
+            workout: Workout info with start_time and optionally
+                     fitness_discipline, title and calories
+
+        Returns:
+            Activity
+        """
+        meta, arrays = store.read_raw(workout_id, METRICS)
+        seconds = arrays["seconds"]
+        n = len(seconds)
+
+        unit = (meta.get("units") or {}).get("speed") or DEFAULT_SPEED_UNIT
+        to_mps = SPEED_TO_MPS.get(unit.lower(), SPEED_TO_MPS[DEFAULT_SPEED_UNIT])
+
+        calories = workout.get("calories")
+        if calories is None:
+            calories = next(
+                (s.get("value") for s in meta.get("summaries", []) if s.get("slug") == "calories"), None
+            )
+
+        return cls(
+            workout_id=workout_id,
+            start_time=workout["start_time"],
+            seconds=seconds,
+            power=_fit_length(arrays.get("output"), n),
+            heart_rate=_fit_length(arrays.get("heart_rate"), n),
+            cadence=_fit_length(arrays.get("cadence"), n),
+            speed=_fit_length(arrays.get("speed"), n) * to_mps,
+            discipline=workout.get("fitness_discipline"),
+            title=workout.get("title"),
+            calories=calories,
+        )
+
+    @property
+    def duration(self) -> float:
+        """Elapsed seconds from the first to the last sample."""
+        return float(self.seconds[-1] - self.seconds[0]) if len(self.seconds) else 0.0
+
+    @property
+    def total_distance(self) -> float:
+        """Total distance in meters."""
+        return float(self.distance[-1]) if len(self.distance) else 0.0
+
+    def stat(self, name: str, how: str) -> Optional[float]:
+        """Mean or max of a series, ignoring missing samples (None if all missing)."""
+        values = getattr(self, name)
+        if not np.isfinite(values).any():
+            return None
+        return float(np.nanmean(values) if how == "mean" else np.nanmax(values))
+
+    def __len__(self) -> int:
+        return len(self.seconds)
@@ -0,0 +1,254 @@
+"""
+Performance Graph Exporter
+
+Exports stored performance graphs as FIT and/or TCX files for upload to
+Strava and other training platforms.
+
+Workouts are encoded in parallel across processes. A manifest next to the
+exports records a content hash per file (of the stored graph, the workout
+info and the encoder version), and unchanged files are skipped. Stored
+graphs are only re-hashed when their size or mtime changed, so repeat
+exports of a large library are nearly free.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import hashlib
+import json
+import logging
+import os
+
+from src.export.activity import Activity
+from src.export.fit import write_fit
+from src.export.tcx import write_tcx
+from src.storage.performance_store import PerformanceGraphStore
+from src.storage.workout_store import DEFAULT_DATA_DIR, WorkoutStore
+
+logger = logging.getLogger(__name__)
+
+WRITERS = {"fit": write_fit, "tcx": write_tcx}
+
+FORMATS = tuple(WRITERS)
+
+# Bump when encoder output changes so every file is re-exported once
+EXPORT_FORMAT_VERSION = "1"
+
+MANIFEST_FILE = "manifest.json"
+
+# Read buffer for hashing stored graphs
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def workout_info(workout: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract what the encoders need from a stored API workout.
+
+    Args:
+        workout: Workout record (with ride join)
+
+    Returns:
+        Dictionary with start_time, fitness_discipline, title and calories
+    """
+    ride = workout.get("ride") or {}
+    return {
+        "start_time": workout.get("start_time") or workout.get("created_at"),
+        "fitness_discipline": ride.get("fitness_discipline") or workout.get("fitness_discipline"),
+        "title": ride.get("title"),
+        "calories": workout.get("calories"),
+    }
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """Hash a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_workout(
+    data_dir: str,
+    workout_id: str,
+    info: Dict[str, Any],
+    formats: Sequence[str],
+    output_dir: str,
+) -> List[str]:
+    """
+    Export one workout in the given formats (runs in a worker process).
+
+    Args:
+        data_dir: Data directory holding the performance graph store
+        workout_id: Workout ID
+        info: Result of workout_info()
+        formats: Formats to write ("fit", "tcx")
+        output_dir: Export root (files go to <output_dir>/<format>/)
+
+    Returns:
+        Paths written
+    """
+    activity = Activity.from_store(PerformanceGraphStore(data_dir), workout_id, info)
+    return [
+        str(WRITERS[fmt](activity, Path(output_dir) / fmt / f"{workout_id}.{fmt}"))
+        for fmt in formats
+    ]
+
+
+class GraphExporter:
+    """Exports stored performance graphs in parallel, skipping unchanged files."""
+
+    def __init__(
+        self,
+        data_dir: Union[str, Path] = DEFAULT_DATA_DIR,
+        output_dir: Optional[Union[str, Path]] = None,
+        formats: Sequence[str] = FORMATS,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Initialize the exporter.
+
+        Args:
+            data_dir: Data directory holding the workout and graph stores
+            output_dir: Where exports are written (default: <data_dir>/exports)
+            formats: Formats to write ("fit", "tcx")
+            max_workers: Worker processes (default: CPU count)
+        """
+        unknown = [fmt for fmt in formats if fmt not in WRITERS]
+        if unknown:
+            raise ValueError(f"Unknown export format(s): {', '.join(unknown)}. Use {FORMATS}")
+
+        self.data_dir = Path(data_dir)
+        self.output_dir = Path(output_dir) if output_dir else self.data_dir / "exports"
+        self.formats = tuple(formats)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.manifest_path = self.output_dir / MANIFEST_FILE
+        self.graphs = PerformanceGraphStore(self.data_dir)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"sources": {}, "exports": {}}
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _source_hash(self, workout_id: str, sources: Dict[str, Any]) -> str:
+        """Content hash of a stored graph, reusing the cached one if size and mtime match."""
+        path = self.graphs.path(workout_id)
+        stat = path.stat()
+        cached = sources.get(workout_id)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+        sha = file_sha256(path)
+        sources[workout_id] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha}
+        return sha
+
+    def plan(
+        self,
+        workout_ids: Optional[Sequence[str]] = None,
+        force: bool = False,
+    ) -> Tuple[List[Tuple[str, Dict[str, Any], Tuple[str, ...], str]], int, List[str], Dict[str, Any]]:
+        """
+        Work out which workouts need exporting.
+
+        Args:
+            workout_ids: Workouts to consider (default: every stored graph)
+            force: Re-export even if unchanged
+
+        Returns:
+            Tuple of (list of (workout_id, info, formats, digest) to export,
+            number of unchanged files skipped, workout IDs that can't be
+            exported, updated manifest)
+        """
+        manifest = self._load_manifest()
+        sources, exports = manifest["sources"], manifest["exports"]
+        workouts = {w.get("id"): w for w in WorkoutStore(self.data_dir).load()}
+        stored = set(self.graphs.workout_ids())
+
+        todo, skipped, unavailable = [], 0, []
+        for workout_id in workout_ids if workout_ids is not None else sorted(stored):
+            workout = workouts.get(workout_id)
+            if workout_id not in stored or workout is None:
+                unavailable.append(workout_id)
+                continue
+
+            info = workout_info(workout)
+            if info["start_time"] is None:
+                unavailable.append(workout_id)
+                continue
+
+            key = json.dumps([EXPORT_FORMAT_VERSION, self._source_hash(workout_id, sources), info], sort_keys=True)
+            digest = hashlib.sha256(key.encode()).hexdigest()
+
+            formats = tuple(
+                fmt for fmt in self.formats
+                if force
+                or exports.get(f"{fmt}/{workout_id}") != digest
+                or not (self.output_dir / fmt / f"{workout_id}.{fmt}").exists()
+            )
+            skipped += len(self.formats) - len(formats)
+            if formats:
+                todo.append((workout_id, info, formats, digest))
+        return todo, skipped, unavailable, manifest
+
+    def export(
+        self,
+        workout_ids: Optional[Sequence[str]] = None,
+        force: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Export all changed workouts.
+
+        Args:
+            workout_ids: Workouts to export (default: every stored graph)
+            force: Re-export even if unchanged
+
+        Returns:
+            Dictionary with "exported" (list of paths), "skipped" count,
+            "unavailable" (IDs without a stored graph or workout record) and
+            "failed" (IDs that failed to encode)
+        """
+        todo, skipped, unavailable, manifest = self.plan(workout_ids, force)
+        logger.info(f"Export: {len(todo)} workouts to encode, {skipped} files unchanged")
+        if unavailable:
+            logger.warning(f"Skipping {len(unavailable)} workouts without a stored graph or start time")
+
+        exported, failed = [], []
+        if todo:
+            workers = min(self.max_workers, len(todo))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(
+                        export_workout, str(self.data_dir), workout_id, info, formats, str(self.output_dir)
+                    ): (workout_id, formats, digest)
+                    for workout_id, info, formats, digest in todo
+                }
+                for future in as_completed(futures):
+                    workout_id, formats, digest = futures[future]
+                    try:
+                        paths = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to export {workout_id}: {e}")
+                        failed.append(workout_id)
+                        continue
+                    for fmt in formats:
+                        manifest["exports"][f"{fmt}/{workout_id}"] = digest
+                    exported.extend(paths)
+
+        # Saved even when nothing was encoded, to keep refreshed source hashes
+        self._save_manifest(manifest)
+
+        logger.info(f"✓ Exported {len(exported)} files to {self.output_dir}")
+        return {
+            "exported": sorted(exported),
+            "skipped": skipped,
+            "unavailable": unavailable,
+            "failed": sorted(failed),
+        }
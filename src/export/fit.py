@@ -0,0 +1,249 @@
+"""
+FIT Encoder
+
+Writes activities as Garmin FIT files (the format Strava, Garmin Connect and
+TrainingPeaks import natively).
+
+Per-second records are packed with a numpy structured dtype that matches
+the FIT record layout byte for byte, so a chunk of samples becomes one
+``tobytes()`` call instead of one ``struct.pack`` per sample.
+
+Only the messages needed for an indoor activity are written: file_id,
+timer start/stop events, records, one lap, one session and the activity.
+"""
+
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Sequence, Tuple, Union
+import os
+import struct
+
+import numpy as np
+
+from src.export.activity import Activity
+
+# Seconds between the Unix epoch and the FIT epoch (1989-12-31 00:00 UTC)
+FIT_EPOCH_OFFSET = 631065600
+
+PROTOCOL_VERSION = 0x10
+PROFILE_VERSION = 2132
+
+# Samples encoded per chunk
+CHUNK_SAMPLES = 8192
+
+# Base types: (code, struct format, invalid value)
+ENUM = (0x00, "B", 0xFF)
+UINT8 = (0x02, "B", 0xFF)
+UINT16 = (0x84, "H", 0xFFFF)
+UINT32 = (0x86, "I", 0xFFFFFFFF)
+
+# Global message numbers
+MESG_FILE_ID = 0
+MESG_SESSION = 18
+MESG_LAP = 19
+MESG_RECORD = 20
+MESG_EVENT = 21
+MESG_ACTIVITY = 34
+
+TIMESTAMP_FIELD = 253
+
+# Peloton discipline -> (sport, sub_sport)
+SPORTS = {
+    "cycling": (2, 6),    # cycling / indoor_cycling
+    "running": (1, 1),    # running / treadmill
+    "walking": (11, 1),   # walking / treadmill
+    "rowing": (15, 14),   # rowing / indoor_rowing
+}
+DEFAULT_SPORT = (10, 0)   # training / generic
+
+# Record message: local type 2, one byte per field as laid out below
+RECORD_LOCAL_TYPE = 2
+RECORD_FIELDS = [
+    (TIMESTAMP_FIELD, UINT32, "timestamp"),
+    (7, UINT16, "power"),
+    (3, UINT8, "heart_rate"),
+    (4, UINT8, "cadence"),
+    (6, UINT16, "speed"),       # m/s * 1000
+    (5, UINT32, "distance"),    # m * 100
+]
+RECORD_DTYPE = np.dtype(
+    [("header", "u1")] + [(name, "<" + base[1]) for _, base, name in RECORD_FIELDS]
+)
+
+
+def _crc_table() -> List[int]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def crc16(data: bytes, crc: int = 0) -> int:
+    """FIT CRC (CRC-16/ARC) of data, continuing from crc."""
+    table = _CRC_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def _definition(local_type: int, global_num: int, fields: Sequence[Tuple[int, Tuple[int, str, int]]]) -> bytes:
+    """Definition message for little-endian fields."""
+    out = struct.pack("<BBBHB", 0x40 | local_type, 0, 0, global_num, len(fields))
+    for field_num, (code, fmt, _) in fields:
+        out += struct.pack("<BBB", field_num, struct.calcsize(fmt), code)
+    return out
+
+
+def _message(local_type: int, global_num: int, fields: Sequence[Tuple[int, Tuple[int, str, int], Optional[float]]]) -> bytes:
+    """Definition plus a single data message (None values are written as invalid)."""
+    definition = _definition(local_type, global_num, [(num, base) for num, base, _ in fields])
+    fmt = "<B" + "".join(base[1] for _, base, _ in fields)
+    values = [
+        base[2] if value is None else min(max(int(round(value)), 0), base[2] - 1)
+        for _, base, value in fields
+    ]
+    return definition + struct.pack(fmt, local_type, *values)
+
+
+def _scaled(values: np.ndarray, scale: float, base: Tuple[int, str, int]) -> np.ndarray:
+    """Scale, round and clip a float series; NaN becomes the invalid value."""
+    invalid = base[2]
+    scaled = np.rint(np.clip(np.nan_to_num(values * scale, nan=0.0), 0, invalid - 1))
+    return np.where(np.isfinite(values), scaled, invalid)
+
+
+def _records(activity: Activity, start: int, stop: int) -> bytes:
+    """Encode samples start..stop as record data messages."""
+    chunk = np.empty(stop - start, dtype=RECORD_DTYPE)
+    chunk["header"] = RECORD_LOCAL_TYPE
+    chunk["timestamp"] = activity.start_time - FIT_EPOCH_OFFSET + np.rint(activity.seconds[start:stop])
+    chunk["power"] = _scaled(activity.power[start:stop], 1, UINT16)
+    chunk["heart_rate"] = _scaled(activity.heart_rate[start:stop], 1, UINT8)
+    chunk["cadence"] = _scaled(activity.cadence[start:stop], 1, UINT8)
+    chunk["speed"] = _scaled(activity.speed[start:stop], 1000, UINT16)
+    chunk["distance"] = _scaled(activity.distance[start:stop], 100, UINT32)
+    return chunk.tobytes()
+
+
+def encode(activity: Activity, out: BinaryIO) -> int:
+    """
+    Write an activity as FIT to a binary stream.
+
+    Args:
+        activity: Activity to encode
+        out: Seekable binary stream positioned at the start of the file
+
+    Returns:
+        Bytes written
+    """
+    start_ts = activity.start_time - FIT_EPOCH_OFFSET
+    end_ts = start_ts + int(round(activity.duration))
+    elapsed_ms = activity.duration * 1000
+    sport, sub_sport = SPORTS.get(activity.discipline or "", DEFAULT_SPORT)
+
+    def summary(power_num: int, hr_num: int) -> list:
+        return [
+            (power_num, UINT16, activity.stat("power", "mean")),
+            (power_num + 1, UINT16, activity.stat("power", "max")),
+            (hr_num, UINT8, activity.stat("heart_rate", "mean")),
+            (hr_num + 1, UINT8, activity.stat("heart_rate", "max")),
+        ]
+
+    head = b"".join([
+        _message(0, MESG_FILE_ID, [
+            (0, ENUM, 4),                 # type: activity
+            (1, UINT16, 255),             # manufacturer: development
+            (2, UINT16, 0),               # product
+            (4, UINT32, start_ts),        # time_created
+        ]),
+        _message(1, MESG_EVENT, [
+            (TIMESTAMP_FIELD, UINT32, start_ts),
+            (0, ENUM, 0),                 # event: timer
+            (1, ENUM, 0),                 # event_type: start
+        ]),
+        _definition(RECORD_LOCAL_TYPE, MESG_RECORD, [(num, base) for num, base, _ in RECORD_FIELDS]),
+    ])
+    tail = b"".join([
+        _message(1, MESG_EVENT, [
+            (TIMESTAMP_FIELD, UINT32, end_ts),
+            (0, ENUM, 0),                 # event: timer
+            (1, ENUM, 4),                 # event_type: stop_all
+        ]),
+        _message(3, MESG_LAP, [
+            (TIMESTAMP_FIELD, UINT32, end_ts),
+            (0, ENUM, 9),                 # event: lap
+            (1, ENUM, 1),                 # event_type: stop
+            (2, UINT32, start_ts),        # start_time
+            (7, UINT32, elapsed_ms),      # total_elapsed_time
+            (8, UINT32, elapsed_ms),      # total_timer_time
+            (9, UINT32, activity.total_distance * 100),
+            (11, UINT16, activity.calories),
+            (25, ENUM, sport),
+        ] + summary(19, 15)),
+        _message(4, MESG_SESSION, [
+            (TIMESTAMP_FIELD, UINT32, end_ts),
+            (0, ENUM, 8),                 # event: session
+            (1, ENUM, 1),                 # event_type: stop
+            (2, UINT32, start_ts),        # start_time
+            (5, ENUM, sport),
+            (6, ENUM, sub_sport),
+            (7, UINT32, elapsed_ms),      # total_elapsed_time
+            (8, UINT32, elapsed_ms),      # total_timer_time
+            (9, UINT32, activity.total_distance * 100),
+            (11, UINT16, activity.calories),
+            (25, UINT16, 0),              # first_lap_index
+            (26, UINT16, 1),              # num_laps
+        ] + summary(20, 16)),
+        _message(5, MESG_ACTIVITY, [
+            (TIMESTAMP_FIELD, UINT32, end_ts),
+            (0, UINT32, elapsed_ms),      # total_timer_time
+            (1, UINT16, 1),               # num_sessions
+            (2, ENUM, 0),                 # type: manual
+            (3, ENUM, 26),                # event: activity
+            (4, ENUM, 1),                 # event_type: stop
+        ]),
+    ])
+
+    data_size = len(head) + len(activity) * RECORD_DTYPE.itemsize + len(tail)
+    header = struct.pack("<BBHI4s", 14, PROTOCOL_VERSION, PROFILE_VERSION, data_size, b".FIT")
+    header += struct.pack("<H", crc16(header))
+    out.write(header)
+
+    crc = 0
+    for block in _iter_blocks(activity, head, tail):
+        crc = crc16(block, crc)
+        out.write(block)
+    out.write(struct.pack("<H", crc))
+    return len(header) + data_size + 2
+
+
+def _iter_blocks(activity: Activity, head: bytes, tail: bytes):
+    yield head
+    for start in range(0, len(activity), CHUNK_SAMPLES):
+        yield _records(activity, start, min(start + CHUNK_SAMPLES, len(activity)))
+    yield tail
+
+
+def write_fit(activity: Activity, path: Union[str, Path]) -> Path:
+    """
+    Write an activity to a FIT file (atomically).
+
+    Args:
+        activity: Activity to encode
+        path: Output file
+
+    Returns:
+        Path written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        encode(activity, f)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,138 @@
+"""
+TCX Encoder
+
+Writes activities as Garmin Training Center XML (TCX), the plain-text
+alternative to FIT that most training platforms also import.
+
+Trackpoints are rendered a chunk at a time with numpy string operations
+(vectorized number-to-text conversion and concatenation) and written as one
+string per chunk, so memory stays flat regardless of workout length.
+"""
+
+from pathlib import Path
+from typing import TextIO, Union
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+import os
+
+import numpy as np
+
+from src.export.activity import Activity
+
+# Samples rendered per chunk
+CHUNK_SAMPLES = 4096
+
+# Peloton discipline -> TCX Sport attribute (Biking, Running or Other)
+SPORTS = {"cycling": "Biking", "running": "Running"}
+
+HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2" '
+    'xmlns:ns3="http://www.garmin.com/xmlschemas/ActivityExtension/v2">\n'
+    '  <Activities>\n'
+)
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _text(values: np.ndarray, decimals: int = 0) -> np.ndarray:
+    """Non-negative numbers as fixed-point strings, vectorized ('' where missing)."""
+    finite = np.isfinite(values)
+    # Integer-to-string conversion is much faster than float repr, so format
+    # fixed-point values as scaled integers with the decimal point inserted
+    scaled = np.rint(np.clip(np.where(finite, values, 0.0), 0, None) * 10**decimals).astype(np.int64)
+    if decimals == 0:
+        text = scaled.astype(str)
+    else:
+        whole, frac = np.divmod(scaled, 10**decimals)
+        text = np.char.add(np.char.add(whole.astype(str), "."), np.char.zfill(frac.astype(str), decimals))
+    return np.where(finite, text, "")
+
+
+def _wrap(text: np.ndarray, open_tag: str, close_tag: str) -> np.ndarray:
+    """Wrap non-empty strings in tags, leaving missing samples empty."""
+    wrapped = np.char.add(np.char.add(open_tag, text), close_tag)
+    return np.where(text != "", wrapped, "")
+
+
+def _trackpoints(activity: Activity, start: int, stop: int) -> str:
+    """Render samples start..stop as Trackpoint elements."""
+    epoch = np.datetime64(activity.start_time, "s")
+    times = epoch + np.rint(activity.seconds[start:stop]).astype("timedelta64[s]")
+
+    parts = [
+        "        <Trackpoint><Time>",
+        np.datetime_as_string(times, unit="s"),
+        "Z</Time>",
+        _wrap(_text(activity.distance[start:stop], 1), "<DistanceMeters>", "</DistanceMeters>"),
+        _wrap(_text(activity.heart_rate[start:stop]), "<HeartRateBpm><Value>", "</Value></HeartRateBpm>"),
+        _wrap(_text(activity.cadence[start:stop]), "<Cadence>", "</Cadence>"),
+        "<Extensions><ns3:TPX>",
+        _wrap(_text(activity.speed[start:stop], 2), "<ns3:Speed>", "</ns3:Speed>"),
+        _wrap(_text(activity.power[start:stop]), "<ns3:Watts>", "</ns3:Watts>"),
+        "</ns3:TPX></Extensions></Trackpoint>\n",
+    ]
+    rows = parts[0]
+    for part in parts[1:]:
+        rows = np.char.add(rows, part)
+    return "".join(rows.tolist())
+
+
+def encode(activity: Activity, out: TextIO) -> None:
+    """
+    Write an activity as TCX to a text stream.
+
+    Args:
+        activity: Activity to encode
+        out: Text stream
+    """
+    started = _iso(activity.start_time + (activity.seconds[0] if len(activity) else 0))
+    sport = SPORTS.get(activity.discipline or "", "Other")
+
+    out.write(HEADER)
+    out.write(f'    <Activity Sport="{sport}">\n')
+    out.write(f"      <Id>{started}</Id>\n")
+    out.write(f'      <Lap StartTime="{started}">\n')
+    out.write(f"        <TotalTimeSeconds>{activity.duration:.1f}</TotalTimeSeconds>\n")
+    out.write(f"        <DistanceMeters>{activity.total_distance:.1f}</DistanceMeters>\n")
+    out.write(f"        <Calories>{int(round(activity.calories or 0))}</Calories>\n")
+    for tag, name in (("AverageHeartRateBpm", "mean"), ("MaximumHeartRateBpm", "max")):
+        value = activity.stat("heart_rate", name)
+        if value is not None:
+            out.write(f"        <{tag}><Value>{int(round(value))}</Value></{tag}>\n")
+    out.write("        <Intensity>Active</Intensity>\n")
+    out.write("        <TriggerMethod>Manual</TriggerMethod>\n")
+    out.write("        <Track>\n")
+
+    for start in range(0, len(activity), CHUNK_SAMPLES):
+        out.write(_trackpoints(activity, start, min(start + CHUNK_SAMPLES, len(activity))))
+
+    out.write("        </Track>\n")
+    out.write("      </Lap>\n")
+    if activity.title:
+        out.write(f"      <Notes>{escape(activity.title)}</Notes>\n")
+    out.write("    </Activity>\n")
+    out.write("  </Activities>\n")
+    out.write("</TrainingCenterDatabase>\n")
+
+
+def write_tcx(activity: Activity, path: Union[str, Path]) -> Path:
+    """
+    Write an activity to a TCX file (atomically).
+
+    Args:
+        activity: Activity to encode
+        path: Output file
+
+    Returns:
+        Path written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        encode(activity, f)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,328 @@
+"""
+Multi-Account Sync
+
+Syncs many Peloton accounts (household, team) from one process.
+
+- Connection pooling: all accounts share one HTTPAdapter, so their sessions
+  draw keep-alive connections from a single urllib3 pool. Each account still
+  has its own session, cookies and login.
+- Fair rate budget: every request, logins included, takes a token from one
+  global token bucket. Tokens go round-robin to the accounts waiting for one,
+  so a large history can't starve small ones or burst the API.
+- Separate storage: each account gets its own data directory
+  (``data/accounts/<name>/``) with the usual workout store, aggregates and
+  version token.
+
+A run reports total throughput and per-account request latency, queueing
+time and workouts added.
+
+Accounts file (JSON):
+    [
+        {"name": "alex", "username": "alex@example.com", "password_env": "ALEX_PELOTON_PASSWORD"},
+        {"name": "sam", "username": "sam@example.com", "password": "..."}
+    ]
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Union
+import json
+import logging
+import os
+import re
+import statistics
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+import requests
+
+from src.extraction.peloton import PelotonClient
+from src.extraction.sync import sync_workouts
+from src.extraction.transport import Transport
+from src.storage.workout_store import DEFAULT_DATA_DIR, WorkoutStore
+
+logger = logging.getLogger(__name__)
+
+ACCOUNTS_DIR = "accounts"
+
+_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+# Latency samples kept per account for percentiles
+LATENCY_SAMPLES = 10_000
+
+
+def load_accounts(path: Union[str, Path]) -> List[Dict[str, str]]:
+    """
+    Load account credentials from a JSON file.
+
+    Each entry needs ``username`` and either ``password`` or ``password_env``
+    (an environment variable holding the password). ``name`` (used for the
+    account's data directory) defaults to the username's local part.
+
+    Args:
+        path: Accounts file
+
+    Returns:
+        List of dictionaries with name, username and password
+
+    Raises:
+        ValueError: If an entry is incomplete or names collide
+    """
+    with open(path) as f:
+        entries = json.load(f)
+
+    accounts = []
+    for i, entry in enumerate(entries):
+        username = entry.get("username")
+        password = entry.get("password") or os.getenv(entry.get("password_env", ""))
+        if not username or not password:
+            raise ValueError(f"Account #{i + 1} in {path} needs a username and a password (or password_env)")
+
+        name = entry.get("name") or re.sub(r"[^A-Za-z0-9_.-]", "_", username.split("@")[0])
+        if not _NAME.match(name):
+            raise ValueError(f"Invalid account name {name!r}: use letters, digits, '.', '_' or '-'")
+        accounts.append({"name": name, "username": username, "password": password})
+
+    names = [a["name"] for a in accounts]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate account names: {', '.join(duplicates)}")
+    return accounts
+
+
+class FairRateLimiter:
+    """Global token bucket that hands out tokens round-robin per account."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Requests per second across all accounts
+            burst: Tokens that can accumulate while idle (default: ~1 s of rate)
+        """
+        self.rate = rate
+        self.burst = burst or max(int(rate), 1)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiting: Dict[str, int] = {}
+        self._turns: Deque[str] = deque()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._last) * self.rate, self.burst)
+        self._last = now
+
+    def acquire(self, account: str) -> float:
+        """
+        Block until this account's turn comes up and a token is available.
+
+        Args:
+            account: Account name
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.monotonic()
+        with self._cond:
+            if not self._waiting.get(account):
+                self._turns.append(account)
+            self._waiting[account] = self._waiting.get(account, 0) + 1
+
+            while True:
+                self._refill()
+                if self._turns[0] == account and self._tokens >= 1:
+                    break
+                timeout = (1 - self._tokens) / self.rate if self._tokens < 1 else None
+                self._cond.wait(timeout)
+
+            self._tokens -= 1
+            self._turns.popleft()
+            self._waiting[account] -= 1
+            if self._waiting[account]:
+                # More requests queued for this account: back of the line
+                self._turns.append(account)
+            self._cond.notify_all()
+
+        return time.monotonic() - start
+
+
+class AccountStats:
+    """Request counts and timings for one account."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.requests = 0
+        self.errors = 0
+        self.wait_seconds = 0.0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.added = 0
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+
+    def record(self, latency: float, wait: float, ok: bool) -> None:
+        """Record one request."""
+        self.requests += 1
+        self.errors += 0 if ok else 1
+        self.wait_seconds += wait
+        self.latencies.append(latency)
+
+    def summary(self) -> Dict[str, Any]:
+        """Stats as a dictionary (latencies in milliseconds)."""
+        latencies = sorted(self.latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 1)
+
+        return {
+            "account": self.name,
+            "ok": self.error is None,
+            "error": self.error,
+            "workouts_added": self.added,
+            "requests": self.requests,
+            "request_errors": self.errors,
+            "seconds": round(self.seconds, 3),
+            "latency_ms_mean": round(statistics.fmean(latencies) * 1000, 1) if latencies else None,
+            "latency_ms_p50": percentile(0.5),
+            "latency_ms_p95": percentile(0.95),
+            "wait_ms_mean": round(self.wait_seconds / self.requests * 1000, 1) if self.requests else None,
+        }
+
+
+class ThrottledTransport(Transport):
+    """Takes a token from the shared limiter before each request and times it."""
+
+    # The shared limiter replaces the client's own per-client limit
+    rate_limited = False
+
+    def __init__(self, inner: Transport, limiter: FairRateLimiter, stats: AccountStats):
+        """
+        Initialize the transport.
+
+        Args:
+            inner: Transport that performs the requests
+            limiter: Shared rate limiter
+            stats: Stats of the account this transport belongs to
+        """
+        self.inner = inner
+        self.limiter = limiter
+        self.stats = stats
+
+    def send(self, method, url, params=None, headers=None) -> requests.Response:
+        wait = self.limiter.acquire(self.stats.name)
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = self.inner.send(method, url, params=params, headers=headers)
+            ok = response.ok
+            return response
+        finally:
+            self.stats.record(time.perf_counter() - start, wait, ok)
+
+
+class MultiAccountSync:
+    """Syncs several accounts over a shared pool and rate budget."""
+
+    def __init__(
+        self,
+        accounts: List[Dict[str, str]],
+        data_dir: Union[str, Path] = DEFAULT_DATA_DIR,
+        rate: float = 5.0,
+        burst: Optional[int] = None,
+        max_workers: int = 8,
+        full: bool = False,
+    ):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            accounts: Credentials from load_accounts()
+            data_dir: Root data directory (accounts go under <data_dir>/accounts)
+            rate: Global request budget in requests per second
+            burst: Requests allowed in a burst after idling
+            max_workers: Accounts synced concurrently
+            full: Re-fetch whole histories instead of only new workouts
+        """
+        self.accounts = accounts
+        self.data_dir = Path(data_dir)
+        self.limiter = FairRateLimiter(rate, burst)
+        self.max_workers = max(1, min(max_workers, len(accounts)))
+        self.full = full
+        # One pool for every session; it must fit one connection per worker
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers, pool_block=True)
+
+    def account_dir(self, name: str) -> Path:
+        """Data directory of an account."""
+        return self.data_dir / ACCOUNTS_DIR / name
+
+    def sync_account(self, account: Dict[str, str]) -> AccountStats:
+        """
+        Log in and sync one account.
+
+        Args:
+            account: Entry from load_accounts()
+
+        Returns:
+            The account's stats (errors are recorded, not raised)
+        """
+        stats = AccountStats(account["name"])
+        start = time.perf_counter()
+        client = PelotonClient(account["username"], account["password"], adapter=self.adapter)
+        try:
+            # The login request counts against the shared budget too
+            wait = self.limiter.acquire(stats.name)
+            login_start = time.perf_counter()
+            connected = client.connect()
+            stats.record(time.perf_counter() - login_start, wait, connected)
+            if not connected:
+                raise RuntimeError("Login failed")
+
+            api = client.api_client
+            api.transport = ThrottledTransport(api.transport, self.limiter, stats)
+
+            store = WorkoutStore(self.account_dir(stats.name))
+            stats.added = sync_workouts(client, store, full=self.full)
+        except Exception as e:
+            stats.error = f"{type(e).__name__}: {e}"
+            logger.error(f"[{stats.name}] Sync failed: {e}")
+        finally:
+            client.disconnect()
+            stats.seconds = time.perf_counter() - start
+
+        logger.info(f"[{stats.name}] {stats.added} new workouts, {stats.requests} requests in {stats.seconds:.1f}s")
+        return stats
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Sync all accounts.
+
+        Returns:
+            Report with totals (seconds, requests, requests_per_second,
+            workouts_added, failed) and per-account stats under "accounts"
+        """
+        logger.info(
+            f"Syncing {len(self.accounts)} accounts with {self.max_workers} workers "
+            f"at {self.limiter.rate:g} requests/s"
+        )
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="account") as pool:
+                results = list(pool.map(self.sync_account, self.accounts))
+        finally:
+            self.adapter.close()
+        seconds = time.perf_counter() - start
+
+        requests_total = sum(s.requests for s in results)
+        return {
+            "seconds": round(seconds, 3),
+            "requests": requests_total,
+            "requests_per_second": round(requests_total / seconds, 2) if seconds > 0 else None,
+            "workouts_added": sum(s.added for s in results),
+            "failed": [s.name for s in results if s.error],
+            "accounts": [s.summary() for s in results],
+        }
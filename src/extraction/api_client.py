@@ -9,6 +9,9 @@ from typing import Dict, Any, List, Optional
 import logging
 import time
 
+from src import profiling
+from src.extraction.transport import SessionTransport, Transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,16 +20,29 @@ class PelotonAPIClient:
 
     BASE_URL = "https://api.onepeloton.com"
 
-    def __init__(self, session: requests.Session, user_id: str):
+    def __init__(
+        self,
+        session: Optional[requests.Session],
+        user_id: str,
+        transport: Optional[Transport] = None,
+        base_url: Optional[str] = None,
+    ):
         """
         Initialize the API client.
 
         Args:
-            session: Authenticated requests.Session
+            session: Authenticated requests.Session (may be None when a
+                     transport that doesn't need one is given)
             user_id: Peloton user ID
+            transport: How requests are sent (default: over the session);
+                       see src.extraction.transport for record/replay
+            base_url: API base URL (default: BASE_URL)
         """
         self.session = session
         self.user_id = user_id
+        self.transport = transport or SessionTransport(session)
+        if base_url:
+            self.BASE_URL = base_url
 
         # Rate limiting
         self.min_request_interval = 0.1  # seconds between requests
@@ -61,7 +77,9 @@ class PelotonAPIClient:
         Raises:
             requests.HTTPError: On HTTP errors
         """
-        self._rate_limit()
+        if self.transport.rate_limited:
+            with profiling.stage("api.rate_limit"):
+                self._rate_limit()
 
         url = f"{self.BASE_URL}{endpoint}"
         default_headers = {"peloton-platform": "web"}
@@ -70,11 +88,13 @@ class PelotonAPIClient:
             default_headers.update(headers)
 
         try:
-            response = self.session.request(
-                method=method, url=url, params=params, headers=default_headers
-            )
+            with profiling.stage("api.request"):
+                response = self.transport.send(
+                    method, url, params=params, headers=default_headers
+                )
             response.raise_for_status()
-            return response.json()
+            with profiling.stage("api.decode"):
+                return response.json()
 
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP error for {endpoint}: {e}")
@@ -140,25 +160,66 @@ class PelotonAPIClient:
         page = 0
         limit = 100
 
-        while True:
-            response = self.get_workouts(page=page, limit=limit, joins=joins)
-            workouts = response.get("data", [])
+        with profiling.stage("api.pagination"):
+            while True:
+                response = self.get_workouts(page=page, limit=limit, joins=joins)
+                workouts = response.get("data", [])
 
-            if not workouts:
-                break
+                if not workouts:
+                    break
 
-            all_workouts.extend(workouts)
-            logger.info(f"Fetched {len(all_workouts)} workouts so far...")
+                all_workouts.extend(workouts)
+                logger.info(f"Fetched {len(all_workouts)} workouts so far...")
 
-            # Check if there are more pages
-            if len(workouts) < limit:
-                break
+                # Check if there are more pages
+                if len(workouts) < limit:
+                    break
 
-            page += 1
+                page += 1
 
         logger.info(f"Fetched total of {len(all_workouts)} workouts")
         return all_workouts
 
+    def get_workouts_since(self, created_after: int, joins: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get workouts from a timestamp on, stopping at the first older page.
+
+        Pages are newest first, so an incremental sync only requests the
+        pages that contain new workouts. Workouts created at exactly
+        created_after are included, so one that shares its second with the
+        newest stored workout isn't missed; WorkoutStore.merge() drops the
+        already-stored ones by id.
+
+        Args:
+            created_after: Unix timestamp; workouts created at or after it
+                           are returned
+            joins: Comma-separated list of related data to include
+
+        Returns:
+            List of workout data (newest first)
+        """
+        logger.info(f"Fetching workouts created after {created_after}...")
+        new_workouts = []
+        page = 0
+        limit = 100
+
+        with profiling.stage("api.pagination"):
+            while True:
+                response = self.get_workouts(page=page, limit=limit, joins=joins)
+                workouts = response.get("data", [])
+
+                newer = [w for w in workouts if (w.get("created_at") or 0) >= created_after]
+                new_workouts.extend(newer)
+
+                # Stop once a page reaches already-known workouts or the end
+                if len(newer) < len(workouts) or len(workouts) < limit:
+                    break
+
+                page += 1
+
+        logger.info(f"Fetched {len(new_workouts)} new workouts")
+        return new_workouts
+
     def get_workout_detail(self, workout_id: str) -> Dict[str, Any]:
         """
         Get detailed information about a specific workout.
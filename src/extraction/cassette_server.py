@@ -0,0 +1,142 @@
+"""
+Cassette Server
+
+Local HTTP server that serves recorded API responses from a cassette.
+
+Point anything that talks to the Peloton API (PelotonAuthenticator,
+PelotonAPIClient, curl, other tools) at the server's URL to run it
+offline and reproducibly against real recorded data.
+
+Usage:
+    python -m src.extraction.cassette_server data/cassettes/sync.db --port 8765
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+import argparse
+import json
+import logging
+import threading
+
+from src.extraction.transport import Cassette, request_key
+
+logger = logging.getLogger(__name__)
+
+
+class _CassetteHandler(BaseHTTPRequestHandler):
+    """Answers requests with recorded responses."""
+
+    server: "CassetteServer"
+
+    # Keep-alive, so pooled client connections are reused
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format % args)
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve(self, method: str) -> None:
+        # Drain any request body so the connection can be reused
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        if method == "POST" and self.path.split("?")[0] == "/auth/login":
+            user_id = self.server.cassette.get_meta("user_id")
+            self._send(200, json.dumps({"user_id": user_id, "session_id": "replay"}).encode())
+            return
+
+        recorded = self.server.cassette.get(request_key(method, self.path))
+        if recorded is None:
+            self.server.misses += 1
+            body = {"status": 404, "message": f"Not recorded: {method} {self.path}"}
+            self._send(404, json.dumps(body).encode())
+            return
+
+        self.server.hits += 1
+        status, body, headers = recorded
+        self._send(status, body, headers.get("Content-Type", "application/json"))
+
+    def do_GET(self) -> None:
+        self._serve("GET")
+
+    def do_POST(self) -> None:
+        self._serve("POST")
+
+
+class CassetteServer(ThreadingHTTPServer):
+    """Threaded HTTP server replaying a cassette."""
+
+    daemon_threads = True
+
+    def __init__(self, cassette: Cassette, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server (port 0 picks a free port).
+
+        Args:
+            cassette: Cassette to serve
+            host: Interface to bind
+            port: Port to bind
+        """
+        super().__init__((host, port), _CassetteHandler)
+        self.cassette = cassette
+        self.hits = 0
+        self.misses = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use in place of the Peloton API base URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "CassetteServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.stop()
+
+
+def main() -> None:
+    """Serve a cassette until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve recorded Peloton API responses.")
+    parser.add_argument("cassette", help="Cassette file to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    cassette = Cassette(args.cassette)
+    server = CassetteServer(cassette, args.host, args.port)
+    logger.info(f"Serving {len(cassette)} recorded responses at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        cassette.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+CSV Import
+
+Import Peloton workout data from the official CSV export.
+
+Download your CSV from: https://members.onepeloton.com/profile/workouts
+"""
+
+from pathlib import Path
+from datetime import datetime
+import logging
+
+import pandas as pd
+
+from src import profiling
+from src.storage.workout_store import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+
+def import_csv(csv_path: str) -> pd.DataFrame:
+    """
+    Import Peloton workout CSV and convert to structured format.
+
+    Args:
+        csv_path: Path to the Peloton workouts CSV file
+
+    Returns:
+        DataFrame with processed workout data
+    """
+    logger.info(f"Loading CSV from {csv_path}...")
+
+    try:
+        with profiling.stage("csv.read_csv"):
+            df = pd.read_csv(csv_path)
+        logger.info(f"✓ Loaded {len(df)} workouts from CSV")
+
+        # Display column names to help with processing
+        logger.info(f"Columns found: {', '.join(df.columns.tolist())}")
+
+        return df
+
+    except FileNotFoundError:
+        logger.error(f"File not found: {csv_path}")
+        raise
+    except Exception as e:
+        logger.error(f"Error loading CSV: {e}")
+        raise
+
+
+def save_processed_data(df: pd.DataFrame, output_dir: Path):
+    """
+    Save processed data to JSON format.
+
+    Args:
+        df: DataFrame with workout data
+        output_dir: Directory to save output files
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Save as JSON
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_file = output_dir / f"workouts_csv_import_{timestamp}.json"
+
+    logger.info(f"Saving to {json_file}...")
+    latest_file = output_dir / "workouts_latest.json"
+    with profiling.stage("csv.json_dump"):
+        df.to_json(json_file, orient='records', indent=2, date_format='iso')
+
+        # Also save as latest
+        df.to_json(latest_file, orient='records', indent=2, date_format='iso')
+
+    # Let caches and aggregates know the data changed
+    bump_data_version(output_dir.parent)
+
+    logger.info(f"✓ Saved {len(df)} workouts to {json_file}")
+    logger.info(f"✓ Also saved to {latest_file}")
+
+
+def print_summary(df: pd.DataFrame):
+    """Print summary statistics."""
+    logger.info("\n" + "=" * 60)
+    logger.info("WORKOUT SUMMARY")
+    logger.info("=" * 60)
+
+    logger.info(f"\nTotal Workouts: {len(df)}")
+
+    # Check for common column names (these may vary)
+    possible_type_cols = ['Fitness Discipline', 'Workout Type', 'Type']
+    type_col = None
+    for col in possible_type_cols:
+        if col in df.columns:
+            type_col = col
+            break
+
+    if type_col:
+        logger.info(f"\nWorkouts by {type_col}:")
+        counts = df[type_col].value_counts()
+        for workout_type, count in counts.items():
+            logger.info(f"  {workout_type}: {count}")
+
+    # Look for date columns
+    possible_date_cols = ['Workout Timestamp', 'Date', 'Created At']
+    date_col = None
+    for col in possible_date_cols:
+        if col in df.columns:
+            date_col = col
+            break
+
+    if date_col:
+        try:
+            dates = pd.to_datetime(df[date_col])
+            logger.info(f"\nDate Range: {dates.min()} to {dates.max()}")
+        except:
+            pass
+
+    logger.info("\n" + "=" * 60)
@@ -0,0 +1,343 @@
+"""
+Sync Daemon
+
+Long-running incremental sync, as an alternative to running
+``fetch_all_workouts.py`` from cron.
+
+The daemon logs in once and keeps the authenticated, connection-pooled
+session for its whole lifetime, logging in again only if the session
+expires. On a jittered schedule it fetches new workouts into the workout
+store, then refreshes the aggregates and personal records and optionally
+harvests performance graphs for the new rides.
+
+Aggregates are refreshed whenever they lag behind the workout store's
+version, so a refresh that failed is retried on the next tick. Only the
+newest few timestamped snapshots of the store are kept.
+
+Analysis refreshes run in a short-lived worker process. pandas memory is
+returned to the OS when that process exits, so the daemon's footprint stays
+flat over weeks of uptime. Health is written to ``data/daemon_health.json``
+after every tick, and SIGTERM/SIGINT stop the daemon after the current tick.
+
+Usage:
+    scripts/peloton daemon --interval 900
+    scripts/peloton daemon --status
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+from datetime import datetime, timedelta
+import gc
+import json
+import logging
+import os
+import random
+import resource
+import signal
+import threading
+import time
+
+import requests
+
+from src.extraction.sync import harvest_graphs, missing_graphs, sync_workouts
+from src.storage.performance_store import PerformanceGraphStore
+from src.storage.workout_store import DEFAULT_DATA_DIR, WorkoutStore
+
+logger = logging.getLogger(__name__)
+
+HEALTH_FILE = "daemon_health.json"
+
+# Consecutive failed ticks before the daemon reports itself unhealthy
+UNHEALTHY_AFTER_FAILURES = 3
+
+# Tick results kept in memory for the health report
+RECENT_TICKS = 20
+
+# Timestamped workout snapshots kept in data/raw
+KEEP_SNAPSHOTS = 5
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        return peak / 2**20 if peak > 2**32 else peak / 2**10
+
+
+def _refresh_analysis(data_dir: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """Refresh aggregates; return their version and new PRs (runs in a worker process)."""
+    from src.analysis.aggregates import refresh_aggregates
+
+    started = datetime.now()
+    aggregates = refresh_aggregates(data_dir)
+    # Already up to date: its PRs were reported when it was built
+    fresh = datetime.fromisoformat(aggregates["built_at"]) >= started
+    return aggregates["version"], aggregates["new_records"] if fresh else []
+
+
+def read_health(data_dir: Union[str, Path] = DEFAULT_DATA_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Read the daemon's last health report.
+
+    Args:
+        data_dir: Data directory
+
+    Returns:
+        Health dictionary, or None if the daemon has never run
+    """
+    try:
+        with open(Path(data_dir) / HEALTH_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def is_healthy(health: Optional[Dict[str, Any]], now: Optional[datetime] = None) -> bool:
+    """
+    Check a health report: running, not failing repeatedly, and not stale.
+
+    Args:
+        health: Report from read_health()
+        now: Current time (default: now)
+
+    Returns:
+        True if the daemon looks healthy
+    """
+    if not health or health.get("status") not in ("running", "syncing", "backoff"):
+        return False
+    if health.get("consecutive_failures", 0) >= UNHEALTHY_AFTER_FAILURES:
+        return False
+    stale_after = health.get("stale_after")
+    return stale_after is None or (now or datetime.now()) <= datetime.fromisoformat(stale_after)
+
+
+class SyncDaemon:
+    """Polls for new workouts over one long-lived session."""
+
+    def __init__(
+        self,
+        client,
+        data_dir: Union[str, Path] = DEFAULT_DATA_DIR,
+        interval: float = 900.0,
+        jitter: float = 0.2,
+        max_backoff: float = 3600.0,
+        harvest: int = 0,
+        isolate_analysis: bool = True,
+        keep_snapshots: int = KEEP_SNAPSHOTS,
+    ):
+        """
+        Initialize the daemon.
+
+        Args:
+            client: PelotonClient (connected on start)
+            data_dir: Data directory
+            interval: Mean seconds between polls
+            jitter: Random spread of each delay, as a fraction of interval
+            max_backoff: Longest delay after repeated failures
+            harvest: Performance graphs to fetch per tick (0 to disable)
+            isolate_analysis: Refresh aggregates in a worker process
+            keep_snapshots: Timestamped workout snapshots to keep
+        """
+        self.client = client
+        self.data_dir = Path(data_dir)
+        self.store = WorkoutStore(self.data_dir)
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.harvest = harvest
+        self.isolate_analysis = isolate_analysis
+        self.keep_snapshots = keep_snapshots
+        self.health_path = self.data_dir / HEALTH_FILE
+
+        self._stop = threading.Event()
+        self._status = "starting"
+        self._started_at = datetime.now()
+        self._ticks = 0
+        self._failures = 0
+        self._workouts_added = 0
+        self._records_set = 0
+        self._last_success: Optional[datetime] = None
+        self._last_error: Optional[str] = None
+        self._next_run: Optional[datetime] = None
+        self._tick_started: Optional[datetime] = None
+        # Data version the aggregates were last refreshed at (unknown until the first tick)
+        self._analysed_version: Optional[str] = None
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_TICKS)
+
+    def next_delay(self) -> float:
+        """Seconds until the next poll: jittered interval, or backoff after failures."""
+        if self._failures:
+            base = min(self.interval / 4 * 2 ** (self._failures - 1), self.max_backoff)
+        else:
+            base = self.interval
+        return max(base * random.uniform(1 - self.jitter, 1 + self.jitter), 1.0)
+
+    def _refresh(self) -> List[Dict[str, Any]]:
+        if not self.isolate_analysis:
+            version, new_records = _refresh_analysis(str(self.data_dir))
+        else:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                version, new_records = pool.submit(_refresh_analysis, str(self.data_dir)).result()
+        self._analysed_version = version
+        return new_records
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Run one sync tick: fetch, ingest, refresh analysis, harvest.
+
+        Returns:
+            Tick result with added, new_records, graphs and seconds
+        """
+        start = time.perf_counter()
+        try:
+            added = sync_workouts(self.client, self.store, refresh=False)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 401:
+                raise
+            # Session expired: log in again once (reusing the session) and retry
+            logger.info("Session expired, logging in again...")
+            if not self.client.connect():
+                raise
+            added = sync_workouts(self.client, self.store, refresh=False)
+
+        if added and self.keep_snapshots:
+            self.store.prune_snapshots(self.keep_snapshots)
+
+        # Not just when workouts were added: an earlier tick may have stored
+        # workouts and then failed to refresh
+        new_records = self._refresh() if self._analysed_version != self.store.version else []
+        for record in new_records:
+            logger.info(
+                f"🏆 New PR: {record['value']:.0f} kJ in a {record['duration_minutes']} min "
+                f"{record['discipline']} ride (previous {record['previous'] or 0:.0f} kJ)"
+            )
+
+        graphs = 0
+        if self.harvest:
+            workout_ids = missing_graphs(self.store, PerformanceGraphStore(self.data_dir))[: self.harvest]
+            if workout_ids:
+                graphs = len(harvest_graphs(self.client, workout_ids, self.data_dir)["fetched"])
+
+        return {
+            "added": added,
+            "new_records": len(new_records),
+            "graphs": graphs,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    def health(self) -> Dict[str, Any]:
+        """Current health report."""
+        stale_after = None
+        if self._next_run is not None:
+            # Allow a full tick's worth of slack past the scheduled run
+            stale_after = (self._next_run + timedelta(seconds=self.interval)).isoformat()
+        elif self._tick_started is not None:
+            # Syncing: a tick taking longer than an interval is stuck
+            stale_after = (self._tick_started + timedelta(seconds=self.interval)).isoformat()
+        return {
+            "status": self._status,
+            "healthy": self._failures < UNHEALTHY_AFTER_FAILURES,
+            "pid": os.getpid(),
+            "started_at": self._started_at.isoformat(),
+            "updated_at": datetime.now().isoformat(),
+            "ticks": self._ticks,
+            "consecutive_failures": self._failures,
+            "last_success_at": self._last_success.isoformat() if self._last_success else None,
+            "last_error": self._last_error,
+            "next_run_at": self._next_run.isoformat() if self._next_run else None,
+            "stale_after": stale_after,
+            "workouts_added": self._workouts_added,
+            "records_set": self._records_set,
+            "data_version": self.store.version,
+            "rss_mb": round(_rss_mb(), 1),
+            "recent_ticks": list(self._recent),
+        }
+
+    def _write_health(self) -> None:
+        self.health_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.health_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.health(), f, indent=2)
+        os.replace(tmp_path, self.health_path)
+
+    def _set_status(self, status: str) -> None:
+        self._status = status
+        self._write_health()
+
+    def stop(self, *_: Any) -> None:
+        """Ask the daemon to exit after the current tick (signal-handler safe)."""
+        if not self._stop.is_set():
+            logger.info("Shutdown requested; finishing current tick...")
+        self._stop.set()
+
+    def _install_signal_handlers(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+    def run(self, max_ticks: Optional[int] = None) -> int:
+        """
+        Poll until stopped.
+
+        Args:
+            max_ticks: Stop after this many ticks (default: run until signalled)
+
+        Returns:
+            Exit code (0 on clean shutdown)
+        """
+        self._install_signal_handlers()
+        self._set_status("starting")
+
+        if not self.client.connect():
+            self._last_error = "Failed to connect"
+            self._set_status("stopped")
+            return 1
+
+        logger.info(f"Sync daemon started (interval {self.interval:.0f}s ± {self.jitter:.0%})")
+        try:
+            while not self._stop.is_set():
+                self._next_run = None
+                self._tick_started = datetime.now()
+                self._set_status("syncing")
+                tick = {"at": datetime.now().isoformat()}
+                try:
+                    tick.update(self.run_once())
+                    self._failures = 0
+                    self._last_success = datetime.now()
+                    self._last_error = None
+                    self._workouts_added += tick["added"]
+                    self._records_set += tick["new_records"]
+                    if tick["added"]:
+                        logger.info(f"✓ Ingested {tick['added']} new workouts in {tick['seconds']:.1f}s")
+                except Exception as e:
+                    self._failures += 1
+                    self._last_error = f"{type(e).__name__}: {e}"
+                    tick["error"] = self._last_error
+                    logger.error(f"Sync failed ({self._failures} in a row): {e}")
+
+                self._ticks += 1
+                self._recent.append(tick)
+                # Drop per-tick garbage (parsed JSON pages, frames) promptly
+                gc.collect()
+
+                if max_ticks is not None and self._ticks >= max_ticks:
+                    break
+
+                delay = self.next_delay()
+                self._next_run = datetime.now() + timedelta(seconds=delay)
+                self._set_status("backoff" if self._failures else "running")
+                self._stop.wait(delay)
+        finally:
+            self._next_run = self._tick_started = None
+            self._set_status("stopped")
+            self.client.disconnect()
+            logger.info("Sync daemon stopped")
+
+        return 0
@@ -9,8 +9,18 @@ import logging
 from dotenv import load_dotenv
 import os
 
+from requests.adapters import HTTPAdapter
+
 from src.auth.authenticator import PelotonAuthenticator
 from src.extraction.api_client import PelotonAPIClient
+from src.storage.response_archive import ResponseArchive
+from src.extraction.transport import (
+    ArchivingTransport,
+    Cassette,
+    RecordingTransport,
+    ReplayTransport,
+    SessionTransport,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,27 +28,50 @@ logger = logging.getLogger(__name__)
 class PelotonClient:
     """High-level client for accessing Peloton data."""
 
-    def __init__(self, username: Optional[str] = None, password: Optional[str] = None):
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        cassette: Optional[str] = None,
+        replay: bool = False,
+        adapter: Optional[HTTPAdapter] = None,
+        archive: Optional[ResponseArchive] = None,
+    ):
         """
         Initialize the Peloton client.
 
         Args:
             username: Peloton username/email (or set PELOTON_USERNAME env var)
             password: Peloton password (or set PELOTON_PASSWORD env var)
+            cassette: Cassette file to record responses into (or replay from)
+            replay: Serve all requests from the cassette instead of the API;
+                    no credentials or network needed
+            adapter: Shared transport adapter (connection pool) for the session
+            archive: Keep raw workout detail and performance graph responses
+                     in this archive (also when replaying a cassette)
         """
         # Load environment variables
         load_dotenv()
 
         self.username = username or os.getenv("PELOTON_USERNAME")
         self.password = password or os.getenv("PELOTON_PASSWORD")
+        self.base_url = os.getenv("PELOTON_API_BASE") or PelotonAPIClient.BASE_URL
+        self.replay = replay
+
+        if replay and not cassette:
+            raise ValueError("Replay mode requires a cassette.")
 
-        if not self.username or not self.password:
+        if not replay and (not self.username or not self.password):
             raise ValueError(
                 "Username and password required. Provide as arguments or set "
                 "PELOTON_USERNAME and PELOTON_PASSWORD environment variables."
             )
 
-        self.authenticator = PelotonAuthenticator(self.username, self.password)
+        self.cassette = Cassette(cassette) if cassette else None
+        self.archive = archive
+        self.authenticator = PelotonAuthenticator(
+            self.username, self.password, base_url=self.base_url, adapter=adapter
+        )
         self.api_client: Optional[PelotonAPIClient] = None
 
     def connect(self) -> bool:
@@ -48,14 +81,37 @@ class PelotonClient:
         Returns:
             True if successful, False otherwise
         """
+        if self.replay:
+            user_id = self.cassette.get_meta("user_id")
+            if not user_id:
+                logger.error(f"Cassette {self.cassette.path} has no recorded user")
+                return False
+            transport = self._archiving(ReplayTransport(self.cassette))
+            self.api_client = PelotonAPIClient(None, user_id, transport=transport, base_url=self.base_url)
+            logger.info(f"Replaying {len(self.cassette)} recorded responses from {self.cassette.path}")
+            return True
+
         if self.authenticator.login():
             session = self.authenticator.get_session()
             user_id = self.authenticator.get_user_id()
-            self.api_client = PelotonAPIClient(session, user_id)
+            transport = SessionTransport(session)
+            if self.cassette is not None:
+                self.cassette.set_meta("user_id", user_id)
+                transport = RecordingTransport(transport, self.cassette)
+                logger.info(f"Recording responses to {self.cassette.path}")
+            transport = self._archiving(transport)
+            self.api_client = PelotonAPIClient(session, user_id, transport=transport, base_url=self.base_url)
             logger.info("Successfully connected to Peloton API")
             return True
         return False
 
+    def _archiving(self, transport):
+        """Wrap a transport to archive raw responses, if an archive was given."""
+        if self.archive is None:
+            return transport
+        logger.info(f"Archiving raw responses to {self.archive.root}")
+        return ArchivingTransport(transport, self.archive)
+
     def disconnect(self) -> None:
         """Disconnect from Peloton API."""
         self.authenticator.logout()
@@ -69,6 +125,8 @@ class PelotonClient:
     @property
     def user_id(self) -> str:
         """Get the authenticated user's ID."""
+        if self.api_client is not None:
+            return self.api_client.user_id
         return self.authenticator.get_user_id()
 
     # Convenience methods that delegate to API client
@@ -95,6 +153,11 @@ class PelotonClient:
         self._ensure_connected()
         return self.api_client.get_all_workouts(joins=joins)
 
+    def get_workouts_since(self, created_after: int, joins: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get workouts created at or after a timestamp (incremental sync)."""
+        self._ensure_connected()
+        return self.api_client.get_workouts_since(created_after, joins=joins)
+
     def get_workout_detail(self, workout_id: str) -> Dict[str, Any]:
         """Get detailed workout information."""
         self._ensure_connected()
@@ -0,0 +1,127 @@
+"""
+Sync
+
+Incremental sync of workout history and performance graphs into local
+storage.
+
+A sync only requests the pages newer than the newest stored workout, merges
+them into the workout store and refreshes the precomputed aggregates when
+anything changed. A harvest fetches full-detail performance graphs for
+stored workouts that don't have one yet.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+import logging
+
+from src.analysis.aggregates import refresh_aggregates
+from src.storage.performance_store import PerformanceGraphStore
+from src.storage.workout_store import DEFAULT_DATA_DIR, FORMAT_CSV, MixedFormatError, WorkoutStore
+
+logger = logging.getLogger(__name__)
+
+# Related data stored with every workout
+JOINS = "ride,ride.instructor"
+
+
+def sync_workouts(client, store: WorkoutStore, full: bool = False, refresh: bool = True) -> int:
+    """
+    Fetch new workouts and add them to the store.
+
+    Args:
+        client: Connected PelotonClient (or PelotonAPIClient)
+        store: Workout store to update
+        full: Re-fetch the whole history instead of only new workouts
+        refresh: Refresh the precomputed aggregates if anything was added
+
+    Returns:
+        Number of workouts added
+
+    Raises:
+        MixedFormatError: If the store holds a CSV import and full is False
+    """
+    since = None if full else store.latest_created_at()
+    if since is None and not full and store.stored_format() == FORMAT_CSV:
+        # CSV rows have no API created_at or ids to sync incrementally against
+        raise MixedFormatError(
+            "Stored workouts were imported from the CSV export; "
+            "run a full sync (--full) to replace them with API workouts"
+        )
+
+    if since is None:
+        workouts = client.get_all_workouts(joins=JOINS)
+    else:
+        workouts = client.get_workouts_since(since, joins=JOINS)
+
+    if full:
+        # Replace the store so updated records are picked up too
+        store.save(workouts)
+        added = len(workouts)
+    else:
+        added = store.merge(workouts)
+
+    if added and refresh:
+        refresh_aggregates(store.data_dir)
+    return added
+
+
+def missing_graphs(
+    store: WorkoutStore,
+    graphs: PerformanceGraphStore,
+    disciplines: Optional[Iterable[str]] = ("cycling",),
+) -> List[str]:
+    """
+    List stored workouts that have no performance graph yet (newest first).
+
+    Args:
+        store: Workout store
+        graphs: Performance graph store
+        disciplines: Only consider these fitness disciplines (None for all)
+
+    Returns:
+        Workout IDs
+    """
+    wanted = set(disciplines) if disciplines is not None else None
+    stored = set(graphs.workout_ids())
+    return [
+        w["id"]
+        for w in store.load()
+        if w.get("id") not in stored
+        and (wanted is None or w.get("fitness_discipline") in wanted)
+    ]
+
+
+def harvest_graphs(
+    client,
+    workout_ids: Iterable[str],
+    data_dir: Union[str, Path] = DEFAULT_DATA_DIR,
+    every_n: int = 1,
+    overwrite: bool = False,
+) -> Dict[str, List[str]]:
+    """
+    Fetch and store performance graphs for workouts.
+
+    Args:
+        client: Connected PelotonClient (or PelotonAPIClient)
+        workout_ids: Workouts to fetch graphs for
+        data_dir: Data directory
+        every_n: Sampling interval to request (1 for full detail)
+        overwrite: Re-fetch graphs that are already stored
+
+    Returns:
+        Dictionary with "fetched" and "failed" workout ID lists
+    """
+    graphs = PerformanceGraphStore(data_dir)
+    fetched, failed = [], []
+
+    for workout_id in workout_ids:
+        try:
+            graphs.fetch(client, workout_id, every_n=every_n, overwrite=overwrite)
+        except Exception as e:
+            logger.error(f"Failed to fetch performance graph for {workout_id}: {e}")
+            failed.append(workout_id)
+            continue
+        fetched.append(workout_id)
+
+    logger.info(f"✓ Harvested {len(fetched)} performance graphs ({len(failed)} failed)")
+    return {"fetched": fetched, "failed": failed}
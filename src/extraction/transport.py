@@ -0,0 +1,336 @@
+"""
+API Transports
+
+Pluggable HTTP layer under PelotonAPIClient, with record/replay support.
+
+- SessionTransport sends requests over an authenticated requests.Session.
+- RecordingTransport wraps another transport and stores every response in
+  a cassette.
+- ReplayTransport answers requests from a cassette without touching the
+  network (and without rate-limit sleeps).
+- ArchivingTransport wraps another transport and keeps the raw workout
+  detail and performance graph bodies in a ResponseArchive
+  (see src.storage.response_archive).
+
+Cassettes are single SQLite files holding zlib-compressed response bodies,
+indexed by request key (method, path and canonical query), so lookups stay
+fast with hundreds of thousands of recorded responses. Keys don't include
+the host, so a cassette recorded against the live API can be replayed in
+process or served by CassetteServer (see src.extraction.cassette_server).
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlparse
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+
+from src.config import DEFAULT_TIMEOUT
+from src.storage.response_archive import ENDPOINT_PERFORMANCE_GRAPH, ENDPOINT_WORKOUT, ResponseArchive
+
+logger = logging.getLogger(__name__)
+
+_WORKOUT_PATH = re.compile(r"/api/workout/(?P<workout_id>[^/]+)(?P<graph>/performance_graph)?/?$")
+
+
+class CassetteMissError(KeyError):
+    """Raised when replaying a request that was never recorded."""
+
+
+def request_key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the cassette key for a request.
+
+    Args:
+        method: HTTP method
+        url: Full URL or path (the host is ignored)
+        params: Query parameters
+
+    Returns:
+        Key such as "GET /api/user/123/workouts?limit=100&page=0"
+    """
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+    query.update({k: str(v) for k, v in (params or {}).items() if v is not None})
+    key = f"{method.upper()} {parsed.path}"
+    if query:
+        key += "?" + urlencode(sorted(query.items()))
+    return key
+
+
+def build_response(status: int, body: bytes, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """Build a requests.Response from stored parts."""
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.url = url
+    response.headers.update(headers or {"Content-Type": "application/json"})
+    response.encoding = "utf-8"
+    return response
+
+
+class Cassette:
+    """Compressed, indexed store of recorded API responses."""
+
+    def __init__(self, path: Union[str, Path], compression_level: int = 6):
+        """
+        Open (or create) a cassette.
+
+        Args:
+            path: Cassette file path (SQLite)
+            compression_level: zlib level for stored bodies
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                recorded_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def put(self, key: str, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        """
+        Store a response (replacing any earlier recording of the same key).
+
+        Args:
+            key: Request key from request_key()
+            status: HTTP status code
+            body: Raw response body
+            headers: Response headers worth keeping (e.g. Content-Type)
+        """
+        compressed = zlib.compress(body, self.compression_level)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, status, json.dumps(headers or {}), compressed, time.time()),
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[int, bytes, Dict[str, str]]]:
+        """
+        Look up a recorded response.
+
+        Args:
+            key: Request key from request_key()
+
+        Returns:
+            Tuple of (status, body, headers), or None if not recorded
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, body, headers FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, compressed, headers = row
+        return status, zlib.decompress(compressed), json.loads(headers)
+
+    def keys(self) -> Iterator[str]:
+        """Iterate over all recorded request keys."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM responses ORDER BY key").fetchall()
+        return (row[0] for row in rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def set_meta(self, name: str, value: str) -> None:
+        """Store a cassette-level value (e.g. the recorded user_id)."""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, value))
+            self._conn.commit()
+
+    def get_meta(self, name: str) -> Optional[str]:
+        """Get a cassette-level value."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._conn.close()
+
+
+class Transport(ABC):
+    """Sends API requests and returns requests.Response objects."""
+
+    # Whether the client should apply its rate limit before each request
+    rate_limited = True
+
+    @abstractmethod
+    def send(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """
+        Send a request.
+
+        Args:
+            method: HTTP method
+            url: Full request URL
+            params: Query parameters
+            headers: Request headers
+
+        Returns:
+            requests.Response
+        """
+
+
+class SessionTransport(Transport):
+    """Sends requests over a requests.Session (the live API)."""
+
+    def __init__(self, session: requests.Session, timeout: Optional[Tuple[float, float]] = DEFAULT_TIMEOUT):
+        """
+        Initialize the transport.
+
+        Args:
+            session: Authenticated requests.Session
+            timeout: (connect, read) timeout in seconds for each request
+        """
+        self.session = session
+        self.timeout = timeout
+
+    def send(self, method, url, params=None, headers=None) -> requests.Response:
+        return self.session.request(method=method, url=url, params=params, headers=headers,
+                                    timeout=self.timeout)
+
+
+class RecordingTransport(Transport):
+    """Forwards requests to another transport and records the responses."""
+
+    def __init__(self, inner: Transport, cassette: Cassette, record_errors: bool = False):
+        """
+        Initialize the transport.
+
+        Args:
+            inner: Transport that performs the real requests
+            cassette: Cassette to record into
+            record_errors: Also record non-2xx responses
+        """
+        self.inner = inner
+        self.cassette = cassette
+        self.record_errors = record_errors
+        self.rate_limited = inner.rate_limited
+
+    def send(self, method, url, params=None, headers=None) -> requests.Response:
+        response = self.inner.send(method, url, params=params, headers=headers)
+        if response.ok or self.record_errors:
+            content_type = response.headers.get("Content-Type", "application/json")
+            self.cassette.put(
+                request_key(method, url, params),
+                response.status_code,
+                response.content,
+                {"Content-Type": content_type},
+            )
+        return response
+
+
+class ReplayTransport(Transport):
+    """Answers requests from a cassette, without network or rate limiting."""
+
+    rate_limited = False
+
+    def __init__(self, cassette: Cassette, fallback: Optional[Transport] = None):
+        """
+        Initialize the transport.
+
+        Args:
+            cassette: Cassette to replay from
+            fallback: Transport for requests that weren't recorded
+                      (default: raise CassetteMissError)
+        """
+        self.cassette = cassette
+        self.fallback = fallback
+        self.hits = 0
+        self.misses = 0
+
+    def send(self, method, url, params=None, headers=None) -> requests.Response:
+        key = request_key(method, url, params)
+        recorded = self.cassette.get(key)
+        if recorded is None:
+            self.misses += 1
+            if self.fallback is None:
+                raise CassetteMissError(f"No recorded response for {key}")
+            return self.fallback.send(method, url, params=params, headers=headers)
+
+        self.hits += 1
+        status, body, response_headers = recorded
+        return build_response(status, body, url, response_headers)
+
+
+def archive_key(url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Tuple[str, str]]:
+    """
+    Map a request to its archive key.
+
+    Args:
+        url: Full URL or path
+        params: Query parameters
+
+    Returns:
+        (workout_id, endpoint) for workout detail and performance graph
+        requests, None for anything else. Graphs sampled coarser than 1 s
+        are archived as "performance_graph?every_n=N".
+    """
+    match = _WORKOUT_PATH.search(urlparse(url).path)
+    if match is None:
+        return None
+    if not match["graph"]:
+        return match["workout_id"], ENDPOINT_WORKOUT
+
+    query = dict(parse_qsl(urlparse(url).query))
+    query.update({k: str(v) for k, v in (params or {}).items() if v is not None})
+    every_n = query.get("every_n", "1")
+    endpoint = ENDPOINT_PERFORMANCE_GRAPH if every_n == "1" else f"{ENDPOINT_PERFORMANCE_GRAPH}?every_n={every_n}"
+    return match["workout_id"], endpoint
+
+
+class ArchivingTransport(Transport):
+    """Forwards requests to another transport and archives raw workout responses."""
+
+    def __init__(self, inner: Transport, archive: ResponseArchive):
+        """
+        Initialize the transport.
+
+        Args:
+            inner: Transport that performs the requests
+            archive: Archive for successful workout detail and
+                     performance graph responses
+        """
+        self.inner = inner
+        self.archive = archive
+        self.rate_limited = inner.rate_limited
+
+    def send(self, method, url, params=None, headers=None) -> requests.Response:
+        response = self.inner.send(method, url, params=params, headers=headers)
+        key = archive_key(url, params) if method.upper() == "GET" and response.ok else None
+        if key is not None:
+            self.archive.put(*key, response.content)
+        return response
@@ -0,0 +1,473 @@
+"""
+Pipeline Profiling
+
+Times named pipeline stages and writes a consolidated report with wall
+time, CPU time and peak RSS per stage. For chosen stages it can also
+capture a cProfile profile and tracemalloc snapshots (top allocators).
+
+Library code marks its stages with a context manager, which does nothing
+unless a profiler is active:
+
+    from src import profiling
+
+    with profiling.stage("store.json_dump"):
+        json.dump(workouts, f)
+
+Stages nest; a stage entered inside another is reported under its parent's
+path (e.g. ``sync/api.pagination``). A run is profiled by activating a
+Profiler, usually through ``profile_run()`` (what ``peloton --profile``
+uses):
+
+    with profile_run("sync", "data/profiles/sync.json", detail=["api.pagination"]):
+        sync_workouts(client, store)
+
+Stages running in worker processes (exports, reports, isolated daemon
+analysis) are not captured; the stage that waits on them is.
+
+Only the standard library is imported here, and cProfile/tracemalloc only
+once a detailed stage runs, so any module can import this cheaply.
+"""
+
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+import io
+import json
+import logging
+import os
+import re
+import resource
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rows listed per detailed stage (allocators and functions)
+DEFAULT_TOP = 10
+
+# Frames tracemalloc keeps per allocation
+TRACEMALLOC_FRAMES = 1
+
+_active: Optional["Profiler"] = None
+
+_NULL_STAGE = nullcontext()
+
+
+def stage(name: str):
+    """
+    Context manager timing a named stage of the active profiler.
+
+    Returns a no-op context manager when profiling is off, so stages can be
+    left in library code at negligible cost.
+
+    Args:
+        name: Stage name (dotted, e.g. "analysis.build")
+    """
+    profiler = _active
+    if profiler is None:
+        return _NULL_STAGE
+    return profiler.stage(name)
+
+
+def active() -> Optional["Profiler"]:
+    """Get the active profiler, if any."""
+    return _active
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return 0.0
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size in MB since the last reset (or process start)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2**10
+    except (OSError, ValueError):
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / 2**20 if peak > 2**32 else peak / 2**10
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's peak RSS counter (Linux 4.0+); False if unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def report_path(directory: Union[str, Path], label: str) -> Path:
+    """
+    Default report location for a run.
+
+    Args:
+        directory: Reports directory
+        label: Run label (e.g. the command name)
+
+    Returns:
+        <directory>/<label>-<timestamp>.json
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return Path(directory) / f"{label}-{timestamp}.json"
+
+
+class _Frame:
+    """One open stage entry."""
+
+    __slots__ = ("path", "peak_rss")
+
+    def __init__(self, path: str, peak_rss: float):
+        self.path = path
+        self.peak_rss = peak_rss
+
+
+class StageStats:
+    """Totals for one stage path across all of its entries."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rss_delta = 0.0
+        self.peak_rss = 0.0
+        self.traced_peak: Optional[float] = None
+        self.capture = 0.0
+        self.allocators: Dict[str, List[float]] = {}
+        self.profile = None  # cProfile.Profile of detailed stages
+
+    @property
+    def depth(self) -> int:
+        return self.path.count("/")
+
+    @property
+    def name(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+    def top_allocators(self, top: int) -> List[Dict[str, Any]]:
+        """Source lines with the largest net allocations during the stage."""
+        ranked = sorted(self.allocators.items(), key=lambda item: item[1][0], reverse=True)
+        return [
+            {"location": location, "size_kb": round(size / 1024, 1), "count": int(count)}
+            for location, (size, count) in ranked[:top]
+            if size > 0
+        ]
+
+    def top_functions(self, top: int) -> List[str]:
+        """cProfile rows for the most expensive functions by cumulative time."""
+        if self.profile is None:
+            return []
+        import pstats
+
+        out = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=out)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(top)
+        lines = out.getvalue().splitlines()
+        # Keep the column header and rows, dropping the pstats preamble
+        start = next((i for i, line in enumerate(lines) if line.lstrip().startswith("ncalls")), 0)
+        return [line.rstrip() for line in lines[start:] if line.strip()]
+
+    def to_dict(self, top: int) -> Dict[str, Any]:
+        result = {
+            "stage": self.path,
+            "calls": self.calls,
+            "wall_seconds": round(self.wall, 4),
+            "cpu_seconds": round(self.cpu, 4),
+            "rss_delta_mb": round(self.rss_delta, 1),
+            "peak_rss_mb": round(self.peak_rss, 1),
+        }
+        if self.traced_peak is not None:
+            result["traced_peak_mb"] = round(self.traced_peak, 1)
+            result["capture_seconds"] = round(self.capture, 4)
+            result["top_allocators"] = self.top_allocators(top)
+        if self.profile is not None:
+            result["top_functions"] = self.top_functions(top)
+        return result
+
+
+class Profiler:
+    """Collects stage timings and memory for one run."""
+
+    def __init__(self, detail: Sequence[str] = (), top: int = DEFAULT_TOP):
+        """
+        Initialize the profiler.
+
+        Args:
+            detail: Stages (by name or full path, "*" for all) to run under
+                    cProfile and tracemalloc. Both slow the stage down, so
+                    pick the one under suspicion.
+            top: Allocators and functions listed per detailed stage
+        """
+        self.detail = set(detail)
+        self.top = top
+        self.stages: Dict[str, StageStats] = {}
+        self.started_at: Optional[str] = None
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_rss = 0.0
+        self.peak_scope = "stage"
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._open: List[_Frame] = []
+        self._detailing = False
+        self._previous: Optional["Profiler"] = None
+        self._start = (0.0, 0.0)
+
+    def __enter__(self) -> "Profiler":
+        """Activate the profiler for stage() calls in this process."""
+        global _active
+        self._previous, _active = _active, self
+        self.started_at = datetime.now().isoformat()
+        if not _reset_peak_rss():
+            self.peak_scope = "process"
+        self._start = (time.perf_counter(), time.process_time())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _active
+        self.wall = time.perf_counter() - self._start[0]
+        self.cpu = time.process_time() - self._start[1]
+        self.peak_rss = max(self.peak_rss, _peak_rss_mb())
+        _active = self._previous
+
+    def _stack(self) -> List[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _sample_peak(self) -> None:
+        """Credit the peak RSS since the last sample to every open stage, then reset it."""
+        peak = _peak_rss_mb()
+        self.peak_rss = max(self.peak_rss, peak)
+        for frame in self._open:
+            frame.peak_rss = max(frame.peak_rss, peak)
+        if self.peak_scope == "stage":
+            _reset_peak_rss()
+
+    def _wants_detail(self, path: str, name: str) -> bool:
+        return bool(self.detail) and ("*" in self.detail or name in self.detail or path in self.detail)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """
+        Time a named stage.
+
+        Args:
+            name: Stage name, nested under any stage already open in this thread
+
+        Yields:
+            The stage's running totals
+        """
+        stack = self._stack()
+        path = f"{stack[-1]}/{name}" if stack else name
+
+        with self._lock:
+            stats = self.stages.get(path)
+            if stats is None:
+                stats = self.stages[path] = StageStats(path)
+            self._sample_peak()
+            rss_start = _rss_mb()
+            frame = _Frame(path, rss_start)
+            self._open.append(frame)
+            # Detailed stages don't nest: the outermost one owns cProfile and tracemalloc
+            detailed = self._wants_detail(path, name) and not self._detailing
+            if detailed:
+                self._detailing = True
+
+        profile, snapshot, started_tracing = None, None, False
+        if detailed:
+            import cProfile
+            import tracemalloc
+
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            tracemalloc.reset_peak()
+            # A fresh trace has nothing to diff against
+            snapshot = None if started_tracing else tracemalloc.take_snapshot()
+            profile = stats.profile or cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler (or debugger) is already hooked in
+                logger.warning(f"cProfile unavailable for stage {path}")
+                profile = None
+
+        stack.append(path)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield stats
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            stack.pop()
+
+            if detailed:
+                if profile is not None:
+                    profile.disable()
+                    stats.profile = profile
+                capture_start = time.perf_counter()
+                traced_peak = tracemalloc.get_traced_memory()[1] / 2**20
+                self._record_allocations(stats, snapshot, tracemalloc.take_snapshot())
+                stats.traced_peak = max(stats.traced_peak or 0.0, traced_peak)
+                if started_tracing:
+                    tracemalloc.stop()
+                # Charged to the parent stage; reported so it can be discounted
+                stats.capture += time.perf_counter() - capture_start
+
+            with self._lock:
+                self._sample_peak()
+                self._open.remove(frame)
+                if detailed:
+                    self._detailing = False
+                stats.calls += 1
+                stats.wall += wall
+                stats.cpu += cpu
+                stats.rss_delta += _rss_mb() - rss_start
+                stats.peak_rss = max(stats.peak_rss, frame.peak_rss)
+
+    @staticmethod
+    def _record_allocations(stats: StageStats, before, after) -> None:
+        """Add the net allocations per source line between two tracemalloc snapshots."""
+        import tracemalloc
+
+        # Group first and drop our own lines afterwards: Snapshot.filter_traces
+        # matches every trace in Python and dominates on large stages
+        if before is None:
+            diff = [(s.traceback[0], s.size, s.count) for s in after.statistics("lineno")]
+        else:
+            diff = [(s.traceback[0], s.size_diff, s.count_diff) for s in after.compare_to(before, "lineno")]
+        ignored = {tracemalloc.__file__, __file__}
+        for frame, size, count in diff:
+            if size <= 0 or frame.filename in ignored or frame.filename.startswith("<frozen importlib"):
+                continue
+            location = f"{frame.filename}:{frame.lineno}"
+            totals = stats.allocators.setdefault(location, [0.0, 0.0])
+            totals[0] += size
+            totals[1] += count
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Build the consolidated report.
+
+        Returns:
+            Dictionary with run totals and per-stage wall time, CPU time,
+            RSS growth, peak RSS and (for detailed stages) traced memory
+            peak, top allocators and top functions
+        """
+        return {
+            "started_at": self.started_at,
+            "wall_seconds": round(self.wall, 4),
+            "cpu_seconds": round(self.cpu, 4),
+            "peak_rss_mb": round(self.peak_rss, 1),
+            # "process" where the kernel's peak can't be reset per stage
+            "peak_rss_scope": self.peak_scope,
+            "argv": sys.argv,
+            "stages": [stats.to_dict(self.top) for stats in self.stages.values()],
+        }
+
+    def write(self, path: Union[str, Path]) -> Path:
+        """
+        Write the report as JSON, plus a .prof file per detailed stage.
+
+        The .prof files load in pstats, snakeviz and similar viewers.
+
+        Args:
+            path: Report file
+
+        Returns:
+            Path of the report
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        for stats in self.stages.values():
+            if stats.profile is not None:
+                slug = re.sub(r"[^\w.-]+", "_", stats.path)
+                stats.profile.dump_stats(path.with_name(f"{path.stem}.{slug}.prof"))
+        return path
+
+    def format(self) -> str:
+        """Render the report as a text table."""
+        lines = [
+            f"{'stage':<40} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'peak RSS MB':>12} {'ΔRSS MB':>9}"
+        ]
+        for stats in self.stages.values():
+            label = "  " * stats.depth + stats.name
+            lines.append(
+                f"{label:<40} {stats.calls:>6} {stats.wall:>9.3f} {stats.cpu:>9.3f} "
+                f"{stats.peak_rss:>12.1f} {stats.rss_delta:>+9.1f}"
+            )
+        lines.append(
+            f"{'total':<40} {'':>6} {self.wall:>9.3f} {self.cpu:>9.3f} {self.peak_rss:>12.1f}"
+        )
+
+        for stats in self.stages.values():
+            if stats.traced_peak is None and stats.profile is None:
+                continue
+            lines.append("")
+            lines.append(f"== {stats.path}")
+            if stats.traced_peak is not None:
+                lines.append(
+                    f"Traced peak: {stats.traced_peak:.1f} MB (snapshot analysis took {stats.capture:.2f} s). "
+                    f"Top allocators (net):"
+                )
+                for row in stats.top_allocators(self.top):
+                    lines.append(f"  {row['size_kb']:>10.1f} KB {row['count']:>8}  {row['location']}")
+            lines.extend(stats.top_functions(self.top))
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profile_run(
+    label: str,
+    report: Union[str, Path],
+    detail: Sequence[str] = (),
+    top: int = DEFAULT_TOP,
+) -> Iterator[Profiler]:
+    """
+    Profile a run as one root stage, then write and print the report.
+
+    The report is written even if the run fails, so slow failures can be
+    diagnosed too.
+
+    Args:
+        label: Root stage name (e.g. the command)
+        report: Report file
+        detail: Stages to capture with cProfile and tracemalloc
+        top: Allocators and functions listed per detailed stage
+
+    Yields:
+        The active profiler
+    """
+    profiler = Profiler(detail=detail, top=top)
+    try:
+        with profiler, profiler.stage(label):
+            yield profiler
+    finally:
+        seen = {name for stats in profiler.stages.values() for name in (stats.path, stats.name)}
+        missed = sorted(profiler.detail - seen - {"*"})
+        if missed:
+            logger.warning(
+                f"Stage(s) not entered, so not profiled in detail: {', '.join(missed)}. "
+                f"Stages seen: {', '.join(sorted({s.name for s in profiler.stages.values()}))}"
+            )
+        path = profiler.write(report)
+        sys.stderr.write("\n" + profiler.format())
+        logger.info(f"Profile report written to {path}")
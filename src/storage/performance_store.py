@@ -0,0 +1,331 @@
+"""
+Performance Graph Store
+
+Stores per-workout performance graphs as a multi-resolution pyramid.
+
+Each workout's series is fetched once at full detail and saved together
+with coarser levels (5 s, 30 s and 5 min buckets by default) holding the
+mean/min/max of every metric per bucket. Readers ask for a resolution and
+get the coarsest level that still meets it, so overview charts over years
+of rides only read a few hundred points per workout.
+
+Files are compressed ``.npz`` archives under ``data/performance``; members
+are loaded lazily, so reading one level of one metric doesn't decompress
+the rest of the file.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import json
+import logging
+import os
+
+import numpy as np
+
+from src import profiling
+from src.storage.workout_store import DEFAULT_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Bucket sizes (seconds) of the precomputed levels
+DEFAULT_LEVELS = (5, 30, 300)
+
+# Per-bucket statistics stored at each level
+LEVEL_STATS = ("mean", "min", "max")
+
+
+def performance_series(graph: Dict[str, Any], slug: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extract one metric from a performance graph response.
+
+    Args:
+        graph: Response from get_workout_performance_graph()
+        slug: Metric slug (e.g. "output", "cadence", "heart_rate")
+
+    Returns:
+        Tuple of (seconds, values) arrays; missing samples are NaN
+
+    Raises:
+        KeyError: If the metric isn't present in the graph
+    """
+    seconds = np.asarray(graph.get("seconds_since_pedaling_start", []), dtype=np.float64)
+    for metric in graph.get("metrics", []):
+        if metric.get("slug") == slug:
+            values = np.asarray(
+                [np.nan if v is None else v for v in metric.get("values", [])], dtype=np.float64
+            )
+            n = min(len(seconds), len(values))
+            return seconds[:n], values[:n]
+    raise KeyError(f"Metric not found in performance graph: {slug}")
+
+
+def bucket_stats(seconds: np.ndarray, values: np.ndarray, bucket_s: int) -> Dict[str, np.ndarray]:
+    """
+    Aggregate a series into fixed-width time buckets.
+
+    Args:
+        seconds: Sample times, sorted ascending
+        values: Sample values (NaN for missing)
+        bucket_s: Bucket width in seconds
+
+    Returns:
+        Dictionary with "seconds" (bucket start) and one array per LEVEL_STATS
+    """
+    if len(seconds) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return {"seconds": empty, "mean": empty, "min": empty, "max": empty}
+
+    buckets = np.floor(seconds / bucket_s).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+
+    finite = np.isfinite(values)
+    sums = np.add.reduceat(np.where(finite, values, 0.0), starts)
+    counts = np.add.reduceat(finite.astype(np.int64), starts)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(counts > 0, sums / counts, np.nan)
+
+    # fmin/fmax skip NaNs unless the whole bucket is missing
+    return {
+        "seconds": (buckets[starts] * bucket_s).astype(np.float64),
+        "mean": mean,
+        "min": np.fmin.reduceat(values, starts),
+        "max": np.fmax.reduceat(values, starts),
+    }
+
+
+class PerformanceGraphStore:
+    """Stores performance graphs with precomputed coarser resolutions."""
+
+    def __init__(
+        self,
+        data_dir: Union[str, Path] = DEFAULT_DATA_DIR,
+        levels: Sequence[int] = DEFAULT_LEVELS,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            data_dir: Root data directory (graphs go in <data_dir>/performance)
+            levels: Bucket sizes in seconds of the precomputed levels
+        """
+        self.data_dir = Path(data_dir)
+        self.graph_dir = self.data_dir / "performance"
+        self.levels = tuple(sorted(levels))
+
+    def path(self, workout_id: str) -> Path:
+        """
+        Get the file path for a workout's graph.
+
+        Raises:
+            ValueError: If the ID could point outside the graph directory
+        """
+        workout_id = str(workout_id)
+        if not workout_id or ".." in workout_id or any(c in workout_id for c in ("/", "\\", "\0")):
+            raise ValueError(f"Invalid workout ID: {workout_id!r}")
+        return self.graph_dir / f"{workout_id}.npz"
+
+    def exists(self, workout_id: str) -> bool:
+        """Check whether a workout's graph is stored."""
+        return self.path(workout_id).exists()
+
+    def workout_ids(self) -> List[str]:
+        """List the IDs of all stored workouts."""
+        if not self.graph_dir.exists():
+            return []
+        return sorted(p.stem for p in self.graph_dir.glob("*.npz"))
+
+    def save(self, workout_id: str, graph: Dict[str, Any], every_n: int = 1) -> Path:
+        """
+        Store a performance graph and its coarser levels.
+
+        Args:
+            workout_id: Workout ID
+            graph: Response from get_workout_performance_graph()
+            every_n: Sampling interval the graph was fetched with
+
+        Returns:
+            Path of the stored file
+        """
+        slugs = [m.get("slug") for m in graph.get("metrics", []) if m.get("slug")]
+        # All metrics share one seconds axis per level: metrics shorter than
+        # the graph's seconds are padded with NaN, longer ones truncated
+        seconds = np.asarray(graph.get("seconds_since_pedaling_start", []), dtype=np.float64)
+        arrays: Dict[str, np.ndarray] = {"raw__seconds": seconds}
+
+        for slug in slugs:
+            _, values = performance_series(graph, slug)
+            if len(values) < len(seconds):
+                values = np.concatenate([values, np.full(len(seconds) - len(values), np.nan)])
+            arrays[f"raw__{slug}"] = values
+            for level in self.levels:
+                if level <= every_n:
+                    continue
+                stats = bucket_stats(seconds, values, level)
+                arrays[f"L{level}__seconds"] = stats["seconds"]
+                for stat in LEVEL_STATS:
+                    arrays[f"L{level}__{slug}__{stat}"] = stats[stat]
+
+        meta = {
+            "workout_id": workout_id,
+            "every_n": every_n,
+            "duration": graph.get("duration"),
+            "metrics": slugs,
+            "units": {m["slug"]: m.get("display_unit") for m in graph.get("metrics", []) if m.get("slug")},
+            "levels": [level for level in self.levels if level > every_n],
+            "summaries": graph.get("summaries", []),
+            "average_summaries": graph.get("average_summaries", []),
+        }
+        arrays["meta"] = np.array(json.dumps(meta))
+
+        self.graph_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(workout_id)
+        tmp_path = path.with_name(f".{path.stem}.tmp.npz")
+        with profiling.stage("graphs.save"):
+            np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+        logger.debug(f"Stored performance graph for {workout_id} ({len(seconds)} samples)")
+        return path
+
+    def fetch(self, api_client, workout_id: str, every_n: int = 1, overwrite: bool = False) -> Path:
+        """
+        Fetch a workout's full-detail graph once and store all levels.
+
+        Args:
+            api_client: PelotonAPIClient (or PelotonClient)
+            workout_id: Workout ID
+            every_n: Sampling interval to request (1 for full detail)
+            overwrite: Re-fetch even if the graph is already stored
+
+        Returns:
+            Path of the stored file
+        """
+        if self.exists(workout_id) and not overwrite:
+            return self.path(workout_id)
+
+        if hasattr(api_client, "get_workout_performance_graph"):
+            graph = api_client.get_workout_performance_graph(workout_id, every_n)
+        else:
+            graph = api_client.get_workout_performance(workout_id, every_n)
+        return self.save(workout_id, graph, every_n=every_n)
+
+    def metadata(self, workout_id: str) -> Dict[str, Any]:
+        """
+        Get a stored graph's metadata (metrics, levels, summaries).
+
+        Args:
+            workout_id: Workout ID
+
+        Returns:
+            Metadata dictionary
+        """
+        with np.load(self.path(workout_id)) as npz:
+            return json.loads(str(npz["meta"]))
+
+    def choose_level(self, available: Sequence[int], resolution: Optional[float]) -> Optional[int]:
+        """
+        Pick the coarsest level that still meets a requested resolution.
+
+        Args:
+            available: Bucket sizes stored for the workout
+            resolution: Largest acceptable bucket size in seconds (None for raw)
+
+        Returns:
+            Bucket size to read, or None for the raw series
+        """
+        if resolution is None:
+            return None
+        candidates = [level for level in available if level <= resolution]
+        return max(candidates) if candidates else None
+
+    def read(
+        self,
+        workout_id: str,
+        metric: str,
+        resolution: Optional[float] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Read one metric at the coarsest level meeting the requested resolution.
+
+        Args:
+            workout_id: Workout ID
+            metric: Metric slug (e.g. "output")
+            resolution: Largest acceptable bucket size in seconds
+                        (None for the full-detail series)
+
+        Returns:
+            Dictionary with "seconds", "mean", "min" and "max" arrays and the
+            chosen "level" (0 for raw); for raw data mean/min/max are equal
+
+        Raises:
+            KeyError: If the metric isn't stored for this workout
+        """
+        with np.load(self.path(workout_id)) as npz:
+            meta = json.loads(str(npz["meta"]))
+            if metric not in meta["metrics"]:
+                raise KeyError(f"Metric {metric} not stored for workout {workout_id}")
+
+            level = self.choose_level(meta["levels"], resolution)
+            if level is None:
+                values = npz[f"raw__{metric}"]
+                return {
+                    "seconds": npz["raw__seconds"],
+                    "mean": values,
+                    "min": values,
+                    "max": values,
+                    "level": 0,
+                }
+
+            result = {"seconds": npz[f"L{level}__seconds"], "level": level}
+            for stat in LEVEL_STATS:
+                result[stat] = npz[f"L{level}__{metric}__{stat}"]
+            return result
+
+    def read_raw(
+        self,
+        workout_id: str,
+        metrics: Optional[Sequence[str]] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """
+        Read the full-detail series of several metrics in one pass.
+
+        Args:
+            workout_id: Workout ID
+            metrics: Metric slugs to read (default: all stored); missing
+                     ones are skipped
+
+        Returns:
+            Tuple of (metadata, arrays) where arrays has "seconds" plus one
+            entry per metric read
+        """
+        with np.load(self.path(workout_id)) as npz:
+            meta = json.loads(str(npz["meta"]))
+            wanted = meta["metrics"] if metrics is None else [m for m in metrics if m in meta["metrics"]]
+            arrays = {"seconds": npz["raw__seconds"]}
+            for metric in wanted:
+                arrays[metric] = npz[f"raw__{metric}"]
+        return meta, arrays
+
+    def iter_series(
+        self,
+        workout_ids: Sequence[str],
+        metric: str,
+        resolution: Optional[float] = None,
+    ) -> Iterator[Tuple[str, Dict[str, np.ndarray]]]:
+        """
+        Read one metric for many workouts, skipping ones without it.
+
+        Args:
+            workout_ids: Workout IDs to read
+            metric: Metric slug
+            resolution: Largest acceptable bucket size in seconds
+
+        Yields:
+            Tuples of (workout_id, series) as returned by read()
+        """
+        for workout_id in workout_ids:
+            try:
+                yield workout_id, self.read(workout_id, metric, resolution)
+            except (FileNotFoundError, KeyError):
+                continue
@@ -0,0 +1,727 @@
+"""
+Response Archive
+
+Append-only archive of raw API responses (workout details and performance
+graphs), kept for reprocessing without hitting the API again.
+
+Every record is compressed on its own, so any single response can be read
+without decompressing its neighbours. Peloton responses share most of their
+JSON structure (keys, nesting, repeated values), which per-record
+compression can't exploit by itself, so each endpoint gets a shared
+dictionary trained from its first records: zstandard's trainer if the
+``zstandard`` package is installed, otherwise a zlib preset dictionary
+built from sample slices.
+
+Layout under ``data/archive``:
+
+    responses.dat   Records appended back to back: a fixed header (codec,
+                    dictionary, sizes, CRC-32 of the raw body), the key and
+                    the compressed body (responses.<n>.dat after compaction)
+    index.db        SQLite index by (workout_id, endpoint) -> offset/size,
+                    plus the dictionaries
+
+Records are written before they are indexed, and records missing from the
+index after a crash are recovered from their headers on open. Re-archiving
+a key supersedes the old record; ``compact()`` drops superseded records
+and recompresses everything with freshly trained dictionaries.
+
+Several processes may share an archive (e.g. the sync daemon and a manual
+harvest): every write, training run and compaction holds an exclusive lock
+on ``write.lock`` and first catches up with whatever other writers did.
+Readers take no lock; ``readonly=True`` opens an archive without writing
+anything, not even crash recovery.
+
+Usage:
+    archive = ResponseArchive()
+    archive.put(workout_id, ENDPOINT_WORKOUT, response.content)
+    detail = archive.get_json(workout_id, ENDPOINT_WORKOUT)
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import io
+import json
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+
+from src.storage.workout_store import DEFAULT_DATA_DIR
+
+try:
+    import zstandard
+except ImportError:  # optional: zlib preset dictionaries are used instead
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within a process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = "archive"
+DATA_FILE = "responses.dat"
+INDEX_FILE = "index.db"
+LOCK_FILE = "write.lock"
+
+# Endpoint names used by ArchivingTransport
+ENDPOINT_WORKOUT = "workout"
+ENDPOINT_PERFORMANCE_GRAPH = "performance_graph"
+
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODECS = {"zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+DEFAULT_LEVELS = {CODEC_ZLIB: 6, CODEC_ZSTD: 9}
+
+# Records of an endpoint archived before its dictionary is trained
+TRAIN_AFTER = 64
+
+# Most recent records sampled when training
+TRAIN_SAMPLES = 512
+
+# zlib can only reference the last 32 KB; zstd's usual dictionary size is ~110 KB
+DICT_SIZES = {CODEC_ZLIB: 32 * 1024, CODEC_ZSTD: 112 * 1024}
+
+# Bytes taken from the start of each sample for raw-content dictionaries
+DICT_SAMPLE_BYTES = 4096
+
+RECORD_MAGIC = b"PRA1"
+# magic, codec, dictionary id (0 = none), stored size, raw size, raw CRC-32, key length
+RECORD_HEADER = struct.Struct("<4sBIIIIH")
+
+
+class CorruptRecordError(ValueError):
+    """Raised when a stored record doesn't match its checksum."""
+
+
+def _default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def _require_zstd() -> None:
+    if zstandard is None:
+        raise RuntimeError("This archive uses zstd records; install the 'zstandard' package to read them")
+
+
+def _raw_dictionary(samples: Sequence[bytes], size: int) -> bytes:
+    """
+    Preset dictionary made of slices of evenly spaced samples.
+
+    Responses of one endpoint repeat the same keys in the same order, so
+    slices of real samples beat frequency-ranked fragments here; the most
+    recent samples go last, where matches are cheapest.
+    """
+    slices = [sample[:DICT_SAMPLE_BYTES] for sample in samples]
+    mean_length = max(1, sum(map(len, slices)) // max(1, len(slices)))
+    count = max(1, size // mean_length)
+    step = max(1, len(slices) // count)
+    return b"".join(slices[::step][-count:])[-size:]
+
+
+def _key(workout_id: str, endpoint: str) -> bytes:
+    return f"{workout_id}\0{endpoint}".encode()
+
+
+def _data_file(generation: Optional[str]) -> str:
+    # Compaction writes a new generation of the data file
+    return f"responses.{generation}.dat" if generation else DATA_FILE
+
+
+class ResponseArchive:
+    """Append-only, per-record compressed store of raw API responses."""
+
+    def __init__(
+        self,
+        data_dir: Union[str, Path] = DEFAULT_DATA_DIR,
+        codec: Optional[str] = None,
+        level: Optional[int] = None,
+        train_after: int = TRAIN_AFTER,
+        readonly: bool = False,
+    ):
+        """
+        Open (or create) the archive.
+
+        Args:
+            data_dir: Root data directory (archive goes in <data_dir>/archive)
+            codec: "zstd" or "zlib" for new records (default: zstd if the
+                   zstandard package is installed, else zlib). Existing
+                   records keep the codec they were written with.
+            level: Compression level (default: 9 for zstd, 6 for zlib)
+            train_after: Records of an endpoint to collect before training
+                         its dictionary (0 disables automatic training)
+            readonly: Only read; the archive must exist and is never
+                      modified (safe while another process is writing)
+
+        Raises:
+            FileNotFoundError: If readonly and there is no archive
+        """
+        codec = codec or _default_codec()
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}. Use one of {tuple(CODECS)}")
+        self.codec = CODECS[codec]
+        if self.codec == CODEC_ZSTD:
+            _require_zstd()
+        self.level = level if level is not None else DEFAULT_LEVELS[self.codec]
+        self.train_after = train_after
+
+        self.root = Path(data_dir) / ARCHIVE_DIR
+        self.index_path = self.root / INDEX_FILE
+        self.readonly = readonly
+
+        self._lock = threading.RLock()
+        self._write_depth = 0
+        self._dicts: Dict[int, Tuple[int, bytes, Any]] = {}
+        self._latest_dict: Dict[str, int] = {}
+        self.data_path: Optional[Path] = None
+        self._generation: Optional[str] = None
+        self._writer: Optional[int] = None
+        self._reader: Optional[int] = None
+        self._end = 0
+
+        if readonly:
+            if not self.index_path.exists():
+                raise FileNotFoundError(f"No response archive in {self.root}")
+            self._lock_fd = None
+            self._conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True, check_same_thread=False)
+            self._load_dictionaries()
+            self._use_generation(self._get_meta("generation"))
+            return
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(self.root / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        # Switching to WAL fails rather than waits while another process has
+        # the index open, so set up under the write lock
+        self._flock()
+        try:
+            self._setup_index()
+        finally:
+            self._unlock()
+
+        with self._writing():
+            # Left behind by a compaction that was interrupted (either side of its commit)
+            for stale in self.root.glob("responses*.dat"):
+                if stale != self.data_path:
+                    stale.unlink()
+            self._recover()
+
+    def _setup_index(self) -> None:
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                workout_id TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                crc32 INTEGER NOT NULL,
+                codec INTEGER NOT NULL,
+                dict_id INTEGER NOT NULL,
+                archived_at REAL NOT NULL,
+                PRIMARY KEY (workout_id, endpoint)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS records_endpoint ON records (endpoint);
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS dictionaries (
+                id INTEGER PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                codec INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                samples INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _open_data(self, generation: Optional[str], create: bool = False) -> None:
+        """Switch to a generation's data file (raises FileNotFoundError if it's gone and create is False)."""
+        path = self.root / _data_file(generation)
+        flags = os.O_CREAT if create else 0
+        reader = os.open(path, os.O_RDONLY | flags, 0o644)
+        if not self.readonly:
+            try:
+                writer = os.open(path, os.O_WRONLY | os.O_APPEND)
+            except BaseException:
+                os.close(reader)
+                raise
+        self._close_data()
+        self.data_path, self._generation, self._reader = path, generation, reader
+        if not self.readonly:
+            self._writer = writer
+
+    def _close_data(self) -> None:
+        for fd in (self._writer, self._reader):
+            if fd is not None:
+                os.close(fd)
+        self._writer = self._reader = None
+
+    def _use_generation(self, generation: Optional[str], create: bool = False) -> None:
+        """Make sure the data file of a generation is the one open."""
+        if generation != self._generation or self.data_path is None:
+            self._open_data(generation, create=create)
+
+    def _load_dictionaries(self) -> None:
+        """Load dictionaries added since the last call (possibly by other processes)."""
+        known = max(self._dicts, default=0)
+        for dict_id, endpoint, codec_id, data in self._conn.execute(
+            "SELECT id, endpoint, codec, data FROM dictionaries WHERE id > ? ORDER BY id", (known,)
+        ):
+            self._dicts[dict_id] = (codec_id, data, None)
+            if codec_id == self.codec:
+                self._latest_dict[endpoint] = dict_id
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Hold the write lock, shared by threads and processes (re-entrant).
+
+        On entry the data file, its end and the dictionaries are refreshed,
+        since another process may have appended, trained or compacted.
+        """
+        with self._lock:
+            if self.readonly:
+                raise io.UnsupportedOperation(f"Archive in {self.root} was opened read-only")
+            if self._write_depth == 0:
+                self._flock()
+                try:
+                    self._use_generation(self._get_meta("generation"), create=True)
+                    self._end = os.fstat(self._writer).st_size
+                    self._load_dictionaries()
+                except BaseException:
+                    self._unlock()
+                    raise
+            self._write_depth += 1
+            try:
+                yield
+            finally:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._unlock()
+
+    def _flock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+
+    def _unlock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _get_meta(self, name: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, value))
+
+    # Compression
+
+    def _dictionary(self, dict_id: int) -> Tuple[int, Any]:
+        """Codec and prepared dictionary (raw bytes for zlib, ZstdCompressionDict for zstd)."""
+        if dict_id not in self._dicts:
+            # Trained by another process since we last looked
+            self._load_dictionaries()
+        codec, data, prepared = self._dicts[dict_id]
+        if prepared is None:
+            if codec == CODEC_ZSTD:
+                _require_zstd()
+                prepared = zstandard.ZstdCompressionDict(data)
+            else:
+                prepared = data
+            self._dicts[dict_id] = (codec, data, prepared)
+        return codec, prepared
+
+    def _compress(self, body: bytes, dict_id: int) -> bytes:
+        zdict = self._dictionary(dict_id)[1] if dict_id else None
+        if self.codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=self.level, dict_data=zdict).compress(body)
+        # Raw deflate: the record header already carries size and checksum
+        compressor = (
+            zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=zdict)
+            if zdict else zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        )
+        return compressor.compress(body) + compressor.flush()
+
+    def _decompress(self, payload: bytes, codec: int, dict_id: int, raw_size: int) -> bytes:
+        zdict = self._dictionary(dict_id)[1] if dict_id else None
+        if codec == CODEC_ZSTD:
+            _require_zstd()
+            return zstandard.ZstdDecompressor(dict_data=zdict).decompress(payload, max_output_size=raw_size)
+        decompressor = zlib.decompressobj(-15, zdict=zdict) if zdict else zlib.decompressobj(-15)
+        return decompressor.decompress(payload) + decompressor.flush()
+
+    def _build_dictionary(self, samples: Sequence[bytes]) -> bytes:
+        size = DICT_SIZES[self.codec]
+        if self.codec == CODEC_ZSTD:
+            try:
+                return zstandard.train_dictionary(size, list(samples)).as_bytes()
+            except zstandard.ZstdError as e:
+                # The trainer needs a fair number of samples; fall back to raw content
+                logger.debug(f"zstd dictionary training failed ({e}); using raw content")
+        return _raw_dictionary(samples, size)
+
+    # Writing
+
+    def _append(self, workout_id: str, endpoint: str, body: bytes, dict_id: int) -> Tuple[Any, ...]:
+        """Write one record to the data file and return its index row (caller holds the write lock)."""
+        payload = self._compress(body, dict_id)
+        key = _key(workout_id, endpoint)
+        crc = zlib.crc32(body)
+        header = RECORD_HEADER.pack(RECORD_MAGIC, self.codec, dict_id, len(payload), len(body), crc, len(key))
+        os.write(self._writer, header + key + payload)
+        offset = self._end + len(header) + len(key)
+        self._end = offset + len(payload)
+        return (workout_id, endpoint, offset, len(payload), len(body), crc, self.codec, dict_id, time.time())
+
+    def put(self, workout_id: str, endpoint: str, body: bytes) -> bool:
+        """
+        Archive a raw response body.
+
+        Args:
+            workout_id: Workout ID
+            endpoint: Endpoint name (e.g. ENDPOINT_WORKOUT)
+            body: Raw response body
+
+        Returns:
+            True if stored, False if the same body was already archived
+        """
+        with self._writing():
+            row = self._conn.execute(
+                "SELECT raw_size, crc32 FROM records WHERE workout_id = ? AND endpoint = ?",
+                (workout_id, endpoint),
+            ).fetchone()
+            if row is not None and row == (len(body), zlib.crc32(body)):
+                return False
+
+            record = self._append(workout_id, endpoint, body, self._latest_dict.get(endpoint, 0))
+            self._conn.execute("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", record)
+            self._conn.commit()
+
+            # Still under the write lock, so only one writer trains each endpoint
+            if self.train_after and endpoint not in self._latest_dict:
+                count = self._conn.execute(
+                    "SELECT COUNT(*) FROM records WHERE endpoint = ?", (endpoint,)
+                ).fetchone()[0]
+                if count >= self.train_after:
+                    self.train(endpoint)
+        return True
+
+    def put_json(self, workout_id: str, endpoint: str, response: Any) -> bool:
+        """Archive an already-decoded response (re-encoded as compact JSON)."""
+        return self.put(workout_id, endpoint, json.dumps(response, separators=(",", ":")).encode())
+
+    def train(self, endpoint: str, samples: Optional[Sequence[bytes]] = None) -> int:
+        """
+        Train a dictionary for an endpoint; records archived afterwards use it.
+
+        Args:
+            endpoint: Endpoint name
+            samples: Training bodies (default: the endpoint's most recent
+                     archived records)
+
+        Returns:
+            Dictionary ID
+        """
+        with self._writing():
+            if samples is None:
+                samples = [
+                    self.get(workout_id, endpoint)
+                    for workout_id in self.workout_ids(endpoint, limit=TRAIN_SAMPLES)
+                ]
+            if not samples:
+                raise ValueError(f"No samples to train a dictionary for {endpoint}")
+
+            data = self._build_dictionary(samples)
+            cursor = self._conn.execute(
+                "INSERT INTO dictionaries (endpoint, codec, data, samples, created_at) VALUES (?, ?, ?, ?, ?)",
+                (endpoint, self.codec, data, len(samples), time.time()),
+            )
+            self._conn.commit()
+            dict_id = cursor.lastrowid
+            self._dicts[dict_id] = (self.codec, data, None)
+            self._latest_dict[endpoint] = dict_id
+
+        logger.info(f"Trained {len(data) // 1024} KB dictionary for {endpoint} from {len(samples)} samples")
+        return dict_id
+
+    # Reading
+
+    def get(self, workout_id: str, endpoint: str) -> Optional[bytes]:
+        """
+        Read one raw response body.
+
+        Args:
+            workout_id: Workout ID
+            endpoint: Endpoint name
+
+        Returns:
+            Raw body, or None if not archived
+
+        Raises:
+            CorruptRecordError: If the stored record fails its checksum
+        """
+        with self._lock:
+            # Another process may compact between the lookup and the read, so
+            # retry once if the generation the row belongs to is already gone
+            for attempt in range(2):
+                # One statement, so the row and generation come from one snapshot
+                row = self._conn.execute(
+                    "SELECT offset, size, raw_size, crc32, codec, dict_id, "
+                    "(SELECT value FROM meta WHERE name = 'generation') FROM records "
+                    "WHERE workout_id = ? AND endpoint = ?",
+                    (workout_id, endpoint),
+                ).fetchone()
+                if row is None:
+                    return None
+                try:
+                    self._use_generation(row[-1])
+                    break
+                except FileNotFoundError:
+                    if attempt:
+                        raise
+            return self._read(workout_id, endpoint, *row[:-1])
+
+    def _read(self, workout_id: str, endpoint: str, offset: int, size: int, raw_size: int,
+              crc: int, codec: int, dict_id: int, reader: Optional[int] = None) -> bytes:
+        """Read, decompress and verify one record."""
+        payload = os.pread(self._reader if reader is None else reader, size, offset)
+        if codec == CODEC_ZSTD:
+            # A missing package isn't corruption
+            _require_zstd()
+        try:
+            body = self._decompress(payload, codec, dict_id, raw_size)
+        except Exception as e:
+            raise CorruptRecordError(f"Archived {endpoint} for {workout_id} is corrupt: {e}") from e
+        if len(body) != raw_size or zlib.crc32(body) != crc:
+            raise CorruptRecordError(f"Archived {endpoint} for {workout_id} is corrupt")
+        return body
+
+    def get_json(self, workout_id: str, endpoint: str) -> Optional[Any]:
+        """Read and decode one response (None if not archived)."""
+        body = self.get(workout_id, endpoint)
+        return json.loads(body) if body is not None else None
+
+    def workout_ids(self, endpoint: str, limit: Optional[int] = None) -> List[str]:
+        """
+        List the workouts with an archived response for an endpoint.
+
+        Args:
+            endpoint: Endpoint name
+            limit: Only the most recently archived ones
+
+        Returns:
+            Workout IDs, most recently archived first
+        """
+        query = "SELECT workout_id FROM records WHERE endpoint = ? ORDER BY offset DESC"
+        params: Tuple[Any, ...] = (endpoint,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def keys(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over all archived (workout_id, endpoint) pairs."""
+        with self._lock:
+            rows = self._conn.execute("SELECT workout_id, endpoint FROM records ORDER BY offset").fetchall()
+        return iter(rows)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM records WHERE workout_id = ? AND endpoint = ?", key
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarize the archive.
+
+        Returns:
+            Dictionary with records, raw_bytes, stored_bytes, file_bytes
+            (including superseded records), ratio and per-endpoint totals
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT endpoint, COUNT(*), SUM(raw_size), SUM(size), SUM(dict_id > 0) "
+                "FROM records GROUP BY endpoint ORDER BY endpoint"
+            ).fetchall()
+            dictionaries = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM dictionaries").fetchone()
+            self._use_generation(self._get_meta("generation"))
+            file_bytes = os.fstat(self._reader).st_size
+
+        endpoints = {
+            endpoint: {
+                "records": count,
+                "raw_bytes": raw,
+                "stored_bytes": stored,
+                "ratio": round(raw / stored, 2) if stored else None,
+                "with_dictionary": with_dict,
+            }
+            for endpoint, count, raw, stored, with_dict in rows
+        }
+        raw = sum(e["raw_bytes"] for e in endpoints.values())
+        stored = sum(e["stored_bytes"] for e in endpoints.values())
+        return {
+            "records": sum(e["records"] for e in endpoints.values()),
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "file_bytes": file_bytes,
+            "dictionaries": dictionaries[0],
+            "dictionary_bytes": dictionaries[1],
+            "ratio": round(raw / (stored + dictionaries[1]), 2) if stored else None,
+            "codec": {v: k for k, v in CODECS.items()}[self.codec],
+            "endpoints": endpoints,
+        }
+
+    # Maintenance
+
+    def _scan(self, start: int) -> Iterator[Tuple[Tuple[Any, ...], int]]:
+        """Yield (index row, end offset) for intact records from start to the end of the file."""
+        position = start
+        while position + RECORD_HEADER.size <= self._end:
+            header = os.pread(self._reader, RECORD_HEADER.size, position)
+            magic, codec, dict_id, size, raw_size, crc, key_len = RECORD_HEADER.unpack(header)
+            end = position + RECORD_HEADER.size + key_len + size
+            if magic != RECORD_MAGIC or end > self._end:
+                return
+            key = os.pread(self._reader, key_len, position + RECORD_HEADER.size)
+            workout_id, _, endpoint = key.decode().partition("\0")
+            offset = position + RECORD_HEADER.size + key_len
+            yield (workout_id, endpoint, offset, size, raw_size, crc, codec, dict_id, time.time()), end
+            position = end
+
+    def _recover(self) -> None:
+        """Index records written after the last indexed one and drop a torn tail (caller holds the write lock)."""
+        indexed_end = self._conn.execute("SELECT COALESCE(MAX(offset + size), 0) FROM records").fetchone()[0]
+        if indexed_end >= self._end:
+            return
+
+        recovered, good_end = 0, indexed_end
+        for row, end in self._scan(indexed_end):
+            self._conn.execute("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            recovered += 1
+            good_end = end
+        self._conn.commit()
+
+        if good_end < self._end:
+            logger.warning(f"Truncating {self._end - good_end} bytes of incomplete record at end of {self.data_path}")
+            os.ftruncate(self._writer, good_end)
+            self._end = good_end
+        if recovered:
+            logger.info(f"Recovered {recovered} unindexed records in {self.data_path}")
+
+    def rebuild_index(self) -> int:
+        """
+        Rebuild the index by scanning the data file (later records win).
+
+        Returns:
+            Number of records indexed
+        """
+        with self._writing():
+            self._conn.execute("DELETE FROM records")
+            for row, _ in self._scan(0):
+                self._conn.execute("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            self._conn.commit()
+            count = self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        logger.info(f"Rebuilt archive index: {count} records")
+        return count
+
+    def compact(self, retrain: bool = True) -> Dict[str, Any]:
+        """
+        Rewrite the archive without superseded records.
+
+        The records go to a new data file, which the index switches to in a
+        single transaction, so an interrupted compaction leaves the archive
+        as it was.
+
+        Args:
+            retrain: Train fresh dictionaries from all current records and
+                     recompress with them (otherwise records are copied with
+                     the latest existing dictionaries)
+
+        Returns:
+            stats() after compaction
+        """
+        with self._writing():
+            if retrain:
+                for endpoint in [row[0] for row in self._conn.execute("SELECT DISTINCT endpoint FROM records")]:
+                    self.train(endpoint)
+
+            before = self._end
+            generation = int(self._get_meta("generation") or 0) + 1
+            new_path = self.root / _data_file(str(generation))
+            records = self._conn.execute(
+                "SELECT workout_id, endpoint, offset, size, raw_size, crc32, codec, dict_id "
+                "FROM records ORDER BY offset"
+            ).fetchall()
+
+            old_writer, old_reader, old_path = self._writer, self._reader, self.data_path
+            self._writer, self._end = os.open(new_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644), 0
+            rows = []
+            try:
+                for record in records:
+                    workout_id, endpoint = record[:2]
+                    body = self._read(*record, reader=old_reader)
+                    rows.append(self._append(workout_id, endpoint, body, self._latest_dict.get(endpoint, 0)))
+                os.fsync(self._writer)
+
+                self._conn.execute("DELETE FROM records")
+                self._conn.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                # Drop dictionaries no record uses, except the latest of each
+                # endpoint and codec (other processes may be writing with it)
+                used = {row[7] for row in rows} | {
+                    row[0] for row in self._conn.execute("SELECT MAX(id) FROM dictionaries GROUP BY endpoint, codec")
+                }
+                unused = set(self._dicts) - used
+                self._conn.executemany("DELETE FROM dictionaries WHERE id = ?", [(d,) for d in unused])
+                self._set_meta("generation", str(generation))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                os.close(self._writer)
+                new_path.unlink(missing_ok=True)
+                self._writer, self._end = old_writer, before
+                raise
+
+            for dict_id in unused:
+                del self._dicts[dict_id]
+            os.close(self._writer)
+            self._writer = old_writer
+            # Processes still reading the old file keep it open until they
+            # notice the new generation
+            old_path.unlink(missing_ok=True)
+            self._use_generation(str(generation))
+            after = self._end
+
+        logger.info(f"Compacted archive: {before / 2**20:.1f} MB -> {after / 2**20:.1f} MB")
+        return self.stats()
+
+    def close(self) -> None:
+        """Close the data file and index."""
+        with self._lock:
+            self._close_data()
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+            self._conn.close()
+
+    def __enter__(self) -> "ResponseArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
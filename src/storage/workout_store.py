@@ -0,0 +1,220 @@
+"""
+Workout Store
+
+File-based persistence for workout history with a dataset version token.
+
+Workouts are kept as JSON under ``data/raw`` (timestamped snapshots plus
+``workouts_latest.json``). Every write bumps the version token in
+``data/VERSION`` so that caches and derived aggregates can tell when the
+underlying data has changed.
+
+A store holds either API workouts or rows of the official CSV export,
+never both: the two have different fields and no common ID, so merging
+one into the other is refused (a full sync or a CSV import replaces the
+store instead).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from datetime import datetime
+import json
+import logging
+import os
+import re
+import uuid
+
+from src import profiling
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+
+VERSION_FILE = "VERSION"
+
+FORMAT_API = "api"
+FORMAT_CSV = "csv"
+
+
+class MixedFormatError(ValueError):
+    """Raised when merging API workouts into CSV-export rows or vice versa."""
+
+
+def record_format(record: Dict[str, Any]) -> str:
+    """Tell whether a stored record is an API workout or a CSV export row."""
+    return FORMAT_CSV if "Workout Timestamp" in record else FORMAT_API
+
+
+def read_data_version(data_dir: Union[str, Path] = DEFAULT_DATA_DIR) -> str:
+    """
+    Read the current dataset version token.
+
+    Args:
+        data_dir: Data directory
+
+    Returns:
+        Version token, or "0" if no data has been written yet
+    """
+    try:
+        return (Path(data_dir) / VERSION_FILE).read_text().strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+
+def bump_data_version(data_dir: Union[str, Path] = DEFAULT_DATA_DIR) -> str:
+    """
+    Assign a new dataset version token.
+
+    Args:
+        data_dir: Data directory
+
+    Returns:
+        The new version token
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    token = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+    # Write atomically so readers never see a partial token
+    tmp_file = data_dir / f".{VERSION_FILE}.tmp"
+    tmp_file.write_text(token)
+    os.replace(tmp_file, data_dir / VERSION_FILE)
+
+    logger.debug(f"Data version bumped to {token}")
+    return token
+
+
+class WorkoutStore:
+    """Stores workout history as JSON and tracks its version."""
+
+    def __init__(self, data_dir: Union[str, Path] = DEFAULT_DATA_DIR):
+        """
+        Initialize the store.
+
+        Args:
+            data_dir: Root data directory (default: <repo>/data)
+        """
+        self.data_dir = Path(data_dir)
+        self.raw_dir = self.data_dir / "raw"
+        self.latest_file = self.raw_dir / "workouts_latest.json"
+
+    @property
+    def version(self) -> str:
+        """Current dataset version token."""
+        return read_data_version(self.data_dir)
+
+    def exists(self) -> bool:
+        """Check whether any workouts have been stored."""
+        return self.latest_file.exists()
+
+    def load(self) -> List[Dict[str, Any]]:
+        """
+        Load the latest stored workouts.
+
+        Returns:
+            List of workout records (empty if nothing stored yet)
+        """
+        if not self.exists():
+            return []
+        with profiling.stage("store.json_load"), open(self.latest_file) as f:
+            return json.load(f)
+
+    def save(self, workouts: List[Dict[str, Any]], prefix: str = "workouts") -> Path:
+        """
+        Save workouts as a timestamped snapshot and as the latest version.
+
+        Args:
+            workouts: Workout records to store
+            prefix: Snapshot file name prefix
+
+        Returns:
+            Path of the timestamped snapshot
+        """
+        self.raw_dir.mkdir(parents=True, exist_ok=True)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = self.raw_dir / f"{prefix}_{timestamp}.json"
+
+        logger.info(f"Saving to {output_file}...")
+        with profiling.stage("store.json_dump"):
+            with open(output_file, 'w') as f:
+                json.dump(workouts, f, indent=2)
+
+            tmp_file = self.raw_dir / ".workouts_latest.json.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(workouts, f, indent=2)
+            os.replace(tmp_file, self.latest_file)
+
+        bump_data_version(self.data_dir)
+
+        logger.info(f"✓ Saved {len(workouts)} workouts to {output_file}")
+        logger.info(f"✓ Also saved to {self.latest_file}")
+        return output_file
+
+    def merge(self, new_workouts: List[Dict[str, Any]], prefix: str = "workouts") -> int:
+        """
+        Add workouts that are not already stored (matched by ``id``).
+
+        Args:
+            new_workouts: Workout records, possibly overlapping stored ones
+            prefix: Snapshot file name prefix
+
+        Returns:
+            Number of workouts added (nothing is written if zero)
+
+        Raises:
+            MixedFormatError: If the new workouts aren't in the stored format
+        """
+        existing = self.load()
+        formats = {record_format(w) for w in existing[:1] + new_workouts}
+        if len(formats) > 1:
+            raise MixedFormatError(
+                f"Can't merge {' and '.join(sorted(formats))} workouts into one store; "
+                "replace the stored workouts instead (e.g. sync --full)"
+            )
+        known_ids = {w.get("id") for w in existing}
+        added = [w for w in new_workouts if w.get("id") not in known_ids]
+
+        if not added:
+            logger.info("No new workouts to store")
+            return 0
+
+        # Keep newest first, matching the API's ordering
+        merged = sorted(existing + added, key=lambda w: w.get("created_at") or 0, reverse=True)
+        self.save(merged, prefix=prefix)
+        logger.info(f"Stored {len(added)} new workouts")
+        return len(added)
+
+    def prune_snapshots(self, keep: int, prefix: str = "workouts") -> int:
+        """
+        Delete all but the newest timestamped snapshots.
+
+        Args:
+            keep: Number of snapshots to keep
+            prefix: Snapshot file name prefix
+
+        Returns:
+            Number of snapshots deleted
+        """
+        # Only save()'s own "<prefix>_YYYYmmdd_HHMMSS.json" names, not e.g. the
+        # CSV importer's "workouts_csv_import_*" files; these sort chronologically
+        pattern = re.compile(rf"{re.escape(prefix)}_\d{{8}}_\d{{6}}\.json")
+        snapshots = sorted(
+            p for p in self.raw_dir.glob(f"{prefix}_*.json") if pattern.fullmatch(p.name)
+        )
+        stale = snapshots[: max(len(snapshots) - keep, 0)]
+        for path in stale:
+            path.unlink(missing_ok=True)
+        if stale:
+            logger.info(f"Pruned {len(stale)} old snapshots")
+        return len(stale)
+
+    def stored_format(self) -> Optional[str]:
+        """Format of the stored workouts (FORMAT_API or FORMAT_CSV; None if empty)."""
+        workouts = self.load()
+        return record_format(workouts[0]) if workouts else None
+
+    def latest_created_at(self) -> Optional[int]:
+        """Get the created_at timestamp of the newest stored workout."""
+        timestamps = [w.get("created_at") for w in self.load() if w.get("created_at")]
+        return max(timestamps) if timestamps else None
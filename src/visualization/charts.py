@@ -0,0 +1,169 @@
+"""
+Chart Generators
+
+Matplotlib and Plotly charts for workout history and per-ride performance.
+
+Series are downsampled to the pixel width of the target plot before
+drawing (see src.visualization.downsample), so charts stay responsive and
+payloads stay small regardless of history length or sampling rate.
+"""
+
+from typing import Any, Dict, Optional, Sequence
+import logging
+
+import pandas as pd
+
+from src.storage.performance_store import performance_series
+from src.visualization.downsample import downsample, downsample_indices, points_for_width
+
+logger = logging.getLogger(__name__)
+
+# Performance graph metrics plotted by default
+DEFAULT_METRICS = ("output", "cadence", "resistance", "heart_rate")
+
+
+def _axes_width_px(ax) -> float:
+    """Get the pixel width of a matplotlib Axes."""
+    return ax.get_window_extent().width
+
+
+def plot_output_over_time(
+    df: pd.DataFrame,
+    ax=None,
+    discipline: Optional[str] = "cycling",
+    rolling_window: int = 30,
+    method: str = "lttb",
+):
+    """
+    Plot total output per workout with a rolling average.
+
+    Args:
+        df: Normalized workouts frame (see src.analysis.workouts.to_frame())
+        ax: Matplotlib Axes to draw on (default: new figure)
+        discipline: Only plot this fitness discipline (None for all)
+        rolling_window: Number of workouts in the rolling average
+        method: Downsampling method ("lttb" or "minmax")
+
+    Returns:
+        The matplotlib Axes
+    """
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        _, ax = plt.subplots(figsize=(14, 6))
+
+    data = df[df["total_work_kj"] > 0]
+    if discipline is not None:
+        data = data[data["fitness_discipline"] == discipline]
+    data = data.sort_values("created_at")
+
+    # The rolling average is computed on the full series, then downsampled
+    rolling = data["total_work_kj"].rolling(window=rolling_window, min_periods=1).mean()
+
+    width = _axes_width_px(ax)
+    x, y = downsample(data["created_at"].to_numpy(), data["total_work_kj"].to_numpy(), width, method=method)
+    rx, ry = downsample(data["created_at"].to_numpy(), rolling.to_numpy(), width, method="lttb")
+
+    ax.scatter(x, y, alpha=0.5, s=10)
+    ax.plot(rx, ry, color="red", linewidth=2, label=f"{rolling_window}-workout average")
+
+    title = f"Total Output Over Time ({discipline.title()})" if discipline else "Total Output Over Time"
+    ax.set_title(title, fontsize=14, fontweight="bold")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Total Output (kJ)")
+    ax.legend()
+    return ax
+
+
+def plot_performance_graph(
+    graph: Dict[str, Any],
+    metrics: Sequence[str] = DEFAULT_METRICS,
+    axes=None,
+    method: str = "minmax",
+):
+    """
+    Plot second-by-second metrics of a single ride.
+
+    Args:
+        graph: Response from get_workout_performance_graph()
+        metrics: Metric slugs to plot, one subplot each
+        axes: Sequence of matplotlib Axes (default: new figure)
+        method: Downsampling method; min/max keeps spikes visible
+
+    Returns:
+        Sequence of matplotlib Axes
+    """
+    import matplotlib.pyplot as plt
+
+    available = {m.get("slug") for m in graph.get("metrics", [])}
+    metrics = [m for m in metrics if m in available]
+    if not metrics:
+        raise ValueError("None of the requested metrics are in the performance graph")
+
+    if axes is None:
+        _, axes = plt.subplots(len(metrics), 1, figsize=(14, 2.5 * len(metrics)), sharex=True, squeeze=False)
+        axes = axes[:, 0]
+
+    for ax, slug in zip(axes, metrics):
+        seconds, values = performance_series(graph, slug)
+        x, y = downsample(seconds / 60, values, _axes_width_px(ax), method=method)
+        ax.plot(x, y, linewidth=1)
+        ax.set_ylabel(slug.replace("_", " ").title())
+
+    axes[-1].set_xlabel("Minutes")
+    return axes
+
+
+def output_over_time_figure(
+    df: pd.DataFrame,
+    width_px: int = 1200,
+    discipline: Optional[str] = "cycling",
+    rolling_window: int = 30,
+):
+    """
+    Build an interactive Plotly chart of output over time.
+
+    Args:
+        df: Normalized workouts frame
+        width_px: Figure width in pixels (sets the point budget)
+        discipline: Only plot this fitness discipline (None for all)
+        rolling_window: Number of workouts in the rolling average
+
+    Returns:
+        plotly.graph_objects.Figure
+    """
+    import plotly.graph_objects as go
+
+    data = df[df["total_work_kj"] > 0]
+    if discipline is not None:
+        data = data[data["fitness_discipline"] == discipline]
+    data = data.sort_values("created_at")
+    rolling = data["total_work_kj"].rolling(window=rolling_window, min_periods=1).mean()
+
+    budget = points_for_width(width_px)
+    idx = downsample_indices(data["created_at"].to_numpy(), data["total_work_kj"].to_numpy(), budget)
+    ridx = downsample_indices(data["created_at"].to_numpy(), rolling.to_numpy(), budget)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=data["created_at"].iloc[idx],
+        y=data["total_work_kj"].iloc[idx],
+        mode="markers",
+        name="Output (kJ)",
+        text=data["ride_title"].iloc[idx],
+        opacity=0.5,
+    ))
+    fig.add_trace(go.Scatter(
+        x=data["created_at"].iloc[ridx],
+        y=rolling.iloc[ridx],
+        mode="lines",
+        name=f"{rolling_window}-workout average",
+        line=dict(color="red", width=2),
+    ))
+    fig.update_layout(
+        title="Total Output Over Time",
+        xaxis_title="Date",
+        yaxis_title="Total Output (kJ)",
+        width=width_px,
+    )
+    return fig
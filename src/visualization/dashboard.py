@@ -0,0 +1,206 @@
+"""
+Peloton Dashboard
+
+Streamlit dashboard served entirely from precomputed aggregates.
+
+The dashboard never loads raw workouts: every panel is answered from the
+summary cube and downsampled series built by src.analysis.aggregates.
+Loaded aggregates are cached on the dataset version, and per-filter
+roll-ups on the version the aggregates were built from (which lags behind
+while they're out of date), so stale roll-ups are never cached as current.
+Heavier panels (Plotly charts, recent rides) only render when
+switched on.
+
+Usage:
+    streamlit run src/visualization/dashboard.py
+
+Set PELOTON_DATA_DIR to read aggregates from a data directory other than
+<repo>/data.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Add repo root to path (streamlit runs this file as a script)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+import pandas as pd
+import streamlit as st
+
+from src.analysis.aggregates import load_aggregates, refresh_aggregates
+from src.storage.workout_store import DEFAULT_DATA_DIR, read_data_version
+
+DATA_DIR = Path(os.getenv("PELOTON_DATA_DIR", DEFAULT_DATA_DIR))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_aggregates(version: str) -> Optional[Dict[str, Any]]:
+    """Load the aggregates once per dataset version."""
+    return load_aggregates(DATA_DIR)
+
+
+# Below, version is aggregates["version"]; _aggregates (not hashed) are the
+# aggregates it identifies
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_projection(version: str, dims: Tuple[str, ...], _aggregates: Dict[str, Any]):
+    """Project the cube onto the filter dimensions plus one grouping dimension."""
+    return _aggregates["cube"].project(*dims)
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def get_rollup(
+    version: str,
+    by: Tuple[str, ...],
+    disciplines: Tuple[str, ...],
+    months: Tuple[str, ...],
+    _aggregates: Dict[str, Any],
+) -> pd.DataFrame:
+    """Roll up the cube for one filter selection."""
+    # Filters only touch discipline and month, so a small projection suffices
+    dims = tuple(dict.fromkeys(("discipline", "month") + by))
+    cube = get_projection(version, dims, _aggregates)
+    filters = {}
+    if disciplines:
+        filters["discipline"] = disciplines
+    if months:
+        filters["month"] = months
+    return cube.slice(**filters).rollup(by)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def get_filter_options(version: str, _aggregates: Dict[str, Any]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Get the disciplines and months present in the cube."""
+    cells = _aggregates["cube"].cells
+    disciplines = tuple(sorted(cells["discipline"].unique()))
+    months = tuple(sorted(m for m in cells["month"].unique() if m != "Unknown"))
+    return disciplines, months
+
+
+def render_summary(aggregates: Dict[str, Any], disciplines: Tuple[str, ...], months: Tuple[str, ...]) -> None:
+    """Render the key metrics row."""
+    totals = get_rollup(aggregates["version"], (), disciplines, months, aggregates)
+    row = totals.iloc[0] if not totals.empty else None
+
+    cols = st.columns(4)
+    cols[0].metric("Workouts", f"{int(row['workouts']) if row is not None else 0:,}")
+    cols[1].metric("Total Output", f"{row['output_kj_sum'] if row is not None else 0:,.0f} kJ")
+    cols[2].metric("Total Time", f"{row['duration_minutes_sum'] / 60 if row is not None else 0:,.1f} h")
+    mean = row["output_kj_mean"] if row is not None else None
+    cols[3].metric("Avg Output", f"{mean:,.1f} kJ" if pd.notna(mean) else "–")
+
+
+def render_overview(aggregates: Dict[str, Any], disciplines: Tuple[str, ...], months: Tuple[str, ...]) -> None:
+    """Render the lightweight cube-backed charts."""
+    version = aggregates["version"]
+    left, right = st.columns(2)
+
+    with left:
+        st.subheader("Workouts by Type")
+        by_type = get_rollup(version, ("discipline",), disciplines, months, aggregates)
+        st.bar_chart(by_type.set_index("discipline")["workouts"])
+
+    with right:
+        st.subheader("Top Instructors")
+        by_instructor = get_rollup(version, ("instructor",), disciplines, months, aggregates)
+        top = by_instructor.nlargest(10, "workouts")[["instructor", "workouts", "output_kj_mean"]]
+        st.dataframe(top, hide_index=True, width="stretch")
+
+    st.subheader("Workouts per Month")
+    by_month = get_rollup(version, ("month",), disciplines, months, aggregates)
+    st.bar_chart(by_month[by_month["month"] != "Unknown"].set_index("month")["workouts"])
+
+
+def render_output_over_time(
+    aggregates: Dict[str, Any], disciplines: Tuple[str, ...], months: Tuple[str, ...]
+) -> None:
+    """Render the downsampled output-over-time chart (one pair of traces per selected discipline)."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    missing = []
+    for key in disciplines or ("all",):
+        series = aggregates["series"].get(key)
+        if series is not None and months:
+            series = series[series["created_at"].dt.strftime("%Y-%m").isin(months)]
+        if series is None or series.empty:
+            missing.append(key)
+            continue
+        label = "" if key == "all" else f"{key}: "
+        fig.add_trace(go.Scattergl(
+            x=series["created_at"], y=series["total_work_kj"], mode="markers",
+            name=f"{label}Output (kJ)", text=series["ride_title"], opacity=0.5, legendgroup=key,
+        ))
+        fig.add_trace(go.Scatter(
+            x=series["created_at"], y=series["rolling_avg"], mode="lines",
+            name=f"{label}30-workout average", legendgroup=key,
+            line=dict(color="red", width=2) if key == "all" else dict(width=2),
+        ))
+    if not fig.data:
+        st.info("No output data for this selection")
+        return
+
+    fig.update_layout(xaxis_title="Date", yaxis_title="Total Output (kJ)", margin=dict(t=20))
+    st.plotly_chart(fig, width="stretch")
+    if missing:
+        st.caption(f"No output data for {', '.join(missing)}")
+
+
+def render_time_of_day(aggregates: Dict[str, Any], disciplines: Tuple[str, ...], months: Tuple[str, ...]) -> None:
+    """Render a workouts-by-hour heatmap per discipline."""
+    import plotly.express as px
+
+    by_hour = get_rollup(aggregates["version"], ("discipline", "hour"), disciplines, months, aggregates)
+    by_hour = by_hour[by_hour["hour"] >= 0]
+    grid = by_hour.pivot(index="discipline", columns="hour", values="workouts").fillna(0)
+    fig = px.imshow(grid, aspect="auto", labels=dict(x="Hour of Day", y="Discipline", color="Workouts"))
+    st.plotly_chart(fig, width="stretch")
+
+
+def main() -> None:
+    """Render the dashboard."""
+    st.set_page_config(page_title="Peloton Analysis", layout="wide")
+    st.title("Peloton Analysis")
+
+    version = read_data_version(DATA_DIR)
+    aggregates = get_aggregates(version)
+
+    if aggregates is None or aggregates["version"] != version:
+        st.warning("Precomputed aggregates are missing or out of date.")
+        if st.button("Refresh aggregates"):
+            with st.spinner("Refreshing aggregates..."):
+                refresh_aggregates(DATA_DIR)
+            get_aggregates.clear()
+            st.rerun()
+        if aggregates is None:
+            return
+
+    all_disciplines, all_months = get_filter_options(aggregates["version"], aggregates)
+
+    with st.sidebar:
+        st.header("Filters")
+        disciplines = tuple(st.multiselect("Discipline", all_disciplines))
+        months: Tuple[str, ...] = ()
+        if len(all_months) > 1:
+            start, end = st.select_slider(
+                "Months", options=all_months, value=(all_months[0], all_months[-1])
+            )
+            if (start, end) != (all_months[0], all_months[-1]):
+                months = tuple(m for m in all_months if start <= m <= end)
+        st.caption(f"Data version {aggregates['version']}")
+
+    render_summary(aggregates, disciplines, months)
+    render_overview(aggregates, disciplines, months)
+
+    # Heavier panels load only on request
+    if st.toggle("Output over time"):
+        render_output_over_time(aggregates, disciplines, months)
+    if st.toggle("Time of day"):
+        render_time_of_day(aggregates, disciplines, months)
+    if st.toggle("Recent rides"):
+        st.dataframe(aggregates["recent"], hide_index=True, width="stretch")
+
+
+main()
@@ -0,0 +1,185 @@
+"""
+Series Downsampling
+
+Reduces long time series to a pixel-sized point budget before plotting.
+
+Two methods are provided:
+- LTTB (Largest-Triangle-Three-Buckets): keeps the points that preserve the
+  visual shape of the line; best for smooth trends such as output over time.
+- Min/max decimation: keeps each bucket's extremes; best for noisy 1 Hz
+  series where spikes must stay visible.
+
+Both return indices into the original arrays, so any number of aligned
+columns can be sliced consistently.
+"""
+
+from typing import Any, Tuple
+import math
+
+import numpy as np
+
+# Points per horizontal pixel; more than ~2 is not visible on screen
+DEFAULT_POINTS_PER_PIXEL = 2
+
+METHODS = ("lttb", "minmax")
+
+
+def points_for_width(width_px: float, points_per_pixel: float = DEFAULT_POINTS_PER_PIXEL) -> int:
+    """
+    Compute the point budget for a plot of the given pixel width.
+
+    Args:
+        width_px: Width of the plotting area in pixels
+        points_per_pixel: Points to keep per pixel column
+
+    Returns:
+        Number of points to keep (at least 3)
+    """
+    return max(int(width_px * points_per_pixel), 3)
+
+
+def _as_float(x: Any) -> np.ndarray:
+    """Convert x values (numeric or datetime-like) to float64."""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x: Any, y: Any, n_out: int) -> np.ndarray:
+    """
+    Select points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The interior is split into
+    n_out - 2 buckets, and from each bucket the point forming the largest
+    triangle with the previously selected point and the next bucket's
+    average is kept. Work inside each bucket is vectorized.
+
+    Args:
+        x: X values (numeric or datetime64), sorted ascending
+        y: Y values (finite)
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted array of selected indices
+    """
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets covering indices [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+
+    # Average point of every bucket, computed in one pass
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+
+    # Each bucket looks ahead to the next bucket's average (or the last point)
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        # Twice the triangle area; the constant factor doesn't affect argmax
+        area = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(y: Any, n_out: int) -> np.ndarray:
+    """
+    Select each bucket's minimum and maximum point.
+
+    Fully vectorized: the series is reshaped into n_out // 2 equal buckets
+    and the extremes of all buckets are found at once. NaNs are ignored.
+
+    Args:
+        y: Y values
+        n_out: Approximate number of points to keep
+
+    Returns:
+        Sorted array of selected indices (first and last always included)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n == 0:
+        return np.arange(n)
+
+    n_buckets = max(n_out // 2, 1)
+    size = math.ceil(n / n_buckets)
+
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    rows = padded.reshape(n_buckets, size)
+
+    offsets = np.arange(n_buckets) * size
+    valid = ~np.all(np.isnan(rows), axis=1)
+    i_min = np.nanargmin(rows[valid], axis=1) + offsets[valid]
+    i_max = np.nanargmax(rows[valid], axis=1) + offsets[valid]
+
+    return np.unique(np.concatenate([i_min, i_max, [0, n - 1]]))
+
+
+def downsample_indices(x: Any, y: Any, n_out: int, method: str = "lttb") -> np.ndarray:
+    """
+    Select indices to plot, skipping points with missing y values.
+
+    Args:
+        x: X values, sorted ascending
+        y: Y values
+        n_out: Point budget
+        method: "lttb" or "minmax"
+
+    Returns:
+        Sorted array of indices into the original x/y
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}. Use one of {METHODS}")
+
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.flatnonzero(np.isfinite(y))
+    if len(finite) <= n_out:
+        return finite
+
+    if method == "lttb":
+        selected = lttb_indices(np.asarray(x)[finite], y[finite], n_out)
+    else:
+        selected = minmax_indices(y[finite], n_out)
+    return finite[selected]
+
+
+def downsample(
+    x: Any,
+    y: Any,
+    width_px: float = 1200,
+    method: str = "lttb",
+    points_per_pixel: float = DEFAULT_POINTS_PER_PIXEL,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a series to fit a plot of the given pixel width.
+
+    Args:
+        x: X values (numeric or datetime64), sorted ascending
+        y: Y values
+        width_px: Width of the plotting area in pixels
+        method: "lttb" or "minmax"
+        points_per_pixel: Points to keep per pixel column
+
+    Returns:
+        Tuple of (x, y) arrays with at most ~width_px * points_per_pixel points
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    idx = downsample_indices(x, y, points_for_width(width_px, points_per_pixel), method=method)
+    return x[idx], y[idx]
@@ -0,0 +1,258 @@
+"""
+Period Reports
+
+Builds weekly and monthly summary reports (Markdown plus PNG charts).
+
+Each period's input rows are fingerprinted and the fingerprints are kept in
+a manifest next to the reports. Only periods whose data changed since the
+last build are re-rendered, and those are rendered in parallel across
+processes, so a nightly run over a multi-year history typically only
+re-renders the current week and month.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+
+from src.analysis.workouts import COLUMNS, to_frame
+from src.storage.workout_store import DEFAULT_DATA_DIR, WorkoutStore
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ("week", "month")
+
+# Bump when report layout changes so every period is re-rendered once
+REPORT_FORMAT_VERSION = "1"
+
+MANIFEST_FILE = "manifest.json"
+
+
+def period_keys(created_at: pd.Series, period: str) -> pd.Series:
+    """
+    Label each timestamp with its report period.
+
+    Args:
+        created_at: Workout timestamps
+        period: "week" (ISO weeks, e.g. "2024-W05") or "month" (e.g. "2024-01")
+
+    Returns:
+        Series of period keys
+    """
+    if period == "week":
+        iso = created_at.dt.isocalendar()
+        return iso["year"].astype(str) + "-W" + iso["week"].astype(str).str.zfill(2)
+    if period == "month":
+        return created_at.dt.strftime("%Y-%m")
+    raise ValueError(f"Unknown period: {period}. Use one of {PERIODS}")
+
+
+def fingerprint(rows: pd.DataFrame) -> str:
+    """
+    Fingerprint a period's input rows.
+
+    Args:
+        rows: Normalized workouts for one period
+
+    Returns:
+        Hex digest that changes whenever any row or value changes
+    """
+    digest = hashlib.sha256(REPORT_FORMAT_VERSION.encode())
+    ordered = rows[COLUMNS].sort_values(["created_at", "workout_id"]).reset_index(drop=True)
+    digest.update(pd.util.hash_pandas_object(ordered, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _summary_lines(rows: pd.DataFrame) -> List[str]:
+    """Build the Markdown summary table for a period."""
+    minutes = rows["duration_minutes"].sum()
+    calories = rows["calories"].sum(min_count=1)
+    lines = [
+        "| Metric | Value |",
+        "| --- | --- |",
+        f"| Workouts | {len(rows)} |",
+        f"| Active days | {rows['created_at'].dt.date.nunique()} |",
+        f"| Total time | {minutes / 60:.1f} h |",
+        f"| Total output | {rows['total_work_kj'].sum():.1f} kJ |",
+        f"| Calories | {calories:.0f} |" if pd.notna(calories) else "| Calories | – |",
+    ]
+    with_output = rows[rows["total_work_kj"] > 0]
+    if not with_output.empty:
+        best = with_output.loc[with_output["total_work_kj"].idxmax()]
+        lines.append(f"| Best output | {best['total_work_kj']:.1f} kJ ({best['ride_title']}) |")
+    return lines
+
+
+def render_period(period: str, key: str, rows: pd.DataFrame, output_dir: Union[str, Path]) -> Path:
+    """
+    Render one period's report.
+
+    Runs in a worker process, so it only depends on its arguments.
+
+    Args:
+        period: "week" or "month"
+        key: Period key (e.g. "2024-W05")
+        rows: Normalized workouts for the period
+        output_dir: Root reports directory
+
+    Returns:
+        Path of the report directory
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    report_dir = Path(output_dir) / period / key
+    report_dir.mkdir(parents=True, exist_ok=True)
+
+    fig, (ax_daily, ax_types) = plt.subplots(1, 2, figsize=(14, 5))
+
+    daily = rows.groupby(rows["created_at"].dt.date)["total_work_kj"].sum()
+    ax_daily.bar([str(d) for d in daily.index], daily.values)
+    ax_daily.set_title("Output per Day", fontsize=14, fontweight="bold")
+    ax_daily.set_ylabel("Total Output (kJ)")
+    ax_daily.tick_params(axis="x", rotation=45)
+
+    types = rows["fitness_discipline"].fillna("Unknown").value_counts()
+    ax_types.barh(types.index, types.values)
+    ax_types.set_title("Workouts by Type", fontsize=14, fontweight="bold")
+    ax_types.set_xlabel("Count")
+
+    fig.tight_layout()
+    fig.savefig(report_dir / "summary.png", dpi=100)
+    plt.close(fig)
+
+    instructors = rows["instructor_name"].dropna().value_counts().head(5)
+    lines = [f"# {period.title()} {key}", ""] + _summary_lines(rows)
+    if not instructors.empty:
+        lines += ["", "## Top Instructors", ""]
+        lines += [f"- {name}: {count}" for name, count in instructors.items()]
+    lines += ["", "![Summary](summary.png)", ""]
+    (report_dir / "report.md").write_text("\n".join(lines))
+
+    return report_dir
+
+
+class ReportBuilder:
+    """Renders period reports in parallel, skipping unchanged periods."""
+
+    def __init__(
+        self,
+        data_dir: Union[str, Path] = DEFAULT_DATA_DIR,
+        output_dir: Optional[Union[str, Path]] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Initialize the builder.
+
+        Args:
+            data_dir: Data directory holding the workout store
+            output_dir: Where reports are written (default: <data_dir>/reports)
+            max_workers: Worker processes (default: CPU count)
+        """
+        self.data_dir = Path(data_dir)
+        self.output_dir = Path(output_dir) if output_dir else self.data_dir / "reports"
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.manifest_path = self.output_dir / MANIFEST_FILE
+
+    def _load_manifest(self) -> Dict[str, str]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, str]) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def plan(
+        self,
+        df: pd.DataFrame,
+        periods: Sequence[str] = PERIODS,
+        force: bool = False,
+    ) -> Tuple[List[Tuple[str, str, pd.DataFrame, str]], int]:
+        """
+        Work out which periods need rendering.
+
+        Args:
+            df: Normalized workouts frame
+            periods: Period kinds to build
+            force: Re-render every period
+
+        Returns:
+            Tuple of (list of (period, key, rows, fingerprint) to render,
+            number of unchanged periods skipped)
+        """
+        manifest = self._load_manifest()
+        df = df.dropna(subset=["created_at"])
+
+        todo = []
+        skipped = 0
+        for period in periods:
+            for key, rows in df.groupby(period_keys(df["created_at"], period)):
+                digest = fingerprint(rows)
+                if not force and manifest.get(f"{period}/{key}") == digest:
+                    skipped += 1
+                    continue
+                todo.append((period, key, rows, digest))
+        return todo, skipped
+
+    def build(
+        self,
+        df: Optional[pd.DataFrame] = None,
+        periods: Sequence[str] = PERIODS,
+        force: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Render all changed period reports.
+
+        Args:
+            df: Normalized workouts frame (default: load from the workout store)
+            periods: Period kinds to build ("week", "month")
+            force: Re-render every period even if unchanged
+
+        Returns:
+            Dictionary with "rendered" (list of period keys), "skipped" count
+            and "failed" (list of period keys)
+        """
+        if df is None:
+            df = to_frame(WorkoutStore(self.data_dir).load())
+
+        todo, skipped = self.plan(df, periods, force)
+        logger.info(f"Reports: {len(todo)} to render, {skipped} unchanged")
+
+        manifest = self._load_manifest()
+        rendered, failed = [], []
+
+        if todo:
+            workers = min(self.max_workers, len(todo))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(render_period, period, key, rows, self.output_dir): (period, key, digest)
+                    for period, key, rows, digest in todo
+                }
+                for future in as_completed(futures):
+                    period, key, digest = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to render {period} {key}: {e}")
+                        failed.append(f"{period}/{key}")
+                        continue
+                    manifest[f"{period}/{key}"] = digest
+                    rendered.append(f"{period}/{key}")
+
+            self._save_manifest(manifest)
+
+        logger.info(f"✓ Rendered {len(rendered)} reports to {self.output_dir}")
+        return {"rendered": sorted(rendered), "skipped": skipped, "failed": sorted(failed)}
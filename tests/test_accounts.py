@@ -0,0 +1,97 @@
+"""Tests for src.extraction.accounts."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from src.extraction.accounts import AccountStats, FairRateLimiter, ThrottledTransport, load_accounts
+from src.extraction.transport import Transport, build_response
+
+
+def hammer(limiter, account, threads, grants, stop):
+    """Start threads that acquire tokens for an account until stopped."""
+    lock = threading.Lock()
+
+    def worker():
+        while not stop.is_set():
+            limiter.acquire(account)
+            with lock:
+                grants.append(account)
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    return workers
+
+
+def test_tokens_are_shared_fairly_across_accounts():
+    limiter = FairRateLimiter(rate=200, burst=1)
+    grants, stop = [], threading.Event()
+    workers = hammer(limiter, "big", 6, grants, stop) + hammer(limiter, "small", 1, grants, stop)
+
+    time.sleep(0.6)
+    stop.set()
+    for t in workers:
+        t.join(timeout=2)
+
+    # Skip the start-up, when not every account is queued yet
+    window = grants[10:]
+    assert len(window) > 50
+    assert 0.4 <= window.count("small") / len(window) <= 0.6
+
+
+def test_rate_is_global():
+    limiter = FairRateLimiter(rate=50, burst=1)
+    start = time.monotonic()
+
+    for i in range(11):
+        limiter.acquire("a" if i % 2 else "b")
+
+    assert time.monotonic() - start >= 10 / 50 * 0.9
+
+
+def test_burst_is_granted_immediately():
+    limiter = FairRateLimiter(rate=1, burst=5)
+
+    assert max(limiter.acquire("a") for _ in range(5)) < 0.05
+
+
+class OkTransport(Transport):
+    def send(self, method, url, params=None, headers=None):
+        return build_response(200 if "ok" in url else 500, b"{}", url)
+
+
+def test_throttled_transport_records_stats():
+    stats = AccountStats("a")
+    transport = ThrottledTransport(OkTransport(), FairRateLimiter(rate=1000), stats)
+
+    transport.send("GET", "/ok")
+    transport.send("GET", "/fail")
+
+    summary = stats.summary()
+    assert (summary["requests"], summary["request_errors"]) == (2, 1)
+    assert summary["latency_ms_p50"] is not None
+    assert not transport.rate_limited
+
+
+def test_load_accounts(tmp_path, monkeypatch):
+    monkeypatch.setenv("SAM_PASSWORD", "secret")
+    path = tmp_path / "accounts.json"
+    path.write_text(json.dumps([
+        {"username": "alex.r@example.com", "password": "pw"},
+        {"name": "sam", "username": "sam@example.com", "password_env": "SAM_PASSWORD"},
+    ]))
+
+    assert load_accounts(path) == [
+        {"name": "alex.r", "username": "alex.r@example.com", "password": "pw"},
+        {"name": "sam", "username": "sam@example.com", "password": "secret"},
+    ]
+
+    path.write_text(json.dumps([{"username": "a@x.com", "password": "1"}, {"username": "a@y.com", "password": "2"}]))
+    with pytest.raises(ValueError, match="Duplicate"):
+        load_accounts(path)
+    path.write_text(json.dumps([{"username": "a@x.com", "password_env": "UNSET_PASSWORD"}]))
+    with pytest.raises(ValueError, match="password"):
+        load_accounts(path)
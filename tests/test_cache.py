@@ -0,0 +1,150 @@
+"""Tests for src.analysis.cache and the memoized analysis entry points."""
+
+import pandas as pd
+
+from benchmarks import synthetic
+from src.analysis.cache import AnalysisCache, memoize
+from src.analysis.cube import SummaryCube, summary_cube, summary_rollup
+from src.analysis.records import PersonalRecords, personal_records
+from src.analysis.workouts import load_workouts_frame, to_frame
+from src.storage.workout_store import WorkoutStore
+
+
+def counting(cache, disk=False):
+    calls = []
+
+    @memoize(cache=cache, disk=disk)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    return square, calls
+
+
+def counting_rows(cache):
+    calls = []
+
+    @memoize(cache=cache)
+    def rows(df):
+        calls.append(df)
+        return len(df)
+
+    return rows, calls
+
+
+def test_hits_and_misses(tmp_path):
+    cache = AnalysisCache(data_dir=tmp_path)
+    square, calls = counting(cache)
+
+    assert [square(2), square(2), square(3), square(x=2)] == [4, 4, 9, 4]
+
+    assert calls == [2, 3, 2]
+    stats = square.cache_stats()
+    assert (stats["memory_hits"], stats["misses"]) == (1, 3)
+    assert stats["hit_rate"] == 0.25
+
+
+def test_lru_eviction_at_size_bound(tmp_path):
+    cache = AnalysisCache(max_entries=2, data_dir=tmp_path)
+    square, calls = counting(cache)
+
+    square(1)
+    square(2)
+    square(1)  # 1 is now most recently used
+    square(3)  # evicts 2
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["memory_entries"] == 2
+    square(1)
+    square(2)
+    assert calls == [1, 2, 3, 2]
+
+
+def test_disk_tier(tmp_path):
+    cache_dir = tmp_path / "cache"
+    square, calls = counting(AnalysisCache(cache_dir=cache_dir, data_dir=tmp_path), disk=True)
+    square(4)
+    assert len(list(cache_dir.rglob("*.pkl"))) == 1
+
+    # A fresh process (new memory tier) is served from disk
+    again, again_calls = counting(AnalysisCache(cache_dir=cache_dir, data_dir=tmp_path), disk=True)
+    assert again(4) == 16
+    assert again_calls == []
+    assert again.cache_stats()["disk_hits"] == 1
+
+    again.cache_clear()
+    assert not cache_dir.exists()
+
+
+def test_disk_tier_size_bound(tmp_path):
+    cache = AnalysisCache(cache_dir=tmp_path / "cache", max_disk_bytes=1, data_dir=tmp_path)
+    square, _ = counting(cache, disk=True)
+    square(1)
+    square(2)
+
+    assert len(list((tmp_path / "cache").rglob("*.pkl"))) == 0
+    assert cache.stats()["evictions"] == 2
+
+
+def test_invalidated_when_store_version_bumps(tmp_path):
+    cache = AnalysisCache(cache_dir=tmp_path / "cache", data_dir=tmp_path)
+    square, calls = counting(cache, disk=True)
+    store = WorkoutStore(tmp_path)
+    store.save(list(synthetic.iter_workouts(3)))
+    square(5)
+    square(5)
+
+    store.save(list(synthetic.iter_workouts(4)))
+    square(5)
+
+    assert calls == [5, 5]
+    assert cache.stats()["invalidations"] == 1
+    # Disk entries for the old version are purged
+    assert [p.name for p in (tmp_path / "cache").iterdir()] == [store.version]
+
+
+def test_frames_are_keyed_on_content(tmp_path):
+    rows, calls = counting_rows(AnalysisCache(data_dir=tmp_path))
+    df = pd.DataFrame({"a": [1, 2, 3]})
+
+    rows(df)
+    rows(df.copy())
+    rows(df.assign(a=[1, 2, 4]))
+
+    assert len(calls) == 2
+
+
+def test_frames_with_nested_cells(tmp_path):
+    rows, calls = counting_rows(AnalysisCache(data_dir=tmp_path))
+    df = pd.DataFrame({"ride": [{"title": "a"}, {"title": "b"}], "tags": [["x"], []]})
+
+    rows(df)
+    rows(df.copy())
+    rows(df.assign(tags=[["y"], []]))
+
+    assert len(calls) == 2
+
+
+def test_memoized_analysis_entry_points(tmp_path):
+    df = to_frame(list(synthetic.iter_workouts(200)))
+    expected = SummaryCube.build(df)
+
+    assert summary_cube(df) is summary_cube(df.copy())
+    pd.testing.assert_frame_equal(summary_cube(df).rollup("discipline"), expected.rollup("discipline"))
+    pd.testing.assert_frame_equal(
+        summary_rollup(df, "month", discipline="cycling"),
+        expected.slice(discipline="cycling").rollup("month"),
+    )
+
+    records = PersonalRecords()
+    records.update(df)
+    pd.testing.assert_frame_equal(personal_records(df), records.to_frame())
+
+
+def test_load_workouts_frame_reloads_changed_file(tmp_path):
+    store = WorkoutStore(tmp_path)
+    store.save(list(synthetic.iter_workouts(5)))
+    assert load_workouts_frame(store.latest_file) is load_workouts_frame(store.latest_file)
+
+    store.save(list(synthetic.iter_workouts(8)))
+    assert len(load_workouts_frame(store.latest_file)) == 8
@@ -0,0 +1,38 @@
+"""Tests for importing the CSV export (src.extraction.csv_import via the CLI)."""
+
+import csv
+
+from benchmarks import synthetic
+from src.analysis.aggregates import load_aggregates
+from src.cli import main
+from src.storage.workout_store import WorkoutStore
+
+
+def write_csv(path, n=20, blank_lengths=(3,)):
+    rows = [synthetic.csv_row(w) for w in synthetic.iter_workouts(n)]
+    for i in blank_lengths:
+        rows[i]["Length (minutes)"] = ""
+        rows[i]["Total Output"] = 250
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def test_import_with_missing_duration(tmp_path):
+    path = write_csv(tmp_path / "workouts.csv")
+
+    assert main(["--data-dir", str(tmp_path / "data"), "import", str(path)]) == 0
+
+    aggregates = load_aggregates(tmp_path / "data")
+    assert aggregates["version"] == WorkoutStore(tmp_path / "data").version
+    assert int(aggregates["cube"].rollup(()).iloc[0]["workouts"]) == 20
+    assert all(isinstance(d, int) for _, d in aggregates["records"].best)
+
+
+def test_import_single_row_with_missing_duration(tmp_path):
+    path = write_csv(tmp_path / "workouts.csv", n=1, blank_lengths=(0,))
+
+    assert main(["--data-dir", str(tmp_path / "data"), "import", str(path)]) == 0
+    assert len(load_aggregates(tmp_path / "data")["records"]) == 0
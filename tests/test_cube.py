@@ -0,0 +1,73 @@
+"""Tests for src.analysis.cube."""
+
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from src.analysis.cube import SummaryCube
+from src.analysis.workouts import to_frame
+
+
+@pytest.fixture(scope="module")
+def df():
+    return to_frame(list(synthetic.iter_workouts(500)))
+
+
+def test_rollup_matches_groupby(df):
+    cube = SummaryCube.build(df)
+
+    result = cube.rollup("discipline").set_index("discipline")
+
+    expected = df.groupby("fitness_discipline")["total_work_kj"].agg(["size", "sum", "mean", "min", "max"])
+    assert list(result.index) == list(expected.index)
+    assert list(result["workouts"]) == list(expected["size"])
+    for stat in ("sum", "mean", "min", "max"):
+        assert result[f"output_kj_{stat}"].tolist() == pytest.approx(expected[stat].tolist())
+    assert len(cube) == len(df)
+
+
+def test_slice_and_project(df):
+    cube = SummaryCube.build(df)
+    months = sorted(df["created_at"].dt.strftime("%Y-%m").unique())[:2]
+
+    sliced = cube.project("discipline", "month").slice(discipline="cycling", month=months)
+
+    rows = df[(df["fitness_discipline"] == "cycling") & df["created_at"].dt.strftime("%Y-%m").isin(months)]
+    totals = sliced.rollup(()).iloc[0]
+    assert totals["workouts"] == len(rows)
+    assert totals["calories_sum"] == pytest.approx(rows["calories"].sum())
+    assert sliced.top("month", n=1)["workouts"].iloc[0] == rows["created_at"].dt.strftime("%Y-%m").value_counts().max()
+
+    with pytest.raises(ValueError):
+        sliced.rollup("instructor")
+    with pytest.raises(ValueError):
+        sliced.refresh(df)
+
+
+def test_refresh_matches_full_build(df):
+    cube = SummaryCube.build(df.iloc[:300])
+
+    assert cube.refresh(df) == 200
+    assert cube.refresh(df) == 0
+
+    expected = SummaryCube.build(df)
+    by = ["instructor", "discipline", "class_length", "month", "hour"]
+    pd.testing.assert_frame_equal(cube.rollup(by), expected.rollup(by))
+    assert cube.workout_ids == expected.workout_ids
+
+
+def test_save_load(df, tmp_path):
+    cube = SummaryCube.build(df).project("discipline", "hour")
+    cube.save(tmp_path / "cube.pkl")
+
+    loaded = SummaryCube.load(tmp_path / "cube.pkl")
+
+    assert loaded.dimensions == ("discipline", "hour")
+    pd.testing.assert_frame_equal(loaded.rollup("hour"), cube.rollup("hour"))
+
+
+def test_empty_cube():
+    cube = SummaryCube.build(to_frame([]))
+
+    assert len(cube) == 0
+    assert cube.rollup("discipline").empty
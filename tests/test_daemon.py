@@ -0,0 +1,147 @@
+"""Tests for src.extraction.daemon and snapshot pruning."""
+
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+from benchmarks import synthetic
+from src.analysis.aggregates import load_aggregates
+from src.extraction import daemon as daemon_module
+from src.extraction.daemon import SyncDaemon, is_healthy, read_health
+from src.storage.workout_store import WorkoutStore
+
+
+class FakeClient:
+    """PelotonClient stand-in serving a growing synthetic history."""
+
+    def __init__(self, n, expire_session=False):
+        self.n = n
+        self.expire_session = expire_session
+        self.connects = 0
+
+    def workouts(self):
+        return sorted(synthetic.iter_workouts(self.n), key=lambda w: w["created_at"], reverse=True)
+
+    def connect(self):
+        self.connects += 1
+        return True
+
+    def disconnect(self):
+        pass
+
+    def get_all_workouts(self, joins=None):
+        return self.workouts()
+
+    def get_workouts_since(self, created_after, joins=None):
+        if self.expire_session:
+            self.expire_session = False
+            response = requests.Response()
+            response.status_code = 401
+            raise requests.HTTPError("401 Unauthorized", response=response)
+        return [w for w in self.workouts() if w["created_at"] >= created_after]
+
+
+def make_daemon(tmp_path, client, **kwargs):
+    kwargs.setdefault("isolate_analysis", False)
+    return SyncDaemon(client, tmp_path, interval=0.01, jitter=0, **kwargs)
+
+
+def snapshot(store, when):
+    path = store.raw_dir / f"workouts_{when:%Y%m%d_%H%M%S}.json"
+    path.write_text("[]")
+    return path
+
+
+def test_ticks_sync_and_refresh(tmp_path):
+    client = FakeClient(30)
+    daemon = make_daemon(tmp_path, client)
+
+    first = daemon.run_once()
+    client.n = 35
+    second = daemon.run_once()
+    third = daemon.run_once()
+
+    assert (first["added"], second["added"], third["added"]) == (30, 5, 0)
+    assert load_aggregates(tmp_path)["version"] == WorkoutStore(tmp_path).version
+    assert len(WorkoutStore(tmp_path).load()) == 35
+
+
+def test_run_writes_health(tmp_path):
+    client = FakeClient(10)
+
+    assert make_daemon(tmp_path, client).run(max_ticks=2) == 0
+
+    health = read_health(tmp_path)
+    assert health["status"] == "stopped"
+    assert (health["ticks"], health["workouts_added"], health["consecutive_failures"]) == (2, 10, 0)
+    assert health["stale_after"] is None
+    assert not is_healthy(health)
+
+
+def test_expired_session_logs_in_again(tmp_path):
+    client = FakeClient(10)
+    daemon = make_daemon(tmp_path, client)
+    daemon.run_once()
+    client.n, client.expire_session = 12, True
+
+    assert daemon.run_once()["added"] == 2
+    assert client.connects == 1
+
+
+def test_failed_refresh_is_retried_next_tick(tmp_path, monkeypatch):
+    daemon = make_daemon(tmp_path, FakeClient(10))
+    refresh = daemon_module._refresh_analysis
+
+    def failing(data_dir):
+        raise RuntimeError("refresh failed")
+
+    monkeypatch.setattr(daemon_module, "_refresh_analysis", failing)
+    assert daemon.run(max_ticks=1) == 0
+    assert read_health(tmp_path)["recent_ticks"][-1]["error"] == "RuntimeError: refresh failed"
+    assert load_aggregates(tmp_path) is None
+
+    # Nothing new to fetch, but the aggregates still lag behind the store
+    monkeypatch.setattr(daemon_module, "_refresh_analysis", refresh)
+    assert daemon.run_once()["added"] == 0
+    assert load_aggregates(tmp_path)["version"] == WorkoutStore(tmp_path).version
+
+
+def test_stuck_tick_is_unhealthy(tmp_path):
+    daemon = make_daemon(tmp_path, FakeClient(1))
+    daemon._status = "syncing"
+    daemon._tick_started = datetime.now()
+
+    health = daemon.health()
+    assert is_healthy(health)
+    assert not is_healthy(health, now=datetime.now() + timedelta(seconds=1))
+
+
+def test_ticks_prune_old_snapshots(tmp_path):
+    store = WorkoutStore(tmp_path)
+    store.raw_dir.mkdir(parents=True)
+    old = [snapshot(store, datetime(2024, 1, 1) + timedelta(days=i)) for i in range(4)]
+    csv_import = store.raw_dir / "workouts_csv_import_20240101_000000.json"
+    csv_import.write_text("[]")
+
+    make_daemon(tmp_path, FakeClient(5), keep_snapshots=3).run_once()
+
+    assert [p.exists() for p in old] == [False, False, True, True]
+    assert csv_import.exists()
+    assert store.latest_file.exists()
+
+
+@pytest.mark.parametrize("keep, remaining", [(0, 0), (2, 2), (10, 3)])
+def test_prune_snapshots(tmp_path, keep, remaining):
+    store = WorkoutStore(tmp_path)
+    store.save([])
+    store.raw_dir.joinpath("workouts_csv_import_20240101_000000.json").write_text("[]")
+    for path in store.raw_dir.glob("workouts_2*.json"):
+        path.unlink()
+    snapshots = [snapshot(store, datetime(2024, 1, 1) + timedelta(hours=i)) for i in range(3)]
+
+    assert store.prune_snapshots(keep) == 3 - remaining
+
+    assert [p for p in snapshots if p.exists()] == snapshots[3 - remaining:]
+    assert store.raw_dir.joinpath("workouts_csv_import_20240101_000000.json").exists()
+    assert store.latest_file.exists()
@@ -0,0 +1,64 @@
+"""Latency tests for src/visualization/dashboard.py on a large synthetic history."""
+
+from pathlib import Path
+import gc
+import time
+
+import pytest
+
+from benchmarks import synthetic
+from src.analysis.aggregates import refresh_aggregates
+from src.storage.workout_store import WorkoutStore
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+DASHBOARD = Path(__file__).parent.parent / "src" / "visualization" / "dashboard.py"
+
+WORKOUTS = 50_000
+COLD_START_TARGET = 2.0
+FILTER_CHANGE_TARGET = 0.2
+
+
+@pytest.fixture(scope="module")
+def dashboard(tmp_path_factory):
+    """Dashboard on a fresh data dir, with the time its cold start took."""
+    data_dir = tmp_path_factory.mktemp("data")
+    WorkoutStore(data_dir).save(synthetic.workouts(WORKOUTS))
+    refresh_aggregates(data_dir)
+
+    # Time the dashboard, not collections of the heap other tests left
+    # behind: a streamlit server process doesn't carry it
+    gc.collect()
+    gc.freeze()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("PELOTON_DATA_DIR", str(data_dir))
+        app = AppTest.from_file(str(DASHBOARD), default_timeout=30)
+        start = time.perf_counter()
+        app.run()
+        yield app, time.perf_counter() - start
+    gc.unfreeze()
+
+
+@pytest.mark.slow
+def test_cold_start(dashboard):
+    app, cold_start = dashboard
+
+    assert not app.exception
+    assert cold_start < COLD_START_TARGET
+
+
+@pytest.mark.slow
+def test_filter_change(dashboard):
+    app, _ = dashboard
+    disciplines = app.sidebar.multiselect[0]
+
+    start = time.perf_counter()
+    disciplines.select("cycling").run()
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    disciplines.unselect("cycling").select("yoga").run()
+    second = time.perf_counter() - start
+
+    assert not app.exception
+    assert max(first, second) < FILTER_CHANGE_TARGET
@@ -0,0 +1,101 @@
+"""Tests for src.visualization.downsample."""
+
+import math
+
+import numpy as np
+import pytest
+
+from src.visualization.downsample import (
+    downsample,
+    downsample_indices,
+    lttb_indices,
+    minmax_indices,
+    points_for_width,
+)
+
+
+def reference_lttb(x, y, n_out):
+    """Sveinn Steinarsson's original LTTB, one point at a time."""
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    selected = [0]
+    a = 0
+    for i in range(n_out - 2):
+        next_start = math.floor((i + 1) * every) + 1
+        next_end = min(math.floor((i + 2) * every) + 1, n)
+        avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+
+        start = math.floor(i * every) + 1
+        end = math.floor((i + 1) * every) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+@pytest.mark.parametrize("n, n_out", [(1000, 50), (997, 100), (10, 3), (100, 99)])
+def test_lttb_matches_reference(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 1e4, n))
+    y = np.cumsum(rng.normal(size=n))
+
+    assert lttb_indices(x, y, n_out).tolist() == reference_lttb(x.tolist(), y.tolist(), n_out)
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(1000)
+    y[437] = 50
+
+    assert 437 in lttb_indices(np.arange(1000), y, 20)
+
+
+def test_lttb_datetimes():
+    x = np.arange("2024-01-01", "2024-12-31", dtype="datetime64[D]")
+    y = np.sin(np.arange(len(x)) / 10)
+
+    assert lttb_indices(x, y, 30).tolist() == reference_lttb(list(range(len(x))), y.tolist(), 30)
+
+
+def test_minmax_keeps_bucket_extremes():
+    y = np.array([3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5, 8], dtype=float)
+
+    # Two buckets of six: min/max of each plus the endpoints
+    assert minmax_indices(y, 4).tolist() == [0, 1, 5, 6, 11]
+
+
+def test_minmax_ignores_nans():
+    y = np.array([np.nan, np.nan, np.nan, 2, 7, 1, 4, 3, 9], dtype=float)
+
+    # Buckets of three; the all-NaN first bucket contributes nothing
+    assert minmax_indices(y, 6).tolist() == [0, 4, 5, 7, 8]
+
+
+def test_downsample_indices_skips_missing_values():
+    y = np.arange(100, dtype=float)
+    y[::7] = np.nan
+
+    for method in ("lttb", "minmax"):
+        idx = downsample_indices(np.arange(100), y, 10, method=method)
+        assert np.isfinite(y[idx]).all()
+        assert idx[0] == 1 and idx[-1] == 99
+
+    assert downsample_indices(np.arange(100), y, 1000).tolist() == np.flatnonzero(np.isfinite(y)).tolist()
+    with pytest.raises(ValueError):
+        downsample_indices(np.arange(100), y, 10, method="every_nth")
+
+
+def test_downsample_to_width():
+    x = np.arange(100_000)
+    y = np.sin(x / 100)
+
+    dx, dy = downsample(x, y, width_px=500)
+
+    assert len(dx) == points_for_width(500) == 1000
+    assert (dy == y[dx]).all()
+    assert points_for_width(0) == 3
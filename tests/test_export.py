@@ -0,0 +1,124 @@
+"""Tests for the FIT/TCX encoders and src.export.exporter."""
+
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from benchmarks import synthetic
+from src.export.activity import Activity
+from src.export.exporter import GraphExporter, workout_info
+from src.export.fit import FIT_EPOCH_OFFSET, crc16, write_fit
+from src.export.tcx import write_tcx
+from src.storage.performance_store import PerformanceGraphStore
+from src.storage.workout_store import WorkoutStore
+
+fitdecode = pytest.importorskip("fitdecode")
+
+TCX = "{http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2}"
+TPX = "{http://www.garmin.com/xmlschemas/ActivityExtension/v2}"
+
+
+@pytest.fixture
+def workout():
+    # First cycling workout of the synthetic history
+    return next(w for w in synthetic.iter_workouts(50) if w["has_pedaling_metrics"])
+
+
+@pytest.fixture
+def activity(tmp_path, workout):
+    store = PerformanceGraphStore(tmp_path)
+    graph = synthetic.performance_graph(workout)
+    # A gap in heart rate must come out as "no value", not zero
+    heart_rate = next(m for m in graph["metrics"] if m["slug"] == "heart_rate")
+    heart_rate["values"][10:20] = [None] * 10
+    store.save(workout["id"], graph)
+    return Activity.from_store(store, workout["id"], workout_info(workout))
+
+
+def read_fit(path):
+    frames = {}
+    with fitdecode.FitReader(str(path), check_crc=fitdecode.CrcCheck.RAISE) as reader:
+        for frame in reader:
+            if frame.frame_type == fitdecode.FIT_FRAME_DATA:
+                frames.setdefault(frame.name, []).append(frame)
+    return frames
+
+
+def test_crc16():
+    # CRC-16/ARC check value
+    assert crc16(b"123456789") == 0xBB3D
+    assert crc16(b"56789", crc16(b"1234")) == 0xBB3D
+
+
+def test_fit_round_trip(tmp_path, activity, workout):
+    path = write_fit(activity, tmp_path / "ride.fit")
+
+    frames = read_fit(path)
+
+    records = frames["record"]
+    assert len(records) == len(activity) == workout["ride"]["duration"]
+    first = records[0]
+    assert first.get_raw_value("timestamp") == workout["start_time"] - FIT_EPOCH_OFFSET
+    powers = [r.get_raw_value("power") for r in records]
+    assert powers == np.rint(activity.power).astype(int).tolist()
+    assert records[15].get_value("heart_rate") is None
+    assert records[5].get_value("heart_rate") == round(activity.heart_rate[5])
+    assert records[-1].get_value("distance") == pytest.approx(activity.total_distance, abs=0.01)
+
+    session = frames["session"][0]
+    assert session.get_value("sport") == "cycling"
+    assert session.get_value("sub_sport") == "indoor_cycling"
+    assert session.get_value("total_elapsed_time") == pytest.approx(activity.duration)
+    assert session.get_value("avg_power") == round(np.nanmean(activity.power))
+    assert [f.get_value("event_type") for f in frames["event"]] == ["start", "stop_all"]
+    assert frames["activity"][0].get_value("num_sessions") == 1
+
+
+def test_fit_crc_is_checked(tmp_path, activity):
+    path = write_fit(activity, tmp_path / "ride.fit")
+    data = bytearray(path.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(fitdecode.FitCRCError):
+        read_fit(path)
+
+
+def test_tcx(tmp_path, activity, workout):
+    path = write_tcx(activity, tmp_path / "ride.tcx")
+
+    root = ET.parse(path).getroot()
+    tcx_activity = root.find(f"{TCX}Activities/{TCX}Activity")
+    assert tcx_activity.get("Sport") == "Biking"
+    assert tcx_activity.find(f"{TCX}Notes").text == workout["ride"]["title"]
+
+    points = tcx_activity.findall(f".//{TCX}Trackpoint")
+    assert len(points) == len(activity)
+    watts = [int(p.find(f".//{TPX}Watts").text) for p in points]
+    assert watts == np.rint(activity.power).astype(int).tolist()
+    assert points[15].find(f"{TCX}HeartRateBpm") is None
+    assert points[1].find(f"{TCX}Time").text == (
+        np.datetime64(workout["start_time"] + 1, "s").astype(str) + "Z"
+    )
+    assert float(points[-1].find(f"{TCX}DistanceMeters").text) == pytest.approx(activity.total_distance, abs=0.05)
+
+
+def test_exporter_skips_unchanged(tmp_path):
+    workouts = [w for w in synthetic.iter_workouts(20) if w["has_pedaling_metrics"]][:2]
+    WorkoutStore(tmp_path).save(workouts)
+    graphs = PerformanceGraphStore(tmp_path)
+    for w in workouts:
+        graphs.save(w["id"], synthetic.performance_graph(w))
+    exporter = GraphExporter(tmp_path, max_workers=2)
+
+    first = exporter.export(workout_ids=[w["id"] for w in workouts] + ["missing"])
+    assert len(first["exported"]) == 4
+    assert first["unavailable"] == ["missing"]
+
+    assert exporter.export()["skipped"] == 4
+
+    graphs.save(workouts[0]["id"], synthetic.performance_graph(workouts[0], seed=1))
+    again = exporter.export()
+    assert (len(again["exported"]), again["skipped"]) == (2, 2)
+    read_fit(tmp_path / "exports" / "fit" / f"{workouts[0]['id']}.fit")
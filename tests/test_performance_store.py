@@ -0,0 +1,88 @@
+"""Tests for src.storage.performance_store."""
+
+import numpy as np
+import pytest
+
+from benchmarks import synthetic
+from src.storage.performance_store import PerformanceGraphStore, bucket_stats
+
+
+@pytest.fixture
+def workout():
+    return synthetic.workout(0)
+
+
+@pytest.fixture
+def store(tmp_path, workout):
+    store = PerformanceGraphStore(tmp_path)
+    store.save(workout["id"], synthetic.performance_graph(workout))
+    return store
+
+
+@pytest.mark.parametrize("resolution, level", [(5, 5), (29, 5), (30, 30), (None, 0)])
+def test_read_chooses_coarsest_level_meeting_resolution(store, workout, resolution, level):
+    series = store.read(workout["id"], "output", resolution)
+
+    assert series["level"] == level
+    duration = workout["ride"]["duration"]
+    assert len(series["seconds"]) == (duration if level == 0 else -(-duration // level))
+
+
+def test_choose_level(store):
+    assert store.choose_level([5, 30, 300], 4) is None
+    assert store.choose_level([5, 30, 300], 3600) == 300
+    assert store.choose_level([30, 300], 29) is None
+
+
+def test_levels_aggregate_raw_series(store, workout):
+    raw = store.read(workout["id"], "heart_rate")
+    level = store.read(workout["id"], "heart_rate", 30)
+
+    first = raw["mean"][:30]
+    assert level["mean"][0] == pytest.approx(first.mean())
+    assert level["min"][0] == first.min()
+    assert level["max"][0] == first.max()
+
+
+def test_bucket_stats_skip_missing_samples():
+    stats = bucket_stats(np.arange(6.0), np.array([1, np.nan, 3, np.nan, np.nan, 8.0]), 2)
+
+    assert stats["seconds"].tolist() == [0, 2, 4]
+    np.testing.assert_array_equal(stats["mean"], [1, 3, 8])
+    np.testing.assert_array_equal(stats["max"], [1, 3, 8])
+
+
+def test_metrics_share_the_seconds_axis(tmp_path, workout):
+    graph = synthetic.performance_graph(workout)
+    n = len(graph["seconds_since_pedaling_start"])
+    graph["metrics"][0]["values"] = graph["metrics"][0]["values"][: n // 2]
+    graph["metrics"][1]["values"] = graph["metrics"][1]["values"] + [1, 2, 3]
+    store = PerformanceGraphStore(tmp_path)
+    store.save(workout["id"], graph)
+
+    _, arrays = store.read_raw(workout["id"])
+
+    short = graph["metrics"][0]["slug"]
+    assert all(len(values) == n for values in arrays.values())
+    assert np.isnan(arrays[short][n // 2:]).all()
+    for slug in store.metadata(workout["id"])["metrics"]:
+        series = store.read(workout["id"], slug, 300)
+        assert len(series["mean"]) == len(series["seconds"])
+
+
+def test_iter_series_skips_missing(store, workout):
+    ids = [workout["id"], "missing"]
+
+    assert [workout_id for workout_id, _ in store.iter_series(ids, "output", 30)] == [workout["id"]]
+    assert list(store.iter_series(ids, "not_a_metric")) == []
+
+
+@pytest.mark.parametrize("workout_id", ["", "..", "../secrets", "a/b", "a\\b", "x..y"])
+def test_rejects_ids_outside_graph_dir(tmp_path, workout_id):
+    store = PerformanceGraphStore(tmp_path)
+
+    with pytest.raises(ValueError):
+        store.save(workout_id, synthetic.performance_graph(synthetic.workout(0)))
+    with pytest.raises(ValueError):
+        store.exists(workout_id)
+    assert not any(tmp_path.rglob("*.npz"))
@@ -0,0 +1,94 @@
+"""Tests for src.profiling."""
+
+import json
+import pstats
+import threading
+
+import pytest
+
+from src import profiling
+from src.profiling import Profiler, profile_run
+
+
+def allocate():
+    return [bytearray(1024) for _ in range(2000)]
+
+
+def test_stage_is_a_no_op_without_profiler():
+    assert profiling.active() is None
+    assert profiling.stage("x") is profiling.stage("y")
+
+
+def test_nested_stages():
+    with Profiler() as profiler:
+        with profiling.stage("sync"):
+            for _ in range(3):
+                with profiling.stage("page"):
+                    pass
+        with profiling.stage("page"):
+            pass
+    assert profiling.active() is None
+
+    report = {s["stage"]: s for s in profiler.report()["stages"]}
+    assert list(report) == ["sync", "sync/page", "page"]
+    assert report["sync/page"]["calls"] == 3
+    assert report["sync"]["wall_seconds"] >= report["sync/page"]["wall_seconds"]
+    assert "top_functions" not in report["sync"]
+
+
+def test_threads_nest_separately():
+    def work():
+        with profiling.stage("worker"):
+            pass
+
+    with Profiler() as profiler:
+        with profiling.stage("main"):
+            worker = threading.Thread(target=work)
+            worker.start()
+            worker.join()
+
+    assert set(profiler.stages) == {"main", "worker"}
+
+
+def test_detailed_stage(tmp_path):
+    with Profiler(detail=["alloc"], top=5) as profiler:
+        with profiling.stage("outer"):
+            with profiling.stage("alloc"):
+                kept = allocate()
+
+    stats = profiler.stages["outer/alloc"].to_dict(5)
+    assert stats["traced_peak_mb"] >= 1
+    assert any(__file__ in row["location"] for row in stats["top_allocators"])
+    assert any("allocate" in line for line in stats["top_functions"])
+    assert "top_functions" not in profiler.stages["outer"].to_dict(5)
+    del kept
+
+    path = profiler.write(tmp_path / "run.json")
+    assert json.loads(path.read_text())["stages"][1]["stage"] == "outer/alloc"
+    pstats.Stats(str(tmp_path / "run.outer_alloc.prof"))
+    assert "== outer/alloc" in profiler.format()
+
+
+def test_profile_run_reports_failed_runs(tmp_path, caplog):
+    with pytest.raises(RuntimeError):
+        with profile_run("sync", tmp_path / "sync.json", detail=["never"]):
+            with profiling.stage("api.pagination"):
+                raise RuntimeError("boom")
+
+    report = json.loads((tmp_path / "sync.json").read_text())
+    assert [s["stage"] for s in report["stages"]] == ["sync", "sync/api.pagination"]
+    assert "never" in caplog.text
+
+
+def test_cli_profile(tmp_path):
+    from benchmarks import synthetic
+    from src.cli import main
+
+    csv_path = synthetic.write_csv_export(tmp_path / "workouts.csv", 50)
+    report = tmp_path / "import.json"
+
+    assert main(["--data-dir", str(tmp_path / "data"), "--profile", str(report), "import", str(csv_path)]) == 0
+
+    stages = {s["stage"] for s in json.loads(report.read_text())["stages"]}
+    assert "import" in stages
+    assert any(stage.endswith("store.json_dump") or stage.endswith("analysis.cube") for stage in stages)
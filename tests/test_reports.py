@@ -0,0 +1,88 @@
+"""Tests for src.visualization.reports."""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks import synthetic
+from src.analysis.workouts import to_frame
+from src.storage.workout_store import WorkoutStore
+from src.visualization import reports
+from src.visualization.reports import ReportBuilder, period_keys
+
+
+def fake_render(period, key, rows, output_dir):
+    """Stand-in for render_period (module level so worker processes can unpickle it)."""
+    return Path(output_dir) / period / key
+
+
+def failing_render(period, key, rows, output_dir):
+    raise RuntimeError("render failed")
+
+
+@pytest.fixture
+def df():
+    # 10 workouts over two months
+    return to_frame(list(synthetic.iter_workouts(1200))[::120])
+
+
+def test_period_keys(df):
+    assert period_keys(df["created_at"], "week").iloc[0] == "2015-W53"
+    assert period_keys(df["created_at"], "month").iloc[-1] == "2016-02"
+    with pytest.raises(ValueError):
+        period_keys(df["created_at"], "year")
+
+
+def test_unchanged_periods_are_skipped(tmp_path, df, monkeypatch):
+    monkeypatch.setattr(reports, "render_period", fake_render)
+    builder = ReportBuilder(tmp_path, max_workers=2)
+    weeks = period_keys(df["created_at"], "week").nunique()
+    months = period_keys(df["created_at"], "month").nunique()
+
+    first = builder.build(df)
+    assert len(first["rendered"]) == weeks + months
+    assert (first["skipped"], first["failed"]) == (0, [])
+
+    assert builder.build(df) == {"rendered": [], "skipped": weeks + months, "failed": []}
+
+    # One changed workout re-renders just its week and month
+    changed = df.copy()
+    changed.loc[5, "total_work_kj"] += 1
+    row = changed.loc[[5], "created_at"]
+    expected = sorted([f"week/{period_keys(row, 'week').iloc[0]}", f"month/{period_keys(row, 'month').iloc[0]}"])
+    assert builder.build(changed)["rendered"] == expected
+
+    assert len(builder.build(changed, periods=["month"], force=True)["rendered"]) == months
+
+
+def test_format_version_bump_rerenders(tmp_path, df, monkeypatch):
+    monkeypatch.setattr(reports, "render_period", fake_render)
+    builder = ReportBuilder(tmp_path, max_workers=2)
+    builder.build(df, periods=["month"])
+
+    monkeypatch.setattr(reports, "REPORT_FORMAT_VERSION", "test")
+
+    todo, skipped = builder.plan(df, periods=["month"])
+    assert (len(todo), skipped) == (period_keys(df["created_at"], "month").nunique(), 0)
+
+
+def test_failed_periods_are_retried(tmp_path, df, monkeypatch):
+    builder = ReportBuilder(tmp_path, max_workers=2)
+    monkeypatch.setattr(reports, "render_period", failing_render)
+    months = period_keys(df["created_at"], "month").nunique()
+
+    assert len(builder.build(df, periods=["month"])["failed"]) == months
+
+    monkeypatch.setattr(reports, "render_period", fake_render)
+    assert len(builder.build(df, periods=["month"])["rendered"]) == months
+
+
+def test_build_from_store(tmp_path):
+    WorkoutStore(tmp_path).save(list(synthetic.iter_workouts(20)))
+
+    result = ReportBuilder(tmp_path, max_workers=1).build(periods=["week"])
+
+    assert result["rendered"] == ["week/2015-W53"]
+    report_dir = tmp_path / "reports" / "week" / "2015-W53"
+    assert "| Workouts | 20 |" in (report_dir / "report.md").read_text()
+    assert (report_dir / "summary.png").stat().st_size > 0
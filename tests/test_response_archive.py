@@ -0,0 +1,173 @@
+"""Tests for src.storage.response_archive."""
+
+import io
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from src.storage.response_archive import (
+    ENDPOINT_PERFORMANCE_GRAPH,
+    ENDPOINT_WORKOUT,
+    CorruptRecordError,
+    ResponseArchive,
+)
+
+
+def body(i: int, endpoint: str = ENDPOINT_WORKOUT) -> bytes:
+    return json.dumps({"id": f"w{i}", "endpoint": endpoint, "total_work": i * 1000, "status": "COMPLETE"}).encode()
+
+
+def fill(archive: ResponseArchive, n: int, endpoint: str = ENDPOINT_WORKOUT) -> None:
+    for i in range(n):
+        archive.put(f"w{i}", endpoint, body(i, endpoint))
+
+
+def _put_range(data_dir: str, start: int, stop: int) -> None:
+    with ResponseArchive(data_dir, train_after=8) as archive:
+        for i in range(start, stop):
+            archive.put(f"w{i}", ENDPOINT_WORKOUT, body(i))
+
+
+def test_put_get_round_trip(tmp_path):
+    with ResponseArchive(tmp_path, codec="zlib", train_after=16) as archive:
+        fill(archive, 40)
+        fill(archive, 5, ENDPOINT_PERFORMANCE_GRAPH)
+
+        assert len(archive) == 45
+        assert archive.get("w3", ENDPOINT_WORKOUT) == body(3)
+        assert archive.get_json("w39", ENDPOINT_WORKOUT)["total_work"] == 39000
+        assert archive.get("w2", ENDPOINT_PERFORMANCE_GRAPH) == body(2, ENDPOINT_PERFORMANCE_GRAPH)
+        assert archive.get("missing", ENDPOINT_WORKOUT) is None
+        assert ("w0", ENDPOINT_WORKOUT) in archive
+        # The same body again is a no-op; a new one supersedes
+        assert archive.put("w0", ENDPOINT_WORKOUT, body(0)) is False
+        assert archive.put("w0", ENDPOINT_WORKOUT, body(100)) is True
+        assert archive.get("w0", ENDPOINT_WORKOUT) == body(100)
+        assert archive.stats()["dictionaries"] == 1
+
+    with ResponseArchive(tmp_path, codec="zlib") as archive:
+        assert archive.get("w0", ENDPOINT_WORKOUT) == body(100)
+
+
+def test_torn_tail_is_recovered(tmp_path):
+    with ResponseArchive(tmp_path, codec="zlib") as archive:
+        fill(archive, 10)
+        data_path = archive.data_path
+
+    # An unindexed record (crash before the index commit) followed by half a record
+    with ResponseArchive(tmp_path / "other", codec="zlib") as other:
+        other.put("w10", ENDPOINT_WORKOUT, body(10))
+        other.put("w11", ENDPOINT_WORKOUT, body(11))
+        tail = other.data_path.read_bytes()
+    intact = data_path.stat().st_size
+    with open(data_path, "ab") as f:
+        f.write(tail[: len(tail) - 5])
+
+    with ResponseArchive(tmp_path, codec="zlib") as archive:
+        assert len(archive) == 11
+        assert archive.get("w10", ENDPOINT_WORKOUT) == body(10)
+        assert ("w11", ENDPOINT_WORKOUT) not in archive
+        assert data_path.stat().st_size < intact + len(tail) - 5
+        archive.put("w11", ENDPOINT_WORKOUT, body(11))
+        assert archive.get("w11", ENDPOINT_WORKOUT) == body(11)
+
+
+def test_corrupt_record_is_detected(tmp_path):
+    with ResponseArchive(tmp_path, codec="zlib", train_after=0) as archive:
+        fill(archive, 3)
+        offset = archive._conn.execute(
+            "SELECT offset FROM records WHERE workout_id = 'w1'"
+        ).fetchone()[0]
+        with open(archive.data_path, "r+b") as f:
+            f.seek(offset)
+            f.write(b"\xff\xff\xff")
+        with pytest.raises(CorruptRecordError):
+            archive.get("w1", ENDPOINT_WORKOUT)
+        assert archive.get("w2", ENDPOINT_WORKOUT) == body(2)
+
+
+def test_compact_drops_superseded_records(tmp_path):
+    with ResponseArchive(tmp_path, codec="zlib", train_after=0) as archive:
+        fill(archive, 20)
+        for i in range(20):
+            archive.put(f"w{i}", ENDPOINT_WORKOUT, body(i + 100))
+        before = archive.stats()["file_bytes"]
+        old_path = archive.data_path
+
+        stats = archive.compact()
+
+        assert stats["records"] == 20
+        assert stats["file_bytes"] < before
+        assert not old_path.exists()
+        assert archive.get("w7", ENDPOINT_WORKOUT) == body(107)
+
+    with ResponseArchive(tmp_path, codec="zlib") as archive:
+        assert archive.get("w19", ENDPOINT_WORKOUT) == body(119)
+        assert archive.rebuild_index() == 20
+
+
+def test_two_writers_interleaved(tmp_path):
+    a = ResponseArchive(tmp_path, codec="zlib", train_after=4)
+    b = ResponseArchive(tmp_path, codec="zlib", train_after=4)
+    try:
+        for i in range(20):
+            (a if i % 2 else b).put(f"w{i}", ENDPOINT_WORKOUT, body(i))
+        for i in range(20):
+            assert a.get(f"w{i}", ENDPOINT_WORKOUT) == body(i)
+            assert b.get(f"w{i}", ENDPOINT_WORKOUT) == body(i)
+        # Whoever crossed train_after first trained; the other picked it up
+        assert a.stats()["dictionaries"] == 1
+
+        a.compact()
+        b.put("w20", ENDPOINT_WORKOUT, body(20))
+        assert a.get("w20", ENDPOINT_WORKOUT) == body(20)
+        assert b.get("w3", ENDPOINT_WORKOUT) == body(3)
+    finally:
+        a.close()
+        b.close()
+
+
+def test_concurrent_processes(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_put_range, args=(str(tmp_path), k * 50, (k + 1) * 50)) for k in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    with ResponseArchive(tmp_path, readonly=True) as archive:
+        assert len(archive) == 200
+        for i in range(200):
+            assert archive.get(f"w{i}", ENDPOINT_WORKOUT) == body(i)
+
+
+def test_readonly(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ResponseArchive(tmp_path, readonly=True)
+
+    with ResponseArchive(tmp_path, codec="zlib") as writer:
+        fill(writer, 3)
+        size = os.path.getsize(writer.data_path)
+        with ResponseArchive(tmp_path, codec="zlib", readonly=True) as reader:
+            assert reader.get("w1", ENDPOINT_WORKOUT) == body(1)
+            with pytest.raises(io.UnsupportedOperation):
+                reader.put("w9", ENDPOINT_WORKOUT, body(9))
+            # A writer's later records are visible to an open reader
+            writer.put("w3", ENDPOINT_WORKOUT, body(3))
+            assert reader.get("w3", ENDPOINT_WORKOUT) == body(3)
+            assert reader.stats()["file_bytes"] > size
+
+
+def test_zstd_records_without_zstandard(tmp_path, monkeypatch):
+    from src.storage import response_archive
+
+    with ResponseArchive(tmp_path, codec="zlib", train_after=0) as archive:
+        fill(archive, 1)
+        archive._conn.execute("UPDATE records SET codec = ?", (response_archive.CODEC_ZSTD,))
+        archive._conn.commit()
+        monkeypatch.setattr(response_archive, "zstandard", None)
+        with pytest.raises(RuntimeError, match="zstandard"):
+            archive.get("w0", ENDPOINT_WORKOUT)
@@ -0,0 +1,90 @@
+"""Tests for incremental sync (src.extraction.sync) and workout store formats."""
+
+import json
+
+import pytest
+
+from benchmarks import synthetic
+from src.extraction.api_client import PelotonAPIClient
+from src.extraction.sync import sync_workouts
+from src.extraction.transport import Transport, build_response
+from src.storage.workout_store import FORMAT_API, FORMAT_CSV, MixedFormatError, WorkoutStore
+
+
+class PagedTransport(Transport):
+    """Serves a fixed workout history (newest first) page by page."""
+
+    rate_limited = False
+
+    def __init__(self, workouts):
+        self.workouts = workouts
+        self.pages = []
+
+    def send(self, method, url, params=None, headers=None):
+        page, limit = int(params["page"]), int(params["limit"])
+        self.pages.append(page)
+        body = {"data": self.workouts[page * limit:(page + 1) * limit]}
+        return build_response(200, json.dumps(body).encode(), url)
+
+
+def history(n):
+    return sorted(synthetic.iter_workouts(n), key=lambda w: w["created_at"], reverse=True)
+
+
+def client_for(workouts):
+    transport = PagedTransport(workouts)
+    return PelotonAPIClient(None, synthetic.USER_ID, transport=transport), transport
+
+
+def test_incremental_sync_requests_only_new_pages(tmp_path):
+    workouts = history(450)
+    store = WorkoutStore(tmp_path)
+    store.save(workouts[120:])
+    client, transport = client_for(workouts)
+
+    assert sync_workouts(client, store, refresh=False) == 120
+
+    assert transport.pages == [0, 1]
+    assert [w["id"] for w in store.load()] == [w["id"] for w in workouts]
+    assert sync_workouts(client, store, refresh=False) == 0
+
+
+def test_workout_sharing_the_newest_timestamp_is_synced(tmp_path):
+    workouts = history(10)
+    twin = dict(workouts[1], id="twin")
+    store = WorkoutStore(tmp_path)
+    store.save(workouts[1:])
+    client, _ = client_for([workouts[0], twin] + workouts[1:])
+
+    assert sync_workouts(client, store, refresh=False) == 2
+    assert {"twin", workouts[0]["id"]} <= {w["id"] for w in store.load()}
+
+
+def test_store_refuses_mixed_formats(tmp_path):
+    workouts = history(5)
+    store = WorkoutStore(tmp_path)
+    assert store.stored_format() is None
+
+    store.save([synthetic.csv_row(w) for w in workouts])
+    assert store.stored_format() == FORMAT_CSV
+    with pytest.raises(MixedFormatError):
+        store.merge(workouts)
+
+    store.save(workouts)
+    assert store.stored_format() == FORMAT_API
+    with pytest.raises(MixedFormatError):
+        store.merge([synthetic.csv_row(w) for w in workouts])
+    assert len(store.load()) == 5
+
+
+def test_incremental_sync_over_csv_import_needs_full(tmp_path):
+    workouts = history(5)
+    store = WorkoutStore(tmp_path)
+    store.save([synthetic.csv_row(w) for w in workouts])
+    client, _ = client_for(workouts)
+
+    with pytest.raises(MixedFormatError, match="--full"):
+        sync_workouts(client, store, refresh=False)
+
+    assert sync_workouts(client, store, full=True, refresh=False) == 5
+    assert store.stored_format() == FORMAT_API
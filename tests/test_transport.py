@@ -0,0 +1,101 @@
+"""Tests for src.extraction.transport and src.extraction.cassette_server."""
+
+import pytest
+import requests
+
+from benchmarks import synthetic
+from benchmarks.stub_server import StubPelotonServer
+from src.auth.authenticator import PelotonAuthenticator
+from src.config import DEFAULT_TIMEOUT
+from src.extraction.api_client import PelotonAPIClient
+from src.extraction.cassette_server import CassetteServer
+from src.extraction.transport import (
+    Cassette,
+    CassetteMissError,
+    RecordingTransport,
+    ReplayTransport,
+    SessionTransport,
+    request_key,
+)
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    """A cassette holding a full workout sync plus one detail and one graph."""
+    cassette = Cassette(tmp_path / "sync.db")
+    with StubPelotonServer(250) as server:
+        transport = RecordingTransport(SessionTransport(requests.Session()), cassette)
+        client = PelotonAPIClient(None, synthetic.USER_ID, transport=transport, base_url=server.url)
+        workouts = client.get_all_workouts()
+        detail = client.get_workout_detail(workouts[0]["id"])
+        graph = client.get_workout_performance_graph(workouts[0]["id"])
+    cassette.set_meta("user_id", synthetic.USER_ID)
+    yield cassette, workouts, detail, graph
+    cassette.close()
+
+
+def test_request_key_is_canonical():
+    assert request_key("get", "https://api.onepeloton.com/api/user/1/workouts?page=0", {"limit": 100}) == (
+        "GET /api/user/1/workouts?limit=100&page=0"
+    )
+    assert request_key("GET", "/api/user/1/workouts", {"page": 0, "limit": 100, "joins": None}) == (
+        request_key("GET", "http://127.0.0.1:8765/api/user/1/workouts?limit=100&page=0")
+    )
+
+
+def test_replay_matches_recording(recorded):
+    cassette, workouts, detail, graph = recorded
+    replay = ReplayTransport(cassette)
+    # The server is gone; everything comes from the cassette
+    client = PelotonAPIClient(None, synthetic.USER_ID, transport=replay, base_url="http://unused.invalid")
+
+    assert client.get_all_workouts() == workouts
+    assert client.get_workout_detail(workouts[0]["id"]) == detail
+    assert client.get_workout_performance_graph(workouts[0]["id"]) == graph
+    assert replay.misses == 0 and replay.hits == len(cassette)
+    assert not replay.rate_limited
+
+    with pytest.raises(CassetteMissError):
+        client.get_workout_detail(workouts[1]["id"])
+
+
+def test_replay_falls_back_for_unrecorded_requests(recorded):
+    cassette, workouts, _, _ = recorded
+    with StubPelotonServer(250) as server:
+        replay = ReplayTransport(cassette, fallback=SessionTransport(requests.Session()))
+        client = PelotonAPIClient(None, synthetic.USER_ID, transport=replay, base_url=server.url)
+
+        assert client.get_workout_detail(workouts[1]["id"])["id"] == workouts[1]["id"]
+    assert replay.misses == 1
+
+
+def test_errors_are_not_recorded_by_default(tmp_path):
+    cassette = Cassette(tmp_path / "sync.db")
+    with StubPelotonServer(5) as server:
+        client = PelotonAPIClient(
+            None,
+            synthetic.USER_ID,
+            transport=RecordingTransport(SessionTransport(requests.Session()), cassette),
+            base_url=server.url,
+        )
+        with pytest.raises(requests.HTTPError):
+            client.get_workout_detail("missing")
+    assert len(cassette) == 0
+
+
+def test_cassette_server(recorded):
+    cassette, workouts, detail, _ = recorded
+    with CassetteServer(cassette) as server:
+        auth = PelotonAuthenticator("user", "password", base_url=server.url)
+        assert auth.login()
+        client = PelotonAPIClient(auth.get_session(), auth.get_user_id(), base_url=server.url)
+
+        assert client.get_all_workouts() == workouts
+        assert client.get_workout_detail(workouts[0]["id"]) == detail
+        with pytest.raises(requests.HTTPError):
+            client.get_workout_detail(workouts[1]["id"])
+    assert (server.hits, server.misses) == (len(cassette) - 1, 1)
+
+
+def test_live_requests_use_the_shared_timeout():
+    assert SessionTransport(requests.Session()).timeout == DEFAULT_TIMEOUT
@@ -0,0 +1,42 @@
+"""Tests for src.analysis.workouts."""
+
+import pandas as pd
+
+from benchmarks import synthetic
+from src.analysis.workouts import COLUMNS, to_frame
+
+
+def test_api_and_csv_timestamps_agree():
+    workouts = list(synthetic.iter_workouts(20))
+
+    api = to_frame(workouts)
+    csv = to_frame([synthetic.csv_row(w) for w in workouts])
+
+    # Both are local (New York) wall-clock time; the CSV export has minutes only
+    assert api["created_at"].dt.tz is None
+    pd.testing.assert_series_equal(api["created_at"].dt.floor("min"), csv["created_at"], check_dtype=False)
+
+
+def test_api_timestamps_without_known_timezone_stay_utc(caplog):
+    workouts = list(synthetic.iter_workouts(3))
+    workouts[0]["timezone"] = None
+    workouts[1]["timezone"] = "Nowhere/Land"
+
+    created_at = to_frame(workouts).set_index("workout_id")["created_at"]
+
+    utc = pd.to_datetime([w["created_at"] for w in workouts], unit="s")
+    assert [created_at[w["id"]] for w in workouts] == [utc[0], utc[1], utc[2] - pd.Timedelta(hours=5)]
+    assert "Nowhere/Land" in caplog.text
+
+
+def test_csv_rows_without_timestamp_are_dropped():
+    rows = [synthetic.csv_row(w) for w in synthetic.iter_workouts(5)]
+    rows[1]["Workout Timestamp"] = ""
+    rows[3]["Workout Timestamp"] = "not a date"
+
+    df = to_frame(rows)
+
+    assert list(df.columns) == COLUMNS
+    assert len(df) == 3
+    assert "NaT" not in set(df["workout_id"])
+    assert df["workout_id"].is_unique